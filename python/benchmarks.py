@@ -0,0 +1,218 @@
+# Standard library
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+#########################################################################################
+#
+# Benchmarks
+#
+#########################################################################################
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must not be loaded just by importing tfm_methods
+heavy_modules = ["matplotlib", "scipy"]
+
+
+def parse_importtime(stderr):
+    """
+    Parse the output of `python -X importtime` into a list of dicts
+    (module, self_us, cumulative_us, depth)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+        name = parts[2].rstrip()
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            # Nested imports are indented with two spaces per level
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return rows
+
+
+def import_time(module="tfm_methods", top=15, budget_ms=None):
+    """
+    Import `module` in a fresh interpreter with -X importtime, print the slowest
+    imports made by it and check that no heavy module (matplotlib, scipy) is loaded.
+    Returns the list of problems found (empty when everything is fine).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return [f"import {module} failed:\n{result.stderr}"]
+
+    rows = parse_importtime(result.stderr)
+
+    # Output is in post-order: the direct imports of `module` are the depth-1 rows
+    # printed between the previous top-level import and `module` itself
+    end = max(i for i, r in enumerate(rows) if r["depth"] == 0 and r["module"] == module)
+    start = max([i for i, r in enumerate(rows[:end]) if r["depth"] == 0], default=-1) + 1
+    total_ms = rows[end]["cumulative_us"] / 1000
+
+    print(f"Import time of '{module}': {total_ms:.1f} ms")
+    print(f"{'cumulative [ms]':>16} {'self [ms]':>10}  module")
+    top_rows = sorted(
+        (r for r in rows[start:end] if r["depth"] == 1), key=lambda r: r["cumulative_us"], reverse=True
+    )
+    for r in top_rows[:top]:
+        print(f"{r['cumulative_us'] / 1000:>16.1f} {r['self_us'] / 1000:>10.1f}  {r['module']}")
+
+    problems = []
+    loaded = {r["module"].split(".")[0] for r in rows[start:end + 1]}
+    for heavy in heavy_modules:
+        if heavy in loaded:
+            problems.append(f"'{heavy}' is imported by 'import {module}'")
+    if budget_ms is not None and total_ms > budget_ms:
+        problems.append(f"import time {total_ms:.1f} ms is over the budget of {budget_ms} ms")
+    return problems
+
+
+# Runs in a fresh interpreter inside the code directory: builds the synthetic dataset by
+# resampling the survey rows, runs the sections of the tags and prints the peak RSS
+memory_worker = textwrap.dedent("""
+    import contextlib, os, resource, sys, time
+    os.environ["MPLBACKEND"] = "Agg"
+    csv_name, rows, tags = sys.argv[1], int(sys.argv[2]), sys.argv[3:]
+    sys.argv = ["main.py", "-t", ",".join(tags)]
+
+    # Libraries loaded before measuring, so the delta is the work on the data
+    import matplotlib.pyplot
+    import scipy.special, scipy.stats
+    import main
+    import tfm_methods as tmt
+
+    df = tmt.load_dataset(csv_name, main.rename_mapping, schema=main.categorical_schema, use_cache=False)
+    df = df.sample(n=rows, replace=True, random_state=0).reset_index(drop=True)
+    df["id"] = range(1, len(df) + 1)
+    rss_data = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tmt.run_sections(df, [int(tag) for tag in tags])
+    elapsed = time.perf_counter() - start
+
+    print(rss_data, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, elapsed)
+""")
+
+
+def export_revision(rev, dest):
+    """
+    Write the python/ files of a git revision into dest
+    """
+    prefix = subprocess.run(
+        ["git", "rev-parse", "--show-prefix"], cwd=HERE, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    names = subprocess.run(
+        ["git", "ls-tree", "--full-tree", "--name-only", rev, prefix], cwd=HERE, capture_output=True, text=True, check=True
+    ).stdout.split()
+    for name in names:
+        if name.endswith((".py", ".csv")):
+            content = subprocess.run(["git", "show", f"{rev}:{name}"], cwd=HERE, capture_output=True, check=True).stdout
+            with open(os.path.join(dest, os.path.basename(name)), "wb") as f:
+                f.write(content)
+
+
+def peak_memory(code_dir, csv_path, rows, tags):
+    """
+    Peak RSS (MB) of running the sections of tags over `rows` resampled survey rows,
+    with the code in code_dir. Returns (rss after building the data, peak rss, seconds)
+    """
+    workdir = tempfile.mkdtemp()
+    try:
+        for name in os.listdir(code_dir):
+            if name.endswith((".py", ".csv")):
+                shutil.copy(os.path.join(code_dir, name), workdir)
+        shutil.copy(csv_path, os.path.join(workdir, "benchmark_data.csv"))
+
+        result = subprocess.run(
+            [sys.executable, "-c", memory_worker, "benchmark_data", str(rows), *map(str, tags)],
+            cwd=workdir,
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    rss_data, rss_peak, elapsed = result.stdout.split()[-3:]
+    # ru_maxrss is in KB on Linux
+    return int(rss_data) / 1024, int(rss_peak) / 1024, float(elapsed)
+
+
+def memory(csv_name="forms_habits_lectura", rows=200000, tags=(13,), compare_rev=None):
+    """
+    Peak RSS of running the sections on a large synthetic dataset (the survey rows
+    resampled up to `rows`), for the working tree and optionally for a git revision
+    """
+    csv_path = f"{csv_name}.csv"
+    if not os.path.exists(csv_path):
+        return [f"{csv_path} not found (the survey CSV is resampled to build the dataset)"]
+
+    runs = [("working tree", HERE)]
+    tmp_rev = None
+    if compare_rev is not None:
+        tmp_rev = tempfile.mkdtemp()
+        export_revision(compare_rev, tmp_rev)
+        runs.insert(0, (compare_rev, tmp_rev))
+
+    print(f"Sections of tags {list(tags)} over {rows} rows")
+    print(f"{'code':>16} {'data [MB]':>10} {'peak [MB]':>10} {'sections [MB]':>14} {'time [s]':>9}")
+    try:
+        for name, code_dir in runs:
+            rss_data, rss_peak, elapsed = peak_memory(code_dir, csv_path, rows, tags)
+            print(f"{name:>16} {rss_data:>10.1f} {rss_peak:>10.1f} {rss_peak - rss_data:>14.1f} {elapsed:>9.1f}")
+    finally:
+        if tmp_rev is not None:
+            shutil.rmtree(tmp_rev, ignore_errors=True)
+
+    return []
+
+
+#########################################################################################
+#
+# Main
+#
+#########################################################################################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the TFM analysis scripts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p_import = subparsers.add_parser("import-time", help="Import time report of tfm_methods")
+    p_import.add_argument("--module", default="tfm_methods", help="Module to import")
+    p_import.add_argument("--top", type=int, default=15, help="Number of modules to show")
+    p_import.add_argument("--budget-ms", type=float, default=None, help="Fail if the import is slower")
+
+    p_memory = subparsers.add_parser("memory", help="Peak RSS of the sections on a large synthetic dataset")
+    p_memory.add_argument("--csv", default="forms_habits_lectura", help="Survey CSV (without .csv) to resample")
+    p_memory.add_argument("--rows", type=int, default=200000, help="Rows of the synthetic dataset")
+    p_memory.add_argument("-t", "--tags", type=int, nargs="+", default=[13], help="Tags to run")
+    p_memory.add_argument("--compare-rev", default=None, help="Also measure this git revision (e.g. HEAD~1)")
+
+    args = parser.parse_args()
+
+    if args.command == "import-time":
+        problems = import_time(args.module, args.top, args.budget_ms)
+    elif args.command == "memory":
+        problems = memory(args.csv, args.rows, args.tags, args.compare_rev)
+
+    for problem in problems:
+        print(f"[ERROR] {problem}")
+    sys.exit(1 if problems else 0)
@@ -1,8 +1,8 @@
 # Standard library
+import os
 from pprint import pprint
 
 # Third-party
-import matplotlib.pyplot as plt
 import pandas as pd
 
 # Local imports
@@ -16,6 +16,11 @@ import tfm_methods as tmt
 # Create statistics df from csv
 csv_name = "forms_habits_lectura"
 
+# Pooled surveys: directory or glob of CSVs (one per school and wave, e.g. "escoles/*.csv")
+# loaded in parallel instead of csv_name. Rows are tagged with their file in "font"
+csv_pattern = None
+ingest_workers = None  # None = one process per core
+
 # Verbosity
 verbose, tags = tmt.parse_arguments()
 
@@ -23,15 +28,70 @@ verbose, tags = tmt.parse_arguments()
 poltergeists = False
 filterr = False
 
+# Audit of the answers still inconsistent after filterr (.csv or .parquet, None = no file)
+audit_path = None
+
 # Export cleaned dataset
 export_cleaned = False
 
+# Cache of the parsed and renamed dataset (Parquet)
+use_cache = True
+cache_dir = ".cache"
+
+# Cache of the statistical results (Spearman, chi-square, thematic scores) in
+# cache_dir/results when use_cache, keyed by the input columns and parameters
+result_cache_max_mb = 256
+
+# Streaming mode for big exports: read the CSV in chunks of this many rows and only
+# accumulate the counts needed by tags 1, 2 and 5 (None = load the whole dataset)
+stream_chunksize = None
+
+# Incremental streaming: keep the counts in cache_dir and only read the rows appended
+# to the CSV since the last run (needs stream_chunksize)
+incremental = False
+
+# Monte Carlo of the pages per year within the intervals of the answers (tag 3): draws
+# per pair of answers (e.g. 10000, None = only the midpoints)
+pagines_draws = None
+
+# Sensitivity of the reader classification (tag 4): grids of the page cut-offs of
+# classify_reader (e.g. range(100, 801, 100) and range(800, 2001, 200), None = no sweep)
+sweep_pagines_baix = None
+sweep_pagines_alt = None
+
+# Compare the pagines_bin_schemes of the pages per year (tag 3): share of each category
+# and Spearman ρ with the reading time of every scheme
+compare_bin_schemes = False
+
 # Save figures
 save_figures = False
 
 # Dictionary to store correlations of all variables with reading habits
+# ({row: {column: {"rho", "p", "n", "ci_low", "ci_high"}}})
 correlations_dict = {}
 
+# Outcomes of the Spearman matrices of sections 6-12 (the heatmap uses the first two)
+spearman_outcomes = ["p4_temps_lectura_sp", "p5_llibres_sp", "p5_6_pagines_sp", "classificacio_lectora_sp"]
+
+# Bootstrap 95% CIs of the Spearman ρ: number of resamples (e.g. 10000, None = no CIs)
+spearman_bootstrap = None
+bootstrap_seed = 0
+
+# Monte Carlo p-values of the chi-square tests (sparse tables, expected counts < 5):
+# number of simulated tables with the same margins (e.g. 10000, None = only asymptotic)
+chi_square_monte_carlo = None
+
+# Heatmap significance: "mask" (grey) or "mark" (asterisks) the cells by their p-value
+# corrected across all the cells with heatmap_correction ("holm", "bh" or None), None = only ρ
+heatmap_significance = None
+heatmap_correction = "holm"
+
+# Measure of the heatmaps: "rho" (Spearman), "tau_b" (Kendall) or "gamma" (Goodman-Kruskal)
+heatmap_measure = "rho"
+
+# Groups of the stratified heatmap correlations (tag 14), one grid per column
+stratify_by = ["Curs", "Gènere"]
+
 #########################################################################################
 #
 # / Variables
@@ -40,74 +100,12 @@ correlations_dict = {}
 
 #########################################################################################
 #
-# Main Operations
+# Sorts, maps and schema
 #
 #########################################################################################
 
 # =======================================================================================
-# First Data Inspection
-# =======================================================================================
-# Import df from csv
-df = pd.read_csv(f"{csv_name}.csv")
-
-# Ad id column
-df["id"] = range(1, len(df) + 1)
-
-# Print df data
-if verbose:
-    print("========================================================================================\nCheck Dataset\n========================================================================================")
-    print(f"Dataframe dimensions (rows, cols): {df.shape}")
-    print(f"First 5 lines of the dataframe: \n{df.head()}")
-    # print(f"\nCheck no null values:")
-    # print(df.info())
-    # print(f"\nCheck no nulls values per column:")
-    # print(df.isnull().sum())
-
-# =======================================================================================
-# Rename some important columns
-# =======================================================================================
-df = df.rename(columns={
-    "Quant temps a la setmana dediques, de mitjana, a la lectura de llibres o còmics per oci? (Ja sigui en format físic o digital).": "p4_temps_lectura",
-    "Quants llibres o còmics t’has llegit aproximadament en els últims 12 mesos per oci? (Ja sigui en format físic o digital)": "p5_llibres",
-    "En cas que la resposta hagi estat diferent de 0 llibres o còmics, quantes pàgines, de mitjana, tenien aproximadament aquests llibres o còmics?": "p6_pag",
-    "Actualment estàs llegint algun llibre o còmic per oci?": "p7_lectura_actual",
-    "Quants cops aproximadament has visitat una biblioteca per llegir o agafar llibres en préstec en els últims 12 mesos per oci?": "p10_visites_biblioteca",
-    "En quin grau llegeixes les lectures obligatòries de l’escola?": "p16_lectura_obligatoria", 
-    "Quin format de lectura utilitzes més habitualment per a la lectura de llibres o còmics per oci? ": "format",
-    "Quan llegeixes, com acostumen a ser les teves sessions de lectura?" : "sessions",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la fantàstica.]": "Novel·la fantàstica",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la romàntica.]": "Novel·la romàntica",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la de terror.]": "Novel·la de terror",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la negra.]": "Novel·la negra",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la històrica.]": "Novel·la històrica",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Ciència ficció.]": "Ciència ficció",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Còmic.]": "Còmic",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Clàssics.]": "Clàssics",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Poesia.]": "Poesia",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Assaig (Filosofia, divulgació científica, etc.)]": "Assaig",
-    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Teatre.]": "Teatre"
-})
-
-# =======================================================================================
-# Save poltergeists
-# =======================================================================================
-if poltergeists:
-    df = tmt.save_poltergeists(df, verbose=verbose)
-
-# =======================================================================================
-# Clean dataset and ensure consistency
-# =======================================================================================
-if filterr:
-    df = tmt.clean_reading_dataset_and_consistency(df, verbose=verbose)
-
-# =======================================================================================
-# Export cleaned dataset
-# =======================================================================================
-if export_cleaned:
-    tmt.export_dataset(df, csv_name=f"{csv_name}_cleaned.csv")
-
-# =======================================================================================
-# Sorting, maps and Spearman ready variables
+# Sorting and maps
 # =======================================================================================
 # Maps
 # =======================================================
@@ -209,6 +207,16 @@ map_llibres_num = {
     "Més de 15 llibres o còmics": 18
 }
 
+# Intervals de cada resposta (Monte Carlo de les pàgines anuals); ">15" fins a 20, mitjana 18
+interval_llibres = {
+    "0 llibres o còmics.": (0, 0),
+    "1-2 llibres o còmics.": (1, 2),
+    "3-5 llibres o còmics.": (3, 5),
+    "6-10 llibres o còmics.": (6, 10),
+    "11-15 llibres o còmics.": (11, 15),
+    "Més de 15 llibres o còmics": (16, 20)
+}
+
 map_llibres_sp = {
     "0 llibres o còmics.": 0,
     "1-2 llibres o còmics.": 1,
@@ -220,14 +228,21 @@ map_llibres_sp = {
 
 # Pàgines anuals
 # ===
-map_pagines_sp = {
-    "0": 0,
-    "1-300": 1,
-    "301-800": 2,
-    "801-2000": 3,
-    "2001-4000": 4,
-    ">4000": 5
+# Esquemes de categories (límits superiors, veure tmt.bin_edges); p5_6_pagines i
+# p5_6_pagines_sp (codis ordinals) surten de pagines_scheme
+pagines_bin_schemes = {
+    "fix": {"kind": "fixed", "edges": [0, 300, 800, 2000, 4000]},
+    "quantils": {"kind": "quantile", "n": 5, "zero": True},
+    "log": {"kind": "log", "start": 100, "stop": 10000, "n": 5, "zero": True}
 }
+pagines_scheme = "fix"
+
+sort_pagines = [
+    "1-99 pàgines.",
+    "100-299 pàgines.",
+    "300-599 pàgines.",
+    "Més de 600 pàgines"
+]
 
 map_pagines_num = {
     "1-99 pàgines.": 50,
@@ -236,6 +251,14 @@ map_pagines_num = {
     "Més de 600 pàgines": 700
 }
 
+# ">600" fins a 800, mitjana 700
+interval_pagines = {
+    "1-99 pàgines.": (1, 99),
+    "100-299 pàgines.": (100, 299),
+    "300-599 pàgines.": (300, 599),
+    "Més de 600 pàgines": (600, 800)
+}
+
 # Classificació lectora
 # ===
 map_class_sp =  {
@@ -258,7 +281,10 @@ map_sessions_sp = {
     "Llegeixo gairebé sempre en estones molt curtes (menys de 15 minuts).": 0,
     "Llegeixo sobretot en estones curtes (15–30 minuts).": 1,
     "Combino estones curtes (15–30 minuts) i mitjanes (30–60 minuts).": 2,
-    "Llegeixo habitualment en sessions mitjanes (30-60 minuts) i llargues (més d’1 hora seguida).": 3
+    "Llegeixo habitualment en sessions mitjanes (30-60 minuts) i llargues (més d’1 hora seguida).": 3,
+    # Sense puntuació (no són ordinals)
+    "Depèn molt del moment (no tinc un patró clar).": None,
+    "No llegeixo per oci.": None
 }
 
 sort_distraccions_inv = [
@@ -362,7 +388,7 @@ map_tric_sp = {
     "Entre 30 minuts i 1 hora al dia.": 2,
     "Entre 1 i 2 hores al dia.": 3,
     "Entre 2 i 3 hores al dia.": 4,
-    "3 hores o més al dia": 5
+    "3 hores o més al dia.": 5
 }
 
 sort_sport = [
@@ -380,7 +406,7 @@ map_sport_sp = {
     "Entre 30 minuts i 1 hora al dia.": 2,
     "Entre 1 i 2 hores al dia.": 3,
     "Entre 2 i 3 hores al dia.": 4,
-    "3 hores o més al dia": 5
+    "3 hores o més al dia.": 5
 }
 
 # Entorn familiar pro-lector
@@ -417,52 +443,236 @@ map_num_llibres_sp = {
     "Més de 200 llibres.": 5
 }
 
+# Temàtiques (rank 1, 2, 3 -> puntuació)
+# ===
+map_thematic = {
+    1: 3,
+    2: 2,
+    3: 1
+}
+
+columnes_generes = [
+    "Novel·la fantàstica",
+    "Novel·la romàntica",
+    "Novel·la de terror",
+    "Novel·la negra",
+    "Novel·la històrica",
+    "Ciència ficció",
+    "Còmic",
+    "Clàssics",
+    "Poesia",
+    "Assaig",
+    "Teatre"
+]
+
+# =======================================================================================
+# Ordered categorical schema applied at load time
+# =======================================================================================
+categorical_schema = {
+    "Curs": sort_cursos,
+    "p4_temps_lectura": sort_temps,
+    "p5_llibres": sort_llibres,
+    "p6_pag": sort_pagines,
+    "sessions": sort_sessions + ["No llegeixo per oci."],
+    "Amb quina freqüència consultes xarxes socials habitualment mentre llegeixes?": sort_distraccions_inv,
+    "Quan llegeixes, acostumes a fer-ho amb música, vídeos o pòdcasts de fons?": sort_freq,
+    "p10_visites_biblioteca": sort_visites_biblioteca_anual,
+    "Durant la teva infància i adolescència, amb quina freqüència aproximadament has anat a la biblioteca amb els teus pares o tutors legals a llegir o agafar llibres en préstec?": sort_freq,
+    "p16_lectura_obligatoria": sort_lectura_obligatoria,
+    "T’agraden les lectures obligatòries de l’escola? ": sort_gust,
+    "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més lectures obligatòries de l'escola si s'adaptessin més als meus gustos.": sort_acords,
+    "Fins a quin punt estàs d'acord amb la següent afirmació: des que utilitzo eines d’IA generativa (ChatGPT, Gemini, Copilot, Claude, etc.), he reduït la lectura de les lectures obligatòries de l’escola. ": sort_acords,
+    "Amb quina freqüència utilitzes resums d’internet o eines digitals (com IA generativa) per consultar el contingut de les lectures obligatòries de l’escola?": sort_freq,
+    "Amb quina de les següents afirmacions t’identifiques més?": sort_afirmacio,
+    "En general, creus que llegir per oci entre els nois i noies de la teva edat és vist com:": sort_com_es_veu,
+    "Comparteixes opinions de lectura sobre llibres o còmics que has llegit o estàs llegint amb altres persones? (Amics, família, companys de classe, companys d’activitats extraescolars, etc.).": sort_freq,
+    "Fins a quin punt estàs d'acord amb la següent afirmació: si els meus amics o companys de classe llegissin habitualment i parlessin sovint de llibres o còmics, jo també llegiria més.": sort_acords,
+    "Veus o escoltes continguts audiovisuals relacionats amb literatura, llibres o còmics per oci?": sort_freq,
+    "Quant temps al dia dediques, de mitjana, a l’ús de dispositius digitals per a l’oci? (Mòbil, Ordinador, Tablet, Televisió, Smart-watch, etc.).": sort_tric,
+    "Quant temps al dia dediques, de mitjana, a utilitzar xarxes socials o veure contingut audiovisual ràpid? (Instagram, TikTok, WhatsApp, X, Telegram, Facebook, Shorts de YouTube).": sort_tric,
+    "Quant temps al dia dediques, de mitjana, a veure o sentir contingut audiovisual en Plataformes com Netflix, YouTube, Twitch, Canals de Televisió, Amazon Prime, Spotify, Movistar +, DAZN? (Ja sigui en format vídeo gravat, vídeo en streaming o pòdcast)": sort_tric,
+    "Quant temps al dia dediques, de mitjana, a jugar a videojocs. (Ja sigui en PlayStation, Xbox, PC, mòbil, Nintendo Switch, Nintendo DS, etc.).": sort_tric,
+    "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més llibres o còmics si dediqués menys temps a les xarxes socials i plataformes de videos curts? . (Instagram, TikTok, WhatsApp, X, Telegram, Facebook, Shorts de YouTube).": sort_acords,
+    "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més llibres o còmics si dediqués menys temps a videojocs (PlayStation, PC, mòbil, etc.) i/o plataformes de contingut audiovisual.  (Netflix, YouTube, Twitch, canals de televisió, Amazon Prime, HBO, Disney +, Movistar +, DAZN).": sort_acords,
+    "Quant temps al dia dediques, de mitjana, a l’estudi i la realització de tasques acadèmiques fora de l’horari escolar? (Exàmens, deures, treballs, etc.)": sort_tric,
+    "Quant temps al dia dediques, de mitjana, a realitzar activitats relacionades amb la cultura fora de l’horari escolar? (Música, dansa, teatre, pintura, escriptura, visites a museus, etc.).": sort_tric,
+    "Quant temps al dia dediques, de mitjana, a la pràctica d’esport fora de l’horari escolar? (Futbol, bàsquet, atletisme, ciclisme, natació, ioga, gym, senderisme, tenis, pàdel, ping-pong, etc.).": sort_sport,
+    "Quant temps al dia dediques, de mitjana, a quedar amb amics / amigues o parella sentimental fora de l’horari escolar?": sort_tric,
+    "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més llibres o còmics si tingués menys càrrega acadèmica fora d'horari escolar. (Exàmens, deures, treballs, etc.)": sort_acords,
+    "Quin és el nivell d’estudis més alt dels teus pares o tutors legals?": sort_estudis_familiars,
+    "Durant la teva infància i adolescència, amb quina freqüència has vist als teus pares o tutors legals llegint llibres o còmics per oci?": sort_freq,
+    "Durant la teva infància i adolescència, amb quina freqüència has parlat amb els teus pares o tutors legals sobre literatura, llibres o còmics?": sort_freq,
+    "Durant la teva infància i adolescència, amb quina freqüència heu realitzat sessions de lectura conjunta a casa?": sort_freq,
+    "Fins a quin punt estàs d'acord amb la següent afirmació: a casa meva hi ha normes clares sobre el temps que puc dedicar a les pantalles i dispositius digitals.": sort_acords,
+    "Quants llibres aproximadament heu tingut a casa durant la teva infància i adolescència?": sort_num_llibres
+}
+
+# =======================================================================================
+# Rename some important columns
+# =======================================================================================
+rename_mapping = {
+    "Quant temps a la setmana dediques, de mitjana, a la lectura de llibres o còmics per oci? (Ja sigui en format físic o digital).": "p4_temps_lectura",
+    "Quants llibres o còmics t’has llegit aproximadament en els últims 12 mesos per oci? (Ja sigui en format físic o digital)": "p5_llibres",
+    "En cas que la resposta hagi estat diferent de 0 llibres o còmics, quantes pàgines, de mitjana, tenien aproximadament aquests llibres o còmics?": "p6_pag",
+    "Actualment estàs llegint algun llibre o còmic per oci?": "p7_lectura_actual",
+    "Quants cops aproximadament has visitat una biblioteca per llegir o agafar llibres en préstec en els últims 12 mesos per oci?": "p10_visites_biblioteca",
+    "En quin grau llegeixes les lectures obligatòries de l’escola?": "p16_lectura_obligatoria", 
+    "Quin format de lectura utilitzes més habitualment per a la lectura de llibres o còmics per oci? ": "format",
+    "Quan llegeixes, com acostumen a ser les teves sessions de lectura?" : "sessions",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la fantàstica.]": "Novel·la fantàstica",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la romàntica.]": "Novel·la romàntica",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la de terror.]": "Novel·la de terror",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la negra.]": "Novel·la negra",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la històrica.]": "Novel·la històrica",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Ciència ficció.]": "Ciència ficció",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Còmic.]": "Còmic",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Clàssics.]": "Clàssics",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Poesia.]": "Poesia",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Assaig (Filosofia, divulgació científica, etc.)]": "Assaig",
+    "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Teatre.]": "Teatre"
+}
+
+#########################################################################################
+#
+# / Sorts, maps and schema
+#
+#########################################################################################
+
+#########################################################################################
+#
+# Sections
+#
+#########################################################################################
+
+# Heatmap columns
+heatmap_outcomes = {"Temps lectura": "p4_temps_lectura_sp", "Llibres anuals": "p5_llibres_sp"}
+
+# Heatmap rows (etiqueta: predictor), filled by sections 6-12 and broken down by groups in tag 14
+heatmap_predictors = {
+    # 6. Sessions de lectura
+    "Durada sessions lectura": "sessions_sp",
+    "X.socials durant lectura": "distraccions_sp",
+    "Música durant lectura": "doble_tasca_sp",
+    # 7. Biblioteca
+    "Visites biblioteca últim any": "p10_visites_biblioteca_anual_sp",
+    "Visites biblioteca amb familia": "biblioteca_infancia_sp",
+    # 8. Lectura obligatòria
+    "Grau de lectura obligatòria": "p16_lectura_obligatoria_sp",
+    "Gust lectura obligatòria": "gust_lectura_obligatoria_sp",
+    # 9. Narrativa
+    "Percepció social lectura": "percepcio_social_lectura_sp",
+    "Percepció personal lectura": "percepcio_individual_lectura_sp",
+    "Compartir opinions de lectura": "compartir_sp",
+    # 10. TRIC
+    "Consumir contingut sobre lectura": "consumir_contingut_sp",
+    "Temps dispositius digitals": "tecnos",
+    "Temps xarxes socials": "xarxes",
+    "Temps contingut audiovisual": "plataformes_streaming",
+    "Temps videojocs": "videojocs",
+    # 11. Altres activitats
+    "Carrega lectiva fora d'horari": "estudi_sp",
+    "Temps activitats culturals": "cultura_sp",
+    "Temps esport": "sport_sp",
+    "Temps quedar amics / parella": "hangout_sp",
+    # 12. Entorn familiar
+    "Nivell d'estudis pares": "estudis_familiars_sp",
+    "Veure pares llegint": "vist_pares_lectura_sp",
+    "Parlar amb família sobre lectures": "parlat_pares_lectura_sp",
+    "Sessions de lectura conjunta": "sessions_lectura_familiars_sp",
+    "Normes clares pantalles": "normes_clares_tric_sp",
+    "Núm. llibres a casa": "num_llibres_sp"
+}
+
+def heatmap_cells(spearman: pd.DataFrame, predictor: str) -> dict:
+    """
+    Heatmap cells of a predictor from a tmt.spearman_matrix table: each cell keeps rho,
+    p, n, the bootstrap CI (NaN without spearman_bootstrap), tau_b, gamma and p_kendall
+    """
+
+    return {
+        column: tmt.correlation_cell(spearman, predictor, outcome)
+        for column, outcome in heatmap_outcomes.items()
+    }
+
+def fill_correlations(spearman: pd.DataFrame, rows: list):
+    """
+    Fill the heatmap rows (labels of heatmap_predictors) of correlations_dict from a
+    tmt.spearman_matrix table
+    """
+
+    for row in rows:
+        correlations_dict[row] = heatmap_cells(spearman, heatmap_predictors[row])
+
+
 # =======================================================================================
 # Create the Spearman ready variables
 # =======================================================================================
-# Temps de lectura setmanal
-# ===
-df["p4_temps_lectura_sp"] = df["p4_temps_lectura"].map(map_temps_sp)
+@tmt.register_section(
+    "spearman_base",
+    consumes=["p4_temps_lectura", "p5_llibres"],
+    produces=["p4_temps_lectura_sp", "p5_llibres_sp"]
+)
+def create_spearman_base(df: pd.DataFrame) -> pd.DataFrame:
+    # Temps de lectura setmanal
+    # ===
+    df = df.assign(**tmt.encode_answers(df, {
+        "p4_temps_lectura_sp": ("p4_temps_lectura", map_temps_sp)
+    }, verbose=verbose))
+
+    # Llibres 12 mesos
+    # ===
+    df = df.assign(**tmt.encode_answers(df, {
+        "p5_llibres_sp": ("p5_llibres", map_llibres_sp)
+    }, verbose=verbose))
+
+    return df
 
-# Llibres 12 mesos
-# ===
-df["p5_llibres_sp"] = df["p5_llibres"].map(map_llibres_sp)
 
 # =======================================================================================
-# Create subdataframes of readers, no readers, gender, curs
+# Readers mask (df_readers = df[df["lector_oci"]])
 # =======================================================================================
-readers_mask = (
-    # (df["p5_llibres"] != "0 llibres o còmics.") &
-    # (df["p4_temps_lectura"] != "0 minuts.") &
-    (df["sessions"] != "No llegeixo per oci.") &
-    (df["format"] != "No llegeixo per oci.")
+@tmt.register_section(
+    "lectors",
+    consumes=["sessions", "format", "p5_llibres", "p4_temps_lectura", "id", "Gènere", "Curs"],
+    produces=["lector_oci"]
 )
+def create_readers_mask(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(lector_oci=(
+        # (df["p5_llibres"] != "0 llibres o còmics.") &
+        # (df["p4_temps_lectura"] != "0 minuts.") &
+        (df["sessions"] != "No llegeixo per oci.") &
+        (df["format"] != "No llegeixo per oci.")
+    ))
 
-df_readers = df[readers_mask].copy()
-df_no_readers = df[~readers_mask].copy()
+    if verbose:
+        df_readers = df[df["lector_oci"]]
+        df_no_readers = df[~df["lector_oci"]]
+        show_list = ["id", "Gènere", "Curs", "p4_temps_lectura", "p5_llibres", "format", "sessions"]
+        print("\n========================================================================================\nReaders DF\n========================================================================================")
+        print(f"Dataframe dimensions (rows, cols): {df_readers.shape}")
+        print(f"First 5 lines of the dataframe: \n{df_readers[show_list].head(12)}")
+        print("\n========================================================================================\nNo Readers DF\n========================================================================================")
+        print(f"Dataframe dimensions (rows, cols): {df_no_readers.shape}")
+        print(f"First 5 lines of the dataframe: \n{df_no_readers[show_list].head(12)}")
 
-# df_fem = df[df["Gènere"] == "Femení."].copy()
-# df_mas = df[df["Gènere"] == "Masculí."].copy()
+    return df
 
-if verbose:
-    show_list = ["id", "Gènere", "Curs", "p4_temps_lectura", "p5_llibres", "format", "sessions"]
-    print("\n========================================================================================\nReaders DF\n========================================================================================")
-    print(f"Dataframe dimensions (rows, cols): {df_readers.shape}")
-    print(f"First 5 lines of the dataframe: \n{df_readers[show_list].head(12)}")
-    print("\n========================================================================================\nNo Readers DF\n========================================================================================")
-    print(f"Dataframe dimensions (rows, cols): {df_no_readers.shape}")
-    print(f"First 5 lines of the dataframe: \n{df_no_readers[show_list].head(12)}")
 
 # =======================================================================================
 # 1. Característiques Generals de la mostra
 # =======================================================================================
-if len(tags) > 0 and 1 in tags:
+@tmt.register_section(
+    "caracteristiques",
+    tags=[1],
+    consumes=["Gènere", "Curs", "Itinerari (només si estàs cursant Batxillerat)"]
+)
+def section_caracteristiques(df: pd.DataFrame) -> pd.DataFrame:
     print("\n=======================================================================================\nCaracterístiques Generals de la Mostra\n=======================================================================================")
     
     # Boys & girls
     # =======================================================
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="Gènere",
         title="Distribució de l'alumnat segons el gènere",
         xlabel="",
@@ -474,7 +684,7 @@ if len(tags) > 0 and 1 in tags:
     # Cursos
     # =======================================================
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="Curs",
         title="Distribució de l'alumnat segons el curs",
         xlabel="",
@@ -487,7 +697,7 @@ if len(tags) > 0 and 1 in tags:
     # Itinerari (només si estàs cursant Batxillerat)
     # =======================================================
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="Itinerari (només si estàs cursant Batxillerat)",
         title="Distribució de l'alumnat segons l'itinerari (només Batxillerat)",
         xlabel="",
@@ -496,39 +706,46 @@ if len(tags) > 0 and 1 in tags:
         figure_path="../latex/pictures/1_descriptive_itinerari"
     )
 
+    return df
+
+
 # =======================================================================================
 # 2. Temps de lectura setmanal i llibres llegits en els últims 12 mesos per oci per grups
 # =======================================================================================
-if len(tags) > 0 and 2 in tags:
+@tmt.register_section(
+    "temps_llibres",
+    tags=[2],
+    consumes=["Gènere", "Curs", "p4_temps_lectura", "p5_llibres", "p4_temps_lectura_sp", "p5_llibres_sp", "Itinerari (només si estàs cursant Batxillerat)"]
+)
+def section_temps_llibres(df: pd.DataFrame) -> pd.DataFrame:
     print("\n=======================================================================================\nTemps de lectura setmanal i llibres llegits en els últims 12 mesos per oci per grups\n=======================================================================================")
     # print(df[df["Gènere"] == "Prefereixo no respondre."])
     tmt.spearman_analysis(
-        df.copy(),
+        df,
         "p4_temps_lectura_sp",
         "p5_llibres_sp",
-        "Spearman: temps de lectura vs llibres llegits"
+        "Spearman: temps de lectura vs llibres llegits",
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
     )
 
-    tmt.chi_square_analysis(
-        df[df["Gènere"] != "Prefereixo no respondre."].copy(),
-        "Gènere",
-        "p4_temps_lectura",
-        "Chi-cuadrat: gènere normatiu vs temps de lectura"
-    )
-
-    tmt.chi_square_analysis(
-        df[df["Gènere"] != "Prefereixo no respondre."].copy(),
-        "Gènere",
-        "p5_llibres",
-        "Chi-cuadrat: gènere normatiu vs llibres llegits"
+    chi_square = tmt.chi_square_pairs(
+        df[df["Gènere"] != "Prefereixo no respondre."],
+        [("Gènere", "p4_temps_lectura"), ("Gènere", "p5_llibres")],
+        monte_carlo=chi_square_monte_carlo,
+        seed=bootstrap_seed
     )
+    tmt.report_chi_square(chi_square, [
+        ("Gènere", "p4_temps_lectura", "Chi-cuadrat: gènere normatiu vs temps de lectura"),
+        ("Gènere", "p5_llibres", "Chi-cuadrat: gènere normatiu vs llibres llegits"),
+    ])
 
     # Llibres llegits en els últims 12 mesos per oci per grups
     # =======================================================
     # General
     # ===
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="p4_temps_lectura",
         title="Distribució de l'alumnat segons el temps mitjà de lectura setmanal per oci",
         xlabel="",
@@ -541,8 +758,8 @@ if len(tags) > 0 and 2 in tags:
     # Boys vs girls
     # ===
     tmt.plot_descriptive_combined_hists(
-        df[df["Gènere"] == "Femení."].copy(),
-        df[df["Gènere"] == "Masculí."].copy(),
+        df[df["Gènere"] == "Femení."],
+        df[df["Gènere"] == "Masculí."],
         groups=["Noies", "Nois"],
         var="p4_temps_lectura",
         title="Distribució de l'alumnat segons el temps mitjà de lectura setmanal per oci per gènere",
@@ -557,10 +774,10 @@ if len(tags) > 0 and 2 in tags:
     # Groups
     # ===
     tmt.plot_descriptive_combined_hists(
-        df[df["Curs"] == "3r d'ESO."].copy(),
-        df[df["Curs"] == "4t d'ESO."].copy(),
-        df[df["Curs"] == "1r de Batxillerat."].copy(),
-        df[df["Curs"] == "2n de Batxillerat."].copy(),
+        df[df["Curs"] == "3r d'ESO."],
+        df[df["Curs"] == "4t d'ESO."],
+        df[df["Curs"] == "1r de Batxillerat."],
+        df[df["Curs"] == "2n de Batxillerat."],
         groups=["3r d'ESO", "4t d'ESO", "1r de Batxillerat", "2n de Batxillerat"],
         var="p4_temps_lectura",
         title="Distribució de l'alumnat segons el temps mitjà de lectura setmanal per oci per curs",
@@ -575,8 +792,8 @@ if len(tags) > 0 and 2 in tags:
     # Ciencies Socials vs Tecnologia i Ciencia
     # ===
     tmt.plot_descriptive_combined_hists(
-        df[df["Itinerari (només si estàs cursant Batxillerat)"] == "Ciències Socials."].copy(),
-        df[df["Itinerari (només si estàs cursant Batxillerat)"] == "Ciències i Tecnologia."].copy(),
+        df[df["Itinerari (només si estàs cursant Batxillerat)"] == "Ciències Socials."],
+        df[df["Itinerari (només si estàs cursant Batxillerat)"] == "Ciències i Tecnologia."],
         groups=["Ciències Socials", "Ciències i Tecnologia"],
         var="p4_temps_lectura",
         title="Distribució de l'alumnat segons el temps mitjà de lectura setmanal per oci per itinerari",
@@ -593,7 +810,7 @@ if len(tags) > 0 and 2 in tags:
     # General
     # ===
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="p5_llibres",
         title="Distribució de l'alumnat segons els llibres llegits per oci en els últims 12 mesos",
         xlabel="",
@@ -606,8 +823,8 @@ if len(tags) > 0 and 2 in tags:
     # Boys vs girls
     # =======================================================
     tmt.plot_descriptive_combined_hists(
-        df[df["Gènere"] == "Femení."].copy(),
-        df[df["Gènere"] == "Masculí."].copy(),
+        df[df["Gènere"] == "Femení."],
+        df[df["Gènere"] == "Masculí."],
         groups=["Noies", "Nois"],
         var="p5_llibres",
         title="Distribució de l'alumnat segons els llibres llegits per oci en els últims 12 mesos per gènere",
@@ -622,7 +839,7 @@ if len(tags) > 0 and 2 in tags:
     # Groups
     # =======================================================
     tmt.plot_descriptive_combined_hists(
-        df[df["Curs"] == "3r d'ESO."].copy(),
+        df[df["Curs"] == "3r d'ESO."],
         df[df["Curs"] == "4t d'ESO."],
         df[df["Curs"] == "1r de Batxillerat."],
         df[df["Curs"] == "2n de Batxillerat."],
@@ -653,77 +870,98 @@ if len(tags) > 0 and 2 in tags:
         figure_path="../latex/pictures/2_llibres_itinerari"
     )
 
+    return df
+
+
 # =======================================================================================
 # 3. Composed variables books * pages --> pages / year (p5_6_pagines)
 # =======================================================================================
-# Recode P5 to mean number of books
-# =======================================================
-df["p5_num"] = df["p5_llibres"].map(map_llibres_num)
-df["p6_num"] = df["p6_pag"].map(map_pagines_num)
-
-# Create Composed variable p5 * p6 = total aproximado de páginas leídas al año
-df["p5_6_pagines_num"] = (
-    df["p5_num"] * df["p6_num"]
+@tmt.register_section(
+    "pagines",
+    consumes=["p5_llibres", "p6_pag", "id"],
+    produces=["p5_num", "p6_num", "p5_6_pagines_num", "p5_6_pagines", "p5_6_pagines_sp"]
 )
+def create_pagines(df: pd.DataFrame) -> pd.DataFrame:
+    # Recode P5 to mean number of books
+    # =======================================================
+    df = df.assign(**tmt.encode_answers(df, {
+        "p5_num": ("p5_llibres", map_llibres_num),
+        "p6_num": ("p6_pag", map_pagines_num)
+    }, verbose=verbose))
 
-# If p5 = 0 books -> p5_6 = 0
-df.loc[
-    df["p5_num"] == 0,
-    "p5_6_pagines_num"
-] = 0
+    # Create Composed variable p5 * p6 = total aproximado de páginas leídas al año
+    df["p5_6_pagines_num"] = (
+        df["p5_num"] * df["p6_num"]
+    )
 
-# Replace Nan for 0
-df["p5_6_pagines_num"] = df["p5_6_pagines_num"].fillna(0)
+    # If p5 = 0 books -> p5_6 = 0
+    df.loc[
+        df["p5_num"] == 0,
+        "p5_6_pagines_num"
+    ] = 0
 
-# Discretize composed variable into categories
-# =======================================================
-# Categorize
-bins = [-1, 0, 300, 800, 2000, 4000, float("inf")]
-labels = ["0", "1-300", "301-800", "801-2000", "2001-4000", ">4000"]
-
-# df["p5_6_pagines"] = df["p5_6_pagines_num"].apply(tmt.categorize_pags)
-df["p5_6_pagines"] = pd.cut(
-    df["p5_6_pagines_num"],
-    bins=bins,
-    labels=labels
-)
+    # Replace Nan for 0
+    df["p5_6_pagines_num"] = df["p5_6_pagines_num"].fillna(0)
+
+    # Discretize composed variable into categories
+    # =======================================================
+    # df["p5_6_pagines"] = df["p5_6_pagines_num"].apply(tmt.categorize_pags)
+    # Codis ordinals de tots els esquemes en una passada (np.searchsorted)
+    codes, labels = tmt.bin_codes(df, "p5_6_pagines_num", pagines_bin_schemes)
+
+    df["p5_6_pagines"] = pd.Categorical.from_codes(
+        codes[pagines_scheme].fillna(-1).astype(int),
+        categories=labels[pagines_scheme],
+        ordered=True
+    )
+    df["p5_6_pagines_sp"] = codes[pagines_scheme]
 
-# Aplicar mapa
-df["p5_6_pagines_sp"] = df["p5_6_pagines"].map(map_pagines_sp)
+    if verbose:
+        print("Check first 20 rows of number of pages per year:")
+        print(
+            df[
+                [
+                    "id",
+                    "p5_llibres",
+                    "p6_pag",
+                    "p5_num",
+                    "p6_num",
+                    "p5_6_pagines_num",
+                    "p5_6_pagines",
+                ]
+            ].head(20)
+        )
+
+    return df
+
+
+@tmt.register_section(
+    "pagines_estadistiques",
+    tags=[3],
+    consumes=["p4_temps_lectura_sp", "p5_num", "p5_6_pagines_num", "p5_6_pagines", "p5_6_pagines_sp", "Gènere", "Curs", "p5_llibres", "p6_pag"]
+)
+def section_pagines(df: pd.DataFrame) -> pd.DataFrame:
+    import matplotlib.pyplot as plt
 
-# Check result
-if len(tags) > 0 and 3 in tags:
     print("\n=======================================================================================\nPages per year: Estatistics\n=======================================================================================")
     # Correlations
     tmt.spearman_analysis(
-        df.copy(),
+        df,
         "p4_temps_lectura_sp",
         "p5_6_pagines_sp",
-        "Spearman: temps de lectura vs pàgines llegides"
+        "Spearman: temps de lectura vs pàgines llegides",
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
     )
     tmt.spearman_analysis(
-        df.copy(),
+        df,
         "p5_num",
         "p5_6_pagines_num",
-        "Spearman: llibres llegits vs pàgines llegides"
-    )
-
-if verbose:
-    print("Check first 20 rows of number of pages per year:")
-    print(
-        df[
-            [
-                "id",
-                "p5_llibres",
-                "p6_pag",
-                "p5_num",
-                "p6_num",
-                "p5_6_pagines_num",
-                "p5_6_pagines",
-            ]
-        ].head(20)
-    )
-if len(tags) > 0 and 3 in tags:
+        "Spearman: llibres llegits vs pàgines llegides",
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+
     print("\n========================== General ===========================")
     print(df["p5_6_pagines_num"].describe())
     print("\n============================ Sexe ============================")
@@ -741,6 +979,53 @@ if len(tags) > 0 and 3 in tags:
     print("------------- 2n de Batxillerat -------------")
     print(df[df["Curs"] == "2n de Batxillerat."]["p5_6_pagines_num"].describe())
 
+    if compare_bin_schemes:
+        # Categories de cada esquema (en una passada, o de la cache de resultats) i ρ amb el temps de lectura
+        codes, labels = tmt.bin_codes(df, "p5_6_pagines_num", pagines_bin_schemes)
+        spearman = tmt.spearman_pairs(
+            codes.assign(p4_temps_lectura_sp=df["p4_temps_lectura_sp"]),
+            [(name, "p4_temps_lectura_sp") for name in pagines_bin_schemes]
+        )
+
+        print("\n================== Esquemes de categories ===================")
+        for name in pagines_bin_schemes:
+            counts = codes[name].value_counts(normalize=True).reindex(range(len(labels[name])), fill_value=0)
+            counts.index = labels[name]
+            print(f"------------- {name} (ρ amb temps de lectura = {spearman.loc[(name, 'p4_temps_lectura_sp'), 'rho']:.3f}) -------------")
+            print((counts * 100).round(1).to_string())
+
+    if pagines_draws is not None:
+        labels_pagines = list(df["p5_6_pagines"].cat.categories)
+
+        # Pàgines mostrejades dins dels intervals de llibres i pàgines per llibre
+        pagines = tmt.interval_product_distribution(
+            df,
+            "p5_llibres",
+            "p6_pag",
+            interval_llibres,
+            interval_pagines,
+            tmt.bin_edges(df["p5_6_pagines_num"].to_numpy(dtype=float), pagines_bin_schemes[pagines_scheme]),
+            labels_pagines,
+            n_draws=pagines_draws,
+            at_most=[300],
+            at_least=[1200],
+            seed=bootstrap_seed
+        )
+
+        print("\n================== Monte Carlo (intervals) ===================")
+        print(pagines["mean"].describe())
+        print("------------- Alumnes per categoria (%) -------------")
+        print(pd.DataFrame({
+            "punt mig": df["p5_6_pagines"].value_counts(normalize=True).reindex(labels_pagines) * 100,
+            "Monte Carlo": pagines[[f"p_{label}" for label in labels_pagines]].mean().to_numpy() * 100
+        }).round(1).to_string())
+
+        # Llindars de classify_reader: alumnes amb la classificació incerta
+        print("------------- Llindars de la classificació lectora -------------")
+        for column, threshold in [("p_<=300", "≤ 300 pàgines"), ("p_>=1200", "≥ 1200 pàgines")]:
+            incert = pagines[column].between(0.05, 0.95).sum()
+            print(f"{threshold}: {pagines[column].sum():.1f} alumnes esperats, {incert} amb probabilitat entre 5% i 95%")
+
     # # Plot
     # tmt.plot_descriptive_hists(
     #     df=df,
@@ -752,8 +1037,8 @@ if len(tags) > 0 and 3 in tags:
     
     # # Plot
     # tmt.plot_descriptive_combined_hists(
-    #     df[df["Gènere"] == "Masculí."].copy(),
-    #     df[df["Gènere"] == "Femení."].copy(),
+    #     df[df["Gènere"] == "Masculí."],
+    #     df[df["Gènere"] == "Femení."],
     #     sort=["0", "1-300", "301-800", "801-2000", "2001-4000", ">4000"],
     #     groups=["Nois", "Noies"],
     #     var="p5_6_pagines",
@@ -765,10 +1050,10 @@ if len(tags) > 0 and 3 in tags:
 
     # # Plot
     # tmt.plot_descriptive_combined_hists(
-    #     df[df["Curs"] == "3r d'ESO."].copy(),
-    #     df[df["Curs"] == "4t d'ESO."].copy(),
-    #     df[df["Curs"] == "1r de Batxillerat."].copy(),
-    #     df[df["Curs"] == "2n de Batxillerat."].copy(),
+    #     df[df["Curs"] == "3r d'ESO."],
+    #     df[df["Curs"] == "4t d'ESO."],
+    #     df[df["Curs"] == "1r de Batxillerat."],
+    #     df[df["Curs"] == "2n de Batxillerat."],
     #     sort=["0", "1-300", "301-800", "801-2000", "2001-4000", ">4000"],
     #     groups=["3r d'ESO", "4t d'ESO", "1r de Batxillerat", "2n de Batxillerat"],
     #     var="p5_6_pagines",
@@ -821,7 +1106,7 @@ if len(tags) > 0 and 3 in tags:
 
     # Plot
     orden = ["3r d'ESO.", "4t d'ESO.", "1r de Batxillerat.", "2n de Batxillerat."]
-    df["Curs"] = pd.Categorical(df["Curs"], categories=orden, ordered=True)
+    df = df.assign(Curs=pd.Categorical(df["Curs"], categories=orden, ordered=True))
     df.boxplot(column="p5_6_pagines_num", by="Curs", showmeans=True)
 
     plt.title("Boxplot nombre de pàgines en els últims 12 mesos per curs")
@@ -846,49 +1131,87 @@ if len(tags) > 0 and 3 in tags:
     # # plt.yscale("log")
     # # plt.ylim(1, df["p5_6_pagines_num"].max())
 
+    return df
+
+
 # =======================================================================================
 # 4. Classificació lectora
 # =======================================================================================
+@tmt.register_section(
+    "classificacio",
+    consumes=["p4_temps_lectura", "p5_6_pagines_num"],
+    produces=["classificacio_lectora", "classificacio_lectora_sp"]
+)
+def create_classificacio(df: pd.DataFrame) -> pd.DataFrame:
+    # Add column clasificació_lectora
+    # =======================================================
+    df = tmt.classify_reader(df)
 
-# ---
-df_readers["p4_temps_lectura_sp"] = df_readers["p4_temps_lectura"].map(map_temps_sp)
-df_readers["p5_llibres_sp"] = df_readers["p5_llibres"].map(map_llibres_sp)
-
-# Add column clasificació_lectora
-# =======================================================
-df = tmt.classify_reader(df)
+    # Calculate new correlation with classificació_lectora
+    df = df.assign(**tmt.encode_answers(df, {
+        "classificacio_lectora_sp": ("classificacio_lectora", map_class_sp)
+    }, verbose=verbose))
 
+    return df
 
-# Calculate new correlation with classificació_lectora
-df["p5_6_pagines_sp"] = df["p5_6_pagines"].map(map_pagines_sp)
-df["classificacio_lectora_sp"] = df["classificacio_lectora"].map(map_class_sp)
 
-if len(tags) > 0 and 4 in tags:
+@tmt.register_section(
+    "classificacio_estadistiques",
+    tags=[4],
+    consumes=[
+        "p4_temps_lectura_sp",
+        "p5_llibres_sp",
+        "p5_6_pagines_num",
+        "p5_6_pagines_sp",
+        "classificacio_lectora",
+        "classificacio_lectora_sp",
+        "Gènere",
+        "Curs",
+        "p5_6_pagines",
+        "p4_temps_lectura",
+        "p5_llibres",
+        "Itinerari (només si estàs cursant Batxillerat)"
+    ]
+)
+def section_classificacio(df: pd.DataFrame) -> pd.DataFrame:
     print("\n=======================================================================================\nReading Classification \n=======================================================================================")
     # Correlations
     tmt.spearman_analysis(
-        df.copy(),
+        df,
         "p4_temps_lectura_sp",
         "classificacio_lectora_sp",
-        "Spearman: temps de lectura vs classificació lectora"
+        "Spearman: temps de lectura vs classificació lectora",
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
     )
 
     tmt.spearman_analysis(
-        df.copy(),
+        df,
         "p5_llibres_sp",
         "classificacio_lectora_sp",
-        "Spearman: llibres llegides vs classificació lectora"
+        "Spearman: llibres llegides vs classificació lectora",
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
     )
 
     tmt.spearman_analysis(
-        df.copy(),
+        df,
         "p5_6_pagines_sp",
         "classificacio_lectora_sp",
-        "Spearman: pàgines llegides vs classificació lectora"
+        "Spearman: pàgines llegides vs classificació lectora",
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
     )
 
     if verbose:
         print(df[["p5_6_pagines", "p5_6_pagines_sp", "p4_temps_lectura", "p4_temps_lectura_sp", "p5_llibres", "p5_llibres_sp"]].head(30))
+
+    if sweep_pagines_baix is not None and sweep_pagines_alt is not None:
+        # Mides dels grups i ρ per a cada parella de llindars de pàgines (temps fix: ≤ 30 min, ≥ 1 h)
+        sweep = tmt.classify_reader_sweep(df, sweep_pagines_baix, sweep_pagines_alt)
+        print("Sensibilitat de la classificació lectora als llindars de pàgines")
+        print(sweep.droplevel(["low_time", "high_time"]).to_string(float_format="{:.3g}".format))
+        print("--------------------------------------------------------")
     # Se observa una Correlació positiva fuerte entre el tiempo de lectura y el número de páginas leídas (ρ = 0.714), lo que indica coherencia entre ambas dimensiones del hábito lector. Esta relación justifica la construcción de una variable compuesta que integre frecuencia e intensidad de lectura.
     
     # Prints
@@ -917,8 +1240,8 @@ if len(tags) > 0 and 4 in tags:
     # Boys vs girls
     # =======================================================
     tmt.plot_descriptive_combined_hists(
-        df[df["Gènere"] == "Femení."].copy(),
-        df[df["Gènere"] == "Masculí."].copy(),
+        df[df["Gènere"] == "Femení."],
+        df[df["Gènere"] == "Masculí."],
         groups=["Noies", "Nois"],
         var="classificacio_lectora",
         title="Classificació de l'alumnat segons l'hàbit lector per oci per gènere",
@@ -933,10 +1256,10 @@ if len(tags) > 0 and 4 in tags:
     # Groups
     # =======================================================
     tmt.plot_descriptive_combined_hists(
-        df[df["Curs"] == "3r d'ESO."].copy(),
-        df[df["Curs"] == "4t d'ESO."].copy(),
-        df[df["Curs"] == "1r de Batxillerat."].copy(),
-        df[df["Curs"] == "2n de Batxillerat."].copy(),
+        df[df["Curs"] == "3r d'ESO."],
+        df[df["Curs"] == "4t d'ESO."],
+        df[df["Curs"] == "1r de Batxillerat."],
+        df[df["Curs"] == "2n de Batxillerat."],
         groups=["3r d'ESO", "4t d'ESO", "1r de Batxillerat", "2n de Batxillerat"],
         var="classificacio_lectora",
         title="Classificació de l'alumnat segons l'hàbit lector per oci per curs",
@@ -951,8 +1274,8 @@ if len(tags) > 0 and 4 in tags:
     # # Ciencies Socials vs Tecnologia i Ciencia
     # # =======================================================
     # tmt.plot_descriptive_combined_hists(
-    #     df[df["Itinerari (només si estàs cursant Batxillerat)"] == "Ciències Socials."].copy(),
-    #     df[df["Itinerari (només si estàs cursant Batxillerat)"] == "Ciències i Tecnologia."].copy(),
+    #     df[df["Itinerari (només si estàs cursant Batxillerat)"] == "Ciències Socials."],
+    #     df[df["Itinerari (només si estàs cursant Batxillerat)"] == "Ciències i Tecnologia."],
     #     groups=["Ciències Socials", "Ciències i Tecnologia"],
     #     var="classificacio_lectora",
     #     title="Distribució de l'alumnat segons el seu hàbit lector per oci per itinerari",
@@ -962,44 +1285,44 @@ if len(tags) > 0 and 4 in tags:
     #     sort=sort
     # )
 
+    return df
+
+
 # =======================================================================================
 # 5. Thematic & Format
 # =======================================================================================
-if len(tags) > 0 and 5 in tags:
+@tmt.register_section(
+    "tematica_format",
+    tags=[5],
+    consumes=["lector_oci", "Gènere", "format"] + columnes_generes
+)
+def section_tematica(df: pd.DataFrame) -> pd.DataFrame:
+    df_readers = df[df["lector_oci"]]
+
     print("\n=======================================================================================\nThematic & Format\n=======================================================================================")
-    # Select df
-    df_thematic = df.copy()
-    
-    # Remap thematic and calculate scores for all, girls and boys
+    # Calculate thematic scores for all, girls and boys (map_thematic, columnes_generes)
     # =======================================================
-    map_thematic = {
-        1: 3,
-        2: 2,
-        3: 1
-    }
-
     # print(list(df))
 
-    columnes_generes = [
-        "Novel·la fantàstica",
-        "Novel·la romàntica",
-        "Novel·la de terror",
-        "Novel·la negra",
-        "Novel·la històrica",
-        "Ciència ficció",
-        "Còmic",
-        "Clàssics",
-        "Poesia",
-        "Assaig",
-        "Teatre"
-    ]
-
-    readers_resultats_all = tmt.compute_thematic_scores(df_readers, columnes_generes, map_thematic)
-    readers_resultats_girls = tmt.compute_thematic_scores(df_readers[df_readers["Gènere"] == "Femení."], columnes_generes, map_thematic)
-    readers_resultats_boys = tmt.compute_thematic_scores(df_readers[df_readers["Gènere"] == "Masculí."], columnes_generes, map_thematic)
-    all_resultats_all = tmt.compute_thematic_scores(df, columnes_generes, map_thematic)
-    all_resultats_girls = tmt.compute_thematic_scores(df[df["Gènere"] == "Femení."], columnes_generes, map_thematic)
-    all_resultats_boys = tmt.compute_thematic_scores(df[df["Gènere"] == "Masculí."], columnes_generes, map_thematic)
+    # Tots els grups en un sol producte (matriu d'indicadors x puntuacions)
+    lectors = df["lector_oci"]
+    noies = df["Gènere"] == "Femení."
+    nois = df["Gènere"] == "Masculí."
+    resultats = tmt.thematic_scores_groups(df, columnes_generes, map_thematic, {
+        "readers_all": lectors,
+        "readers_girls": lectors & noies,
+        "readers_boys": lectors & nois,
+        "all_all": pd.Series(True, index=df.index),
+        "all_girls": noies,
+        "all_boys": nois
+    })
+
+    readers_resultats_all = resultats["readers_all"]
+    readers_resultats_girls = resultats["readers_girls"]
+    readers_resultats_boys = resultats["readers_boys"]
+    all_resultats_all = resultats["all_all"]
+    all_resultats_girls = resultats["all_girls"]
+    all_resultats_boys = resultats["all_boys"]
 
     if verbose:
         print("Thematics results for ALL ------------------------------------------------------")
@@ -1068,94 +1391,93 @@ if len(tags) > 0 and 5 in tags:
         figure_path="../latex/pictures/5_format"
     )
 
+    return df
+
+
 # =======================================================================================
 # 6. sessions (Com acostumen a ser les sessions de lectura)
 # =======================================================================================
-df["sessions_sp"] = df["sessions"].map(map_sessions_sp)
-df["distraccions_sp"] = df[
-    "Amb quina freqüència consultes xarxes socials habitualment mentre llegeixes?"
-].map(map_distraccions_inv_sp)
+@tmt.register_section(
+    "sessions_sp",
+    consumes=["sessions", "Amb quina freqüència consultes xarxes socials habitualment mentre llegeixes?", "Quan llegeixes, acostumes a fer-ho amb música, vídeos o pòdcasts de fons?"],
+    produces=["sessions_sp", "distraccions_sp", "doble_tasca_sp"]
+)
+def create_sessions_sp(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(**tmt.encode_answers(df, {
+        "sessions_sp": ("sessions", map_sessions_sp),
+        "distraccions_sp": ("Amb quina freqüència consultes xarxes socials habitualment mentre llegeixes?", map_distraccions_inv_sp),
+        "doble_tasca_sp": ("Quan llegeixes, acostumes a fer-ho amb música, vídeos o pòdcasts de fons?", map_freq_sp)
+    }, verbose=verbose))
 
-df["doble_tasca_sp"] = df[
-    "Quan llegeixes, acostumes a fer-ho amb música, vídeos o pòdcasts de fons?"
-].map(map_freq_sp)
+    return df
 
-df_readers["doble_tasca_sp"] = df_readers[
-    "Quan llegeixes, acostumes a fer-ho amb música, vídeos o pòdcasts de fons?"
-].map(map_freq_sp)
 
-if len(tags) > 0 and (6 in tags or 13 in tags):
-    print("\n=======================================================================================\nSessions de lectura \n=======================================================================================")
-    # Correlations
-    correlations_dict["Durada sessions lectura"] = {}
-    correlations_dict["Durada sessions lectura"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
+@tmt.register_section(
+    "sessions",
+    tags=[6, 13],
+    consumes=[
         "sessions_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: sessions de lectura vs temps de lectura"
-    )[0]
-    
-    correlations_dict["Durada sessions lectura"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "sessions_sp",
-        "p5_llibres_sp",
-        "Spearman: sessions de lectura vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["X.socials durant lectura"] = {}
-    correlations_dict["X.socials durant lectura"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "distraccions_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: freqüència de distraccions vs temps de lectura"
-    )[0]
-
-    correlations_dict["X.socials durant lectura"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
         "distraccions_sp",
-        "p5_llibres_sp",
-        "Spearman: freqüència de distraccions vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Música durant lectura"] = {}
-    correlations_dict["Música durant lectura"]["Temps lectura"] =   tmt.spearman_analysis(
-        df.copy(),
         "doble_tasca_sp",
+        "lector_oci",
         "p4_temps_lectura_sp",
-        "Spearman: freqüència de doble tasca vs temps de lectura"
-    )[0]
-
-    correlations_dict["Música durant lectura"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "doble_tasca_sp",
-        "p5_llibres_sp",
-        "Spearman: freqüència de doble tasca vs nombre de llibres anuals llegits"
-    )[0]
-
-    tmt.spearman_analysis(
-        df_readers.copy(),
-        "doble_tasca_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: freqüència de doble tasca vs temps de lectura (only readers)"
-    )
-
-    tmt.spearman_analysis(
-        df_readers.copy(),
-        "doble_tasca_sp",
         "p5_llibres_sp",
-        "Spearman: freqüència de doble tasca vs nombre de llibres anuals llegits (only readers)"
-    )
+        "classificacio_lectora",
+        "p5_6_pagines_sp",
+        "classificacio_lectora_sp",
+        "sessions",
+        "Amb quina freqüència consultes xarxes socials habitualment mentre llegeixes?",
+        "Quan llegeixes, acostumes a fer-ho amb música, vídeos o pòdcasts de fons?"
+    ]
+)
+def section_sessions(df: pd.DataFrame) -> pd.DataFrame:
+    df_readers = df[df["lector_oci"]]
 
-    tmt.spearman_analysis(
-        df.copy(),
-        "sessions_sp",
-        "distraccions_sp",
-        "Spearman: durada de les sessions de lectura vs freqüència de distraccions (x.socials) mentre llegeixen"
-    )
+    print("\n=======================================================================================\nSessions de lectura \n=======================================================================================")
+    # Correlations (all the pairs of each dataframe in one batch)
+    spearman = tmt.spearman_matrix(
+        df,
+        ["sessions_sp", "distraccions_sp", "doble_tasca_sp"],
+        spearman_outcomes,
+        extra_pairs=[("sessions_sp", "distraccions_sp")],
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+    spearman_readers = tmt.spearman_matrix(
+        df_readers,
+        ["doble_tasca_sp"],
+        spearman_outcomes,
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+
+    tmt.report_spearman(spearman, [
+        ("sessions_sp", "p4_temps_lectura_sp", "Spearman: sessions de lectura vs temps de lectura"),
+        ("sessions_sp", "p5_llibres_sp", "Spearman: sessions de lectura vs nombre de llibres anuals llegits"),
+        ("distraccions_sp", "p4_temps_lectura_sp", "Spearman: freqüència de distraccions vs temps de lectura"),
+        ("distraccions_sp", "p5_llibres_sp", "Spearman: freqüència de distraccions vs nombre de llibres anuals llegits"),
+        ("doble_tasca_sp", "p4_temps_lectura_sp", "Spearman: freqüència de doble tasca vs temps de lectura"),
+        ("doble_tasca_sp", "p5_llibres_sp", "Spearman: freqüència de doble tasca vs nombre de llibres anuals llegits")
+    ])
+
+    tmt.report_spearman(spearman_readers, [
+        ("doble_tasca_sp", "p4_temps_lectura_sp", "Spearman: freqüència de doble tasca vs temps de lectura (only readers)"),
+        ("doble_tasca_sp", "p5_llibres_sp", "Spearman: freqüència de doble tasca vs nombre de llibres anuals llegits (only readers)")
+    ])
+
+    tmt.report_spearman(spearman, [
+        ("sessions_sp", "distraccions_sp", "Spearman: durada de les sessions de lectura vs freqüència de distraccions (x.socials) mentre llegeixen")
+    ])
+
+    fill_correlations(spearman, [
+        "Durada sessions lectura",
+        "X.socials durant lectura",
+        "Música durant lectura"
+    ])
 
     # Plots sessions ------------------
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="sessions",
         title="Distribució de l'alumnat segons la durada de les sessions de lectura",
         xlabel="",
@@ -1166,9 +1488,9 @@ if len(tags) > 0 and (6 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="sessions",
         title="Distribució de l'alumnat segons la durada de les sessions de lectura, per classificació lectora",
@@ -1193,9 +1515,9 @@ if len(tags) > 0 and (6 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Amb quina freqüència consultes xarxes socials habitualment mentre llegeixes?",
         title="Distribució de l'alumnat segons la freqüència de consulta de x.socials durant la lectura, per classificació lectora",
@@ -1209,7 +1531,7 @@ if len(tags) > 0 and (6 in tags or 13 in tags):
 
     # Plots Doble Tasca ------------------
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="Quan llegeixes, acostumes a fer-ho amb música, vídeos o pòdcasts de fons?",
         title="Freqüència de lectura amb música, vídeos o pòdcasts de fons",
         xlabel="",
@@ -1220,9 +1542,9 @@ if len(tags) > 0 and (6 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Quan llegeixes, acostumes a fer-ho amb música, vídeos o pòdcasts de fons?",
         title="Freqüència de lectura amb música, vídeos o pòdcasts de fons, per classificació lectora",
@@ -1234,46 +1556,70 @@ if len(tags) > 0 and (6 in tags or 13 in tags):
         figure_path="../latex/pictures/6_musica_class"
     )
 
+    return df
+
+
 # =======================================================================================
 # 7. p10_visites_biblioteca
 # =======================================================================================
-df["biblioteca_infancia_sp"] = df["Durant la teva infància i adolescència, amb quina freqüència aproximadament has anat a la biblioteca amb els teus pares o tutors legals a llegir o agafar llibres en préstec?"].map(map_freq_sp)
-if len(tags) > 0 and (7 in tags or 13 in tags):
-    print("\n=======================================================================================\nVisites Biblioteca \n=======================================================================================")
-    df["p10_visites_biblioteca_anual_sp"] = df["p10_visites_biblioteca"].map(map_visites_biblioteca_anual_sp)
+@tmt.register_section(
+    "biblioteca_sp",
+    consumes=[
+        "p10_visites_biblioteca",
+        "Durant la teva infància i adolescència, amb quina freqüència aproximadament has anat a la biblioteca amb els teus pares o tutors legals a llegir o agafar llibres en préstec?"
+    ],
+    produces=["p10_visites_biblioteca_anual_sp", "biblioteca_infancia_sp"]
+)
+def create_biblioteca_sp(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(**tmt.encode_answers(df, {
+        "p10_visites_biblioteca_anual_sp": ("p10_visites_biblioteca", map_visites_biblioteca_anual_sp),
+        "biblioteca_infancia_sp": ("Durant la teva infància i adolescència, amb quina freqüència aproximadament has anat a la biblioteca amb els teus pares o tutors legals a llegir o agafar llibres en préstec?", map_freq_sp)
+    }, verbose=verbose))
 
-    correlations_dict["Visites biblioteca últim any"] = {}
-    correlations_dict["Visites biblioteca últim any"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "p10_visites_biblioteca_anual_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: visites biblioteca anual vs temps de lectura"
-    )[0]
+    return df
 
-    correlations_dict["Visites biblioteca últim any"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "p10_visites_biblioteca_anual_sp",
-        "p5_llibres_sp",
-        "Spearman: visites biblioteca anual vs llibres llegits"
-    )[0]
 
-    correlations_dict["Visites biblioteca amb familia"] = {}
-    correlations_dict["Visites biblioteca amb familia"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
+@tmt.register_section(
+    "biblioteca",
+    tags=[7, 13],
+    consumes=[
+        "p10_visites_biblioteca_anual_sp",
         "biblioteca_infancia_sp",
+        "p10_visites_biblioteca",
         "p4_temps_lectura_sp",
-        "Spearman: freqüència d'anar a la biblioteca amb els pares vs temps de lectura setmanal"
-    )[0]
-
-    correlations_dict["Visites biblioteca amb familia"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "biblioteca_infancia_sp",
         "p5_llibres_sp",
-        "Spearman: freqüència d'anar a la biblioteca amb els pares vs nombre de llibres anuals llegits"
-    )[0]
+        "classificacio_lectora",
+        "p5_6_pagines_sp",
+        "classificacio_lectora_sp",
+        "Durant la teva infància i adolescència, amb quina freqüència aproximadament has anat a la biblioteca amb els teus pares o tutors legals a llegir o agafar llibres en préstec?"
+    ]
+)
+def section_biblioteca(df: pd.DataFrame) -> pd.DataFrame:
+    print("\n=======================================================================================\nVisites Biblioteca \n=======================================================================================")
+
+    # Correlations (all the pairs of each dataframe in one batch)
+    spearman = tmt.spearman_matrix(
+        df,
+        ["p10_visites_biblioteca_anual_sp", "biblioteca_infancia_sp"],
+        spearman_outcomes,
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+
+    tmt.report_spearman(spearman, [
+        ("p10_visites_biblioteca_anual_sp", "p4_temps_lectura_sp", "Spearman: visites biblioteca anual vs temps de lectura"),
+        ("p10_visites_biblioteca_anual_sp", "p5_llibres_sp", "Spearman: visites biblioteca anual vs llibres llegits"),
+        ("biblioteca_infancia_sp", "p4_temps_lectura_sp", "Spearman: freqüència d'anar a la biblioteca amb els pares vs temps de lectura setmanal"),
+        ("biblioteca_infancia_sp", "p5_llibres_sp", "Spearman: freqüència d'anar a la biblioteca amb els pares vs nombre de llibres anuals llegits")
+    ])
+
+    fill_correlations(spearman, [
+        "Visites biblioteca últim any",
+        "Visites biblioteca amb familia"
+    ])
 
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="p10_visites_biblioteca",
         title="Distribució de l'alumnat segons les visites a la biblioteca en l'últim any per oci",
         xlabel="",
@@ -1284,9 +1630,9 @@ if len(tags) > 0 and (7 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="p10_visites_biblioteca",
         title="Distribució de l'alumnat segons les visites a la biblioteca en l'últim any per oci, per classificació lectora",
@@ -1299,7 +1645,7 @@ if len(tags) > 0 and (7 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_hists(
-        df=df.copy(),
+        df=df,
         var="Durant la teva infància i adolescència, amb quina freqüència aproximadament has anat a la biblioteca amb els teus pares o tutors legals a llegir o agafar llibres en préstec?",
         title="Distribució de l'alumnat segons les visites a la biblioteca durant la infància i adolescència",
         xlabel="",
@@ -1308,9 +1654,9 @@ if len(tags) > 0 and (7 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Durant la teva infància i adolescència, amb quina freqüència aproximadament has anat a la biblioteca amb els teus pares o tutors legals a llegir o agafar llibres en préstec?",
         title="Distribució de l'alumnat segons les visites a la biblioteca durant la infància i adolescència, per classificació lectora",
@@ -1320,66 +1666,76 @@ if len(tags) > 0 and (7 in tags or 13 in tags):
         sort = sort_freq
     )
 
+    return df
+
+
 # =======================================================================================
 # 8. p16_lectura_obligatoria
 # =======================================================================================
-df["p16_lectura_obligatoria_sp"] = df["p16_lectura_obligatoria"].map(map_lectura_obligatoria_sp)
-df["gust_lectura_obligatoria_sp"] = df["T’agraden les lectures obligatòries de l’escola? "].map(map_gust_sp)
-df["llegiria_mes_lectura_obligatoria_sp"] = df["Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més lectures obligatòries de l'escola si s'adaptessin més als meus gustos."].map(map_acord_sp)
+@tmt.register_section(
+    "lectura_obligatoria_sp",
+    consumes=[
+        "p16_lectura_obligatoria",
+        "T’agraden les lectures obligatòries de l’escola? ",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més lectures obligatòries de l'escola si s'adaptessin més als meus gustos."
+    ],
+    produces=["p16_lectura_obligatoria_sp", "gust_lectura_obligatoria_sp", "llegiria_mes_lectura_obligatoria_sp"]
+)
+def create_lectura_obligatoria_sp(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(**tmt.encode_answers(df, {
+        "p16_lectura_obligatoria_sp": ("p16_lectura_obligatoria", map_lectura_obligatoria_sp),
+        "gust_lectura_obligatoria_sp": ("T’agraden les lectures obligatòries de l’escola? ", map_gust_sp),
+        "llegiria_mes_lectura_obligatoria_sp": ("Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més lectures obligatòries de l'escola si s'adaptessin més als meus gustos.", map_acord_sp)
+    }, verbose=verbose))
 
-if len(tags) > 0 and (8 in tags or 13 in tags):
-    print("\n=======================================================================================\nLectures Obligatòries\n=======================================================================================")
-    # Correlations
-    correlations_dict["Grau de lectura obligatòria"] = {}
-    correlations_dict["Grau de lectura obligatòria"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "p16_lectura_obligatoria_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: grau de lectura obligatòria vs temps de lectura"
-    )[0]
+    return df
 
-    correlations_dict["Grau de lectura obligatòria"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "p16_lectura_obligatoria_sp",
-        "p5_llibres_sp",
-        "Spearman: grau de lectura obligatòria vs nombre de llibres anuals llegits"
-    )[0]
 
-    tmt.spearman_analysis(
-        df.copy(),
+@tmt.register_section(
+    "lectura_obligatoria",
+    tags=[8, 13],
+    consumes=[
         "p16_lectura_obligatoria_sp",
         "gust_lectura_obligatoria_sp",
-        "Spearman: gust per la lectura obligatòria vs grau de lectura obligatòria"
-    )
-
-    correlations_dict["Gust lectura obligatòria"] = {}
-    correlations_dict["Gust lectura obligatòria"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "gust_lectura_obligatoria_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: gust per la lectura obligatòria vs temps de lectura"
-    )[0]
-
-    correlations_dict["Gust lectura obligatòria"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "gust_lectura_obligatoria_sp",
-        "p5_llibres_sp",
-        "Spearman: gust per la lectura obligatòria vs nombre de llibres anuals llegits"
-    )[0]
-
-    tmt.spearman_analysis(
-        df.copy(),
-        "llegiria_mes_lectura_obligatoria_sp",
-        "p5_llibres_sp",
-        "Spearman: percepció de que llegiria més lectures obligatòries si s'adaptessin més als seus gustos vs nombre de llibres anuals llegits"
-    )
-
-    tmt.spearman_analysis(
-        df.copy(),
         "llegiria_mes_lectura_obligatoria_sp",
         "p4_temps_lectura_sp",
-        "Spearman: percepció de que llegiria més lectures obligatòries si s'adaptessin més als seus gustos vs temps de lectura"
-    )
+        "p5_llibres_sp",
+        "classificacio_lectora",
+        "p5_6_pagines_sp",
+        "classificacio_lectora_sp",
+        "p16_lectura_obligatoria",
+        "T’agraden les lectures obligatòries de l’escola? ",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: des que utilitzo eines d’IA generativa (ChatGPT, Gemini, Copilot, Claude, etc.), he reduït la lectura de les lectures obligatòries de l’escola. ",
+        "Amb quina freqüència utilitzes resums d’internet o eines digitals (com IA generativa) per consultar el contingut de les lectures obligatòries de l’escola?",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més lectures obligatòries de l'escola si s'adaptessin més als meus gustos."
+    ]
+)
+def section_lectura_obligatoria(df: pd.DataFrame) -> pd.DataFrame:
+    print("\n=======================================================================================\nLectures Obligatòries\n=======================================================================================")
+    # Correlations (all the pairs of each dataframe in one batch)
+    spearman = tmt.spearman_matrix(
+        df,
+        ["p16_lectura_obligatoria_sp", "gust_lectura_obligatoria_sp", "llegiria_mes_lectura_obligatoria_sp"],
+        spearman_outcomes,
+        extra_pairs=[("p16_lectura_obligatoria_sp", "gust_lectura_obligatoria_sp")],
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+
+    tmt.report_spearman(spearman, [
+        ("p16_lectura_obligatoria_sp", "p4_temps_lectura_sp", "Spearman: grau de lectura obligatòria vs temps de lectura"),
+        ("p16_lectura_obligatoria_sp", "p5_llibres_sp", "Spearman: grau de lectura obligatòria vs nombre de llibres anuals llegits"),
+        ("p16_lectura_obligatoria_sp", "gust_lectura_obligatoria_sp", "Spearman: gust per la lectura obligatòria vs grau de lectura obligatòria"),
+        ("gust_lectura_obligatoria_sp", "p4_temps_lectura_sp", "Spearman: gust per la lectura obligatòria vs temps de lectura"),
+        ("gust_lectura_obligatoria_sp", "p5_llibres_sp", "Spearman: gust per la lectura obligatòria vs nombre de llibres anuals llegits"),
+        ("llegiria_mes_lectura_obligatoria_sp", "p5_llibres_sp", "Spearman: percepció de que llegiria més lectures obligatòries si s'adaptessin més als seus gustos vs nombre de llibres anuals llegits"),
+        ("llegiria_mes_lectura_obligatoria_sp", "p4_temps_lectura_sp", "Spearman: percepció de que llegiria més lectures obligatòries si s'adaptessin més als seus gustos vs temps de lectura")
+    ])
+
+    fill_correlations(spearman, [
+        "Grau de lectura obligatòria",
+        "Gust lectura obligatòria"
+    ])
 
     tmt.plot_descriptive_hists(
         df=df,
@@ -1438,9 +1794,9 @@ if len(tags) > 0 and (8 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         var="T’agraden les lectures obligatòries de l’escola? ",
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         title="Distribució de l'alumnat segons el gust per les lectures obligatòries de l’escola per classificació lectora",
@@ -1451,9 +1807,9 @@ if len(tags) > 0 and (8 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         var="p16_lectura_obligatoria",
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         title="Distribució de l'alumnat que llegeix les lectures obligatòries de l’escola per classificació lectora",
@@ -1466,9 +1822,9 @@ if len(tags) > 0 and (8 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         var="Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més lectures obligatòries de l'escola si s'adaptessin més als meus gustos.",
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         title="Percepció que llegirien més les lectures obligatòries si s'adaptessin més als seus gustos, per classificació lectora",
@@ -1477,62 +1833,78 @@ if len(tags) > 0 and (8 in tags or 13 in tags):
         colors=["blue", "orange", "green"],
         sort=sort_acords
     )
-    
+
+    return df
+
+
 # =======================================================================================
 # 9. Narrativa social adolescent sobre la lectura
 # =======================================================================================
-df["percepcio_individual_lectura_sp"] = df["Amb quina de les següents afirmacions t’identifiques més?"].map(map_afirmacio_sp)
-df["percepcio_social_lectura_sp"] = df["En general, creus que llegir per oci entre els nois i noies de la teva edat és vist com:"].map(map_com_es_veu_sp)
-df["compartir_sp"] = df["Comparteixes opinions de lectura sobre llibres o còmics que has llegit o estàs llegint amb altres persones? (Amics, família, companys de classe, companys d’activitats extraescolars, etc.)."].map(map_freq_sp)
+@tmt.register_section(
+    "narrativa_sp",
+    consumes=[
+        "Amb quina de les següents afirmacions t’identifiques més?",
+        "En general, creus que llegir per oci entre els nois i noies de la teva edat és vist com:",
+        "Comparteixes opinions de lectura sobre llibres o còmics que has llegit o estàs llegint amb altres persones? (Amics, família, companys de classe, companys d’activitats extraescolars, etc.)."
+    ],
+    produces=["percepcio_individual_lectura_sp", "percepcio_social_lectura_sp", "compartir_sp"]
+)
+def create_narrativa_sp(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(**tmt.encode_answers(df, {
+        "percepcio_individual_lectura_sp": ("Amb quina de les següents afirmacions t’identifiques més?", map_afirmacio_sp),
+        "percepcio_social_lectura_sp": ("En general, creus que llegir per oci entre els nois i noies de la teva edat és vist com:", map_com_es_veu_sp),
+        "compartir_sp": ("Comparteixes opinions de lectura sobre llibres o còmics que has llegit o estàs llegint amb altres persones? (Amics, família, companys de classe, companys d’activitats extraescolars, etc.).", map_freq_sp)
+    }, verbose=verbose))
 
-# Grau de lectura
-if len(tags) > 0 and (9 in tags or 13 in tags):
-    print("\n=======================================================================================\nNarrativa Social\n=======================================================================================")
-    # Correlacions
-    correlations_dict["Percepció social lectura"] = {}
-    correlations_dict["Percepció social lectura"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "percepcio_social_lectura_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: percepció social sobre la lectura vs temps de lectura"
-    )[0]
-    
-    correlations_dict["Percepció social lectura"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "percepcio_social_lectura_sp",
-        "p5_llibres_sp",
-        "Spearman: percepció social sobre la lectura vs nombre de llibres anuals llegits"
-    )[0]
+    # Grau de lectura
 
-    correlations_dict["Percepció personal lectura"] = {}
-    correlations_dict["Percepció personal lectura"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "percepcio_individual_lectura_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: percepció individual sobre la lectura vs temps de lectura"
-    )[0]
+    return df
 
-    correlations_dict["Percepció personal lectura"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "percepcio_individual_lectura_sp",
-        "p5_llibres_sp",
-        "Spearman: percepció individual sobre la lectura vs nombre de llibres anuals llegits"
-    )[0]
 
-    correlations_dict["Compartir opinions de lectura"] = {}
-    correlations_dict["Compartir opinions de lectura"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
+@tmt.register_section(
+    "narrativa",
+    tags=[9, 13],
+    consumes=[
+        "percepcio_individual_lectura_sp",
+        "percepcio_social_lectura_sp",
         "compartir_sp",
         "p4_temps_lectura_sp",
-        "Spearman: freqüència de compartir opinions de lectura vs temps de lectura"
-    )[0]
-
-    correlations_dict["Compartir opinions de lectura"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "compartir_sp",
         "p5_llibres_sp",
-        "Spearman: freqüència de compartir opinions de lectura vs nombre de llibres anuals llegits"
-    )[0]
+        "classificacio_lectora",
+        "p5_6_pagines_sp",
+        "classificacio_lectora_sp",
+        "Amb quina de les següents afirmacions t’identifiques més?",
+        "En general, creus que llegir per oci entre els nois i noies de la teva edat és vist com:",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: si els meus amics o companys de classe llegissin habitualment i parlessin sovint de llibres o còmics, jo també llegiria més.",
+        "Comparteixes opinions de lectura sobre llibres o còmics que has llegit o estàs llegint amb altres persones? (Amics, família, companys de classe, companys d’activitats extraescolars, etc.)."
+    ]
+)
+def section_narrativa(df: pd.DataFrame) -> pd.DataFrame:
+    print("\n=======================================================================================\nNarrativa Social\n=======================================================================================")
+    # Correlacions
+    # Correlations (all the pairs of each dataframe in one batch)
+    spearman = tmt.spearman_matrix(
+        df,
+        ["percepcio_social_lectura_sp", "percepcio_individual_lectura_sp", "compartir_sp"],
+        spearman_outcomes,
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+
+    tmt.report_spearman(spearman, [
+        ("percepcio_social_lectura_sp", "p4_temps_lectura_sp", "Spearman: percepció social sobre la lectura vs temps de lectura"),
+        ("percepcio_social_lectura_sp", "p5_llibres_sp", "Spearman: percepció social sobre la lectura vs nombre de llibres anuals llegits"),
+        ("percepcio_individual_lectura_sp", "p4_temps_lectura_sp", "Spearman: percepció individual sobre la lectura vs temps de lectura"),
+        ("percepcio_individual_lectura_sp", "p5_llibres_sp", "Spearman: percepció individual sobre la lectura vs nombre de llibres anuals llegits"),
+        ("compartir_sp", "p4_temps_lectura_sp", "Spearman: freqüència de compartir opinions de lectura vs temps de lectura"),
+        ("compartir_sp", "p5_llibres_sp", "Spearman: freqüència de compartir opinions de lectura vs nombre de llibres anuals llegits")
+    ])
+
+    fill_correlations(spearman, [
+        "Percepció social lectura",
+        "Percepció personal lectura",
+        "Compartir opinions de lectura"
+    ])
 
     # fig, axs = plt.subplots(1, 2, figsize=(18, 12))
     # axs = axs.flatten()
@@ -1582,9 +1954,9 @@ if len(tags) > 0 and (9 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-    df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-    df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-    df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+    df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+    df[df["classificacio_lectora"] == "Lector ocasional"],
+    df[df["classificacio_lectora"] == "Lector habitual"],
     groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
     var="Comparteixes opinions de lectura sobre llibres o còmics que has llegit o estàs llegint amb altres persones? (Amics, família, companys de classe, companys d’activitats extraescolars, etc.).",
     title="Distribució de l'alumnat segons la freqüència amb què comparteixen opinions sobre lectures, per classificació lectora",
@@ -1597,9 +1969,9 @@ if len(tags) > 0 and (9 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-    df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-    df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-    df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+    df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+    df[df["classificacio_lectora"] == "Lector ocasional"],
+    df[df["classificacio_lectora"] == "Lector habitual"],
     groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
     var="Amb quina de les següents afirmacions t’identifiques més?",
     title="Distribució de l'alumnat segons la seva percepció personal sobre l'activitat de llegit per oci, per classificació lectora",
@@ -1611,100 +1983,87 @@ if len(tags) > 0 and (9 in tags or 13 in tags):
     figure_path="../latex/pictures/9_narrativa_personal_class"
     )
 
+    return df
 
 
 # =======================================================================================
 # 10. TRIC
 # =======================================================================================
-df["consumir_contingut_sp"] = df["Veus o escoltes continguts audiovisuals relacionats amb literatura, llibres o còmics per oci?"].map(map_freq_sp)
-df["tecnos"] = df["Quant temps al dia dediques, de mitjana, a l’ús de dispositius digitals per a l’oci? (Mòbil, Ordinador, Tablet, Televisió, Smart-watch, etc.)."].map(map_tric_sp)
-df["xarxes"] = df["Quant temps al dia dediques, de mitjana, a utilitzar xarxes socials o veure contingut audiovisual ràpid? (Instagram, TikTok, WhatsApp, X, Telegram, Facebook, Shorts de YouTube)."].map(map_tric_sp)
-df["plataformes_streaming"] = df[
-    "Quant temps al dia dediques, de mitjana, a veure o sentir contingut audiovisual en Plataformes com Netflix, YouTube, Twitch, Canals de Televisió, Amazon Prime, Spotify, Movistar +, DAZN? (Ja sigui en format vídeo gravat, vídeo en streaming o pòdcast)"
-].map(map_tric_sp)
-
-df["videojocs"] = df[
-    "Quant temps al dia dediques, de mitjana, a jugar a videojocs. (Ja sigui en PlayStation, Xbox, PC, mòbil, Nintendo Switch, Nintendo DS, etc.)."
-].map(map_tric_sp)
-
-
-if len(tags) > 0 and (10 in tags or 13 in tags):
-    print("\n=======================================================================================\nTRIC\n=======================================================================================")
-    # Correlations
-    correlations_dict["Consumir contingut sobre lectura"] = {}
-    correlations_dict["Consumir contingut sobre lectura"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "consumir_contingut_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: consum de contingut audiovisual vs temps de lectura"
-    )[0]
-
-    correlations_dict["Consumir contingut sobre lectura"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
+@tmt.register_section(
+    "tric_sp",
+    consumes=[
+        "Veus o escoltes continguts audiovisuals relacionats amb literatura, llibres o còmics per oci?",
+        "Quant temps al dia dediques, de mitjana, a l’ús de dispositius digitals per a l’oci? (Mòbil, Ordinador, Tablet, Televisió, Smart-watch, etc.).",
+        "Quant temps al dia dediques, de mitjana, a utilitzar xarxes socials o veure contingut audiovisual ràpid? (Instagram, TikTok, WhatsApp, X, Telegram, Facebook, Shorts de YouTube).",
+        "Quant temps al dia dediques, de mitjana, a veure o sentir contingut audiovisual en Plataformes com Netflix, YouTube, Twitch, Canals de Televisió, Amazon Prime, Spotify, Movistar +, DAZN? (Ja sigui en format vídeo gravat, vídeo en streaming o pòdcast)",
+        "Quant temps al dia dediques, de mitjana, a jugar a videojocs. (Ja sigui en PlayStation, Xbox, PC, mòbil, Nintendo Switch, Nintendo DS, etc.)."
+    ],
+    produces=["consumir_contingut_sp", "tecnos", "xarxes", "plataformes_streaming", "videojocs"]
+)
+def create_tric_sp(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(**tmt.encode_answers(df, {
+        "consumir_contingut_sp": ("Veus o escoltes continguts audiovisuals relacionats amb literatura, llibres o còmics per oci?", map_freq_sp),
+        "tecnos": ("Quant temps al dia dediques, de mitjana, a l’ús de dispositius digitals per a l’oci? (Mòbil, Ordinador, Tablet, Televisió, Smart-watch, etc.).", map_tric_sp),
+        "xarxes": ("Quant temps al dia dediques, de mitjana, a utilitzar xarxes socials o veure contingut audiovisual ràpid? (Instagram, TikTok, WhatsApp, X, Telegram, Facebook, Shorts de YouTube).", map_tric_sp),
+        "plataformes_streaming": ("Quant temps al dia dediques, de mitjana, a veure o sentir contingut audiovisual en Plataformes com Netflix, YouTube, Twitch, Canals de Televisió, Amazon Prime, Spotify, Movistar +, DAZN? (Ja sigui en format vídeo gravat, vídeo en streaming o pòdcast)", map_tric_sp),
+        "videojocs": ("Quant temps al dia dediques, de mitjana, a jugar a videojocs. (Ja sigui en PlayStation, Xbox, PC, mòbil, Nintendo Switch, Nintendo DS, etc.).", map_tric_sp)
+    }, verbose=verbose))
+
+    return df
+
+
+@tmt.register_section(
+    "tric",
+    tags=[10, 13],
+    consumes=[
         "consumir_contingut_sp",
-        "p5_llibres_sp",
-        "Spearman: consum de contingut audiovisual vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Temps dispositius digitals"] = {}
-    correlations_dict["Temps dispositius digitals"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "tecnos",
-        "p4_temps_lectura_sp",
-        "Spearman: temps dedicat a l’ús de dispositius digitals per a l’oci vs temps de lectura"
-    )[0]
-
-    correlations_dict["Temps dispositius digitals"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
         "tecnos",
-        "p5_llibres_sp",
-        "Spearman: temps dedicat a l’ús de dispositius digitals per a l’oci vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Temps xarxes socials"] = {}
-    correlations_dict["Temps xarxes socials"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
         "xarxes",
-        "p4_temps_lectura_sp",
-        "Spearman: temps dedicat a l’ús de xarxes socials vs temps de lectura"
-    )[0]
-
-    correlations_dict["Temps xarxes socials"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "xarxes",
-        "p5_llibres_sp",
-        "Spearman: temps dedicat a l’ús de xarxes socials vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Temps contingut audiovisual"] = {}
-    correlations_dict["Temps contingut audiovisual"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
         "plataformes_streaming",
-        "p4_temps_lectura_sp",
-        "Spearman: temps dedicat a veure contingut en plataformes de streaming vs temps de lectura"
-    )[0]
-
-    correlations_dict["Temps contingut audiovisual"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "plataformes_streaming",
-        "p5_llibres_sp",
-        "Spearman: temps dedicat a veure contingut en plataformes de streaming vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Temps videojocs"] = {}
-    correlations_dict["Temps videojocs"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
         "videojocs",
         "p4_temps_lectura_sp",
-        "Spearman: temps dedicat a jugar a videojocs vs temps de lectura"
-    )[0]
-
-    correlations_dict["Temps videojocs"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "videojocs",
         "p5_llibres_sp",
-        "Spearman: temps dedicat a jugar a videojocs vs nombre de llibres anuals llegits"
-    )[0]
+        "classificacio_lectora",
+        "p5_6_pagines_sp",
+        "classificacio_lectora_sp",
+        "Quant temps al dia dediques, de mitjana, a l’ús de dispositius digitals per a l’oci? (Mòbil, Ordinador, Tablet, Televisió, Smart-watch, etc.).",
+        "Quant temps al dia dediques, de mitjana, a utilitzar xarxes socials o veure contingut audiovisual ràpid? (Instagram, TikTok, WhatsApp, X, Telegram, Facebook, Shorts de YouTube).",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més llibres o còmics si dediqués menys temps a les xarxes socials i plataformes de videos curts? . (Instagram, TikTok, WhatsApp, X, Telegram, Facebook, Shorts de YouTube).",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més llibres o còmics si dediqués menys temps a videojocs (PlayStation, PC, mòbil, etc.) i/o plataformes de contingut audiovisual.  (Netflix, YouTube, Twitch, canals de televisió, Amazon Prime, HBO, Disney +, Movistar +, DAZN).",
+        "Veus o escoltes continguts audiovisuals relacionats amb literatura, llibres o còmics per oci?"
+    ]
+)
+def section_tric(df: pd.DataFrame) -> pd.DataFrame:
+    print("\n=======================================================================================\nTRIC\n=======================================================================================")
+    # Correlations (all the pairs of each dataframe in one batch)
+    spearman = tmt.spearman_matrix(
+        df,
+        ["consumir_contingut_sp", "tecnos", "xarxes", "plataformes_streaming", "videojocs"],
+        spearman_outcomes,
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+
+    tmt.report_spearman(spearman, [
+        ("consumir_contingut_sp", "p4_temps_lectura_sp", "Spearman: consum de contingut audiovisual vs temps de lectura"),
+        ("consumir_contingut_sp", "p5_llibres_sp", "Spearman: consum de contingut audiovisual vs nombre de llibres anuals llegits"),
+        ("tecnos", "p4_temps_lectura_sp", "Spearman: temps dedicat a l’ús de dispositius digitals per a l’oci vs temps de lectura"),
+        ("tecnos", "p5_llibres_sp", "Spearman: temps dedicat a l’ús de dispositius digitals per a l’oci vs nombre de llibres anuals llegits"),
+        ("xarxes", "p4_temps_lectura_sp", "Spearman: temps dedicat a l’ús de xarxes socials vs temps de lectura"),
+        ("xarxes", "p5_llibres_sp", "Spearman: temps dedicat a l’ús de xarxes socials vs nombre de llibres anuals llegits"),
+        ("plataformes_streaming", "p4_temps_lectura_sp", "Spearman: temps dedicat a veure contingut en plataformes de streaming vs temps de lectura"),
+        ("plataformes_streaming", "p5_llibres_sp", "Spearman: temps dedicat a veure contingut en plataformes de streaming vs nombre de llibres anuals llegits"),
+        ("videojocs", "p4_temps_lectura_sp", "Spearman: temps dedicat a jugar a videojocs vs temps de lectura"),
+        ("videojocs", "p5_llibres_sp", "Spearman: temps dedicat a jugar a videojocs vs nombre de llibres anuals llegits")
+    ])
+
+    fill_correlations(spearman, [
+        "Consumir contingut sobre lectura",
+        "Temps dispositius digitals",
+        "Temps xarxes socials",
+        "Temps contingut audiovisual",
+        "Temps videojocs"
+    ])
 
     # Plots Xarxes socials ------------------
     tmt.plot_descriptive_hists(
@@ -1731,9 +2090,9 @@ if len(tags) > 0 and (10 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Quant temps al dia dediques, de mitjana, a utilitzar xarxes socials o veure contingut audiovisual ràpid? (Instagram, TikTok, WhatsApp, X, Telegram, Facebook, Shorts de YouTube).",
         title="Distribució de l'alumnat segons temps diari dedicat a x.socials o contingut audiovisual ràpid per class. lectora",
@@ -1779,9 +2138,9 @@ if len(tags) > 0 and (10 in tags or 13 in tags):
     )
 
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Veus o escoltes continguts audiovisuals relacionats amb literatura, llibres o còmics per oci?",
         title="Distribució alumnat segons freq. de consum de contingut audiovisual sobre lectura, per classificació lectora",
@@ -1793,85 +2152,87 @@ if len(tags) > 0 and (10 in tags or 13 in tags):
         figure_path="../latex/pictures/10_tric_lite_class"
     )
 
+    return df
+
+
 # =======================================================================================
 # 11. Altres activitats
 # =======================================================================================
-df["estudi_sp"] = df["Quant temps al dia dediques, de mitjana, a l’estudi i la realització de tasques acadèmiques fora de l’horari escolar? (Exàmens, deures, treballs, etc.)"].map(map_tric_sp)
-
-df["cultura_sp"] = df["Quant temps al dia dediques, de mitjana, a realitzar activitats relacionades amb la cultura fora de l’horari escolar? (Música, dansa, teatre, pintura, escriptura, visites a museus, etc.)."].map(map_tric_sp)
-
-df["sport_sp"] = df["Quant temps al dia dediques, de mitjana, a la pràctica d’esport fora de l’horari escolar? (Futbol, bàsquet, atletisme, ciclisme, natació, ioga, gym, senderisme, tenis, pàdel, ping-pong, etc.)."].map(map_sport_sp)
+@tmt.register_section(
+    "altres_activitats_sp",
+    consumes=[
+        "Quant temps al dia dediques, de mitjana, a l’estudi i la realització de tasques acadèmiques fora de l’horari escolar? (Exàmens, deures, treballs, etc.)",
+        "Quant temps al dia dediques, de mitjana, a realitzar activitats relacionades amb la cultura fora de l’horari escolar? (Música, dansa, teatre, pintura, escriptura, visites a museus, etc.).",
+        "Quant temps al dia dediques, de mitjana, a la pràctica d’esport fora de l’horari escolar? (Futbol, bàsquet, atletisme, ciclisme, natació, ioga, gym, senderisme, tenis, pàdel, ping-pong, etc.).",
+        "Quant temps al dia dediques, de mitjana, a quedar amb amics / amigues o parella sentimental fora de l’horari escolar?"
+    ],
+    produces=["estudi_sp", "cultura_sp", "sport_sp", "hangout_sp"]
+)
+def create_altres_activitats_sp(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(**tmt.encode_answers(df, {
+        "estudi_sp": ("Quant temps al dia dediques, de mitjana, a l’estudi i la realització de tasques acadèmiques fora de l’horari escolar? (Exàmens, deures, treballs, etc.)", map_tric_sp),
+        "cultura_sp": ("Quant temps al dia dediques, de mitjana, a realitzar activitats relacionades amb la cultura fora de l’horari escolar? (Música, dansa, teatre, pintura, escriptura, visites a museus, etc.).", map_tric_sp),
+        "sport_sp": ("Quant temps al dia dediques, de mitjana, a la pràctica d’esport fora de l’horari escolar? (Futbol, bàsquet, atletisme, ciclisme, natació, ioga, gym, senderisme, tenis, pàdel, ping-pong, etc.).", map_sport_sp),
+        "hangout_sp": ("Quant temps al dia dediques, de mitjana, a quedar amb amics / amigues o parella sentimental fora de l’horari escolar?", map_tric_sp)
+    }, verbose=verbose))
 
-df["hangout_sp"] = df["Quant temps al dia dediques, de mitjana, a quedar amb amics / amigues o parella sentimental fora de l’horari escolar?"].map(map_tric_sp)
+    return df
 
-if len(tags) > 0 and (11 in tags or 13 in tags):
-    print("\n=======================================================================================\nAltres Activitats\n=======================================================================================")
-    # Correlations
-    correlations_dict["Carrega lectiva fora d'horari"] = {}
-    correlations_dict["Carrega lectiva fora d'horari"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "estudi_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: temps dedicat a l’estudi vs temps de lectura"
-    )[0]
 
-    correlations_dict["Carrega lectiva fora d'horari"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
+@tmt.register_section(
+    "altres_activitats",
+    tags=[11, 13],
+    consumes=[
         "estudi_sp",
-        "p5_llibres_sp",
-        "Spearman: temps dedicat a l’estudi vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Temps activitats culturals"] = {}
-    correlations_dict["Temps activitats culturals"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "cultura_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: temps dedicat a activitats culturals vs temps de lectura"
-    )[0]
-
-    correlations_dict["Temps activitats culturals"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
         "cultura_sp",
-        "p5_llibres_sp",
-        "Spearman: temps dedicat a activitats culturals vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Temps esport"] = {}
-    correlations_dict["Temps esport"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
         "sport_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: temps dedicat a la pràctica d’esport vs temps de lectura"
-    )[0]
-
-    correlations_dict["Temps esport"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "sport_sp",
-        "p5_llibres_sp",
-        "Spearman: temps dedicat a la pràctica d’esport vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Temps quedar amics / parella"] = {}
-    correlations_dict["Temps quedar amics / parella"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
         "hangout_sp",
         "p4_temps_lectura_sp",
-        "Spearman: temps dedicat a quedar amb amics / amigues o parella sentimental vs temps de lectura"
-    )[0]
-
-    correlations_dict["Temps quedar amics / parella"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "hangout_sp",
         "p5_llibres_sp",
-        "Spearman: temps dedicat a quedar amb amics / amigues o parella sentimental vs nombre de llibres anuals llegits"
-    )[0]
+        "classificacio_lectora",
+        "p5_6_pagines_sp",
+        "classificacio_lectora_sp",
+        "Quant temps al dia dediques, de mitjana, a realitzar activitats relacionades amb la cultura fora de l’horari escolar? (Música, dansa, teatre, pintura, escriptura, visites a museus, etc.).",
+        "Quant temps al dia dediques, de mitjana, a quedar amb amics / amigues o parella sentimental fora de l’horari escolar?",
+        "Quant temps al dia dediques, de mitjana, a l’estudi i la realització de tasques acadèmiques fora de l’horari escolar? (Exàmens, deures, treballs, etc.)",
+        "Quant temps al dia dediques, de mitjana, a la pràctica d’esport fora de l’horari escolar? (Futbol, bàsquet, atletisme, ciclisme, natació, ioga, gym, senderisme, tenis, pàdel, ping-pong, etc.).",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: llegiria més llibres o còmics si tingués menys càrrega acadèmica fora d'horari escolar. (Exàmens, deures, treballs, etc.)"
+    ]
+)
+def section_altres_activitats(df: pd.DataFrame) -> pd.DataFrame:
+    print("\n=======================================================================================\nAltres Activitats\n=======================================================================================")
+    # Correlations (all the pairs of each dataframe in one batch)
+    spearman = tmt.spearman_matrix(
+        df,
+        ["estudi_sp", "cultura_sp", "sport_sp", "hangout_sp"],
+        spearman_outcomes,
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+
+    tmt.report_spearman(spearman, [
+        ("estudi_sp", "p4_temps_lectura_sp", "Spearman: temps dedicat a l’estudi vs temps de lectura"),
+        ("estudi_sp", "p5_llibres_sp", "Spearman: temps dedicat a l’estudi vs nombre de llibres anuals llegits"),
+        ("cultura_sp", "p4_temps_lectura_sp", "Spearman: temps dedicat a activitats culturals vs temps de lectura"),
+        ("cultura_sp", "p5_llibres_sp", "Spearman: temps dedicat a activitats culturals vs nombre de llibres anuals llegits"),
+        ("sport_sp", "p4_temps_lectura_sp", "Spearman: temps dedicat a la pràctica d’esport vs temps de lectura"),
+        ("sport_sp", "p5_llibres_sp", "Spearman: temps dedicat a la pràctica d’esport vs nombre de llibres anuals llegits"),
+        ("hangout_sp", "p4_temps_lectura_sp", "Spearman: temps dedicat a quedar amb amics / amigues o parella sentimental vs temps de lectura"),
+        ("hangout_sp", "p5_llibres_sp", "Spearman: temps dedicat a quedar amb amics / amigues o parella sentimental vs nombre de llibres anuals llegits")
+    ])
+
+    fill_correlations(spearman, [
+        "Carrega lectiva fora d'horari",
+        "Temps activitats culturals",
+        "Temps esport",
+        "Temps quedar amics / parella"
+    ])
 
     # Plots Cultura ------------------
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Quant temps al dia dediques, de mitjana, a realitzar activitats relacionades amb la cultura fora de l’horari escolar? (Música, dansa, teatre, pintura, escriptura, visites a museus, etc.).",
         title="Distribució de l'alumnat segons temps dedicat a activitats culturals fora de l’horari escolar per class. lectora",
@@ -1885,9 +2246,9 @@ if len(tags) > 0 and (11 in tags or 13 in tags):
 
     # Plots Hangout ------------------
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Quant temps al dia dediques, de mitjana, a quedar amb amics / amigues o parella sentimental fora de l’horari escolar?",
         title="Distribució de l'alumnat segons temps dedicat a quedar amb amics o parella per class. lectora",
@@ -1901,9 +2262,9 @@ if len(tags) > 0 and (11 in tags or 13 in tags):
 
     # Plots Study ------------------
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Quant temps al dia dediques, de mitjana, a l’estudi i la realització de tasques acadèmiques fora de l’horari escolar? (Exàmens, deures, treballs, etc.)",
         title="Distribució de l'alumnat segons temps dedicat a l’estudi i tasques acadèmiques per class. lectora",
@@ -1915,9 +2276,9 @@ if len(tags) > 0 and (11 in tags or 13 in tags):
 
     # Plots Sport ------------------
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Quant temps al dia dediques, de mitjana, a la pràctica d’esport fora de l’horari escolar? (Futbol, bàsquet, atletisme, ciclisme, natació, ioga, gym, senderisme, tenis, pàdel, ping-pong, etc.).",
         title="Distribució de l'alumnat segons temps dedicat a la pràctica d’esport per class. lectora",
@@ -1939,114 +2300,98 @@ if len(tags) > 0 and (11 in tags or 13 in tags):
     figure_path="../latex/pictures/11_altres_perc"
     )
 
+    return df
+
+
 # =======================================================================================
 # 12. Entorn familiar pro-lector
 # =======================================================================================
-df["estudis_familiars_sp"] = df["Quin és el nivell d’estudis més alt dels teus pares o tutors legals?"].map(map_estudis_familiars_sp)
-df["vist_pares_lectura_sp"] = df["Durant la teva infància i adolescència, amb quina freqüència has vist als teus pares o tutors legals llegint llibres o còmics per oci?"].map(map_freq_sp)
-df["parlat_pares_lectura_sp"] = df["Durant la teva infància i adolescència, amb quina freqüència has parlat amb els teus pares o tutors legals sobre literatura, llibres o còmics?"].map(map_freq_sp)
-df["sessions_lectura_familiars_sp"] = df["Durant la teva infància i adolescència, amb quina freqüència heu realitzat sessions de lectura conjunta a casa?"].map(map_freq_sp)
-df["normes_clares_tric_sp"] = df["Fins a quin punt estàs d'acord amb la següent afirmació: a casa meva hi ha normes clares sobre el temps que puc dedicar a les pantalles i dispositius digitals."].map(map_acord_sp)
-df["num_llibres_sp"] = df["Quants llibres aproximadament heu tingut a casa durant la teva infància i adolescència?"].map(map_num_llibres_sp)
-
-if len(tags) > 0 and (12 in tags or 13 in tags):
-    print("\n=======================================================================================\nEntorn Familiar Pro-Lector\n=======================================================================================")
-    # Correlacions
-    correlations_dict["Nivell d'estudis pares"] = {}
-    correlations_dict["Nivell d'estudis pares"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "estudis_familiars_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: nivell d'estudis familiars vs temps de lectura setmanal"
-    )[0]
-
-    correlations_dict["Nivell d'estudis pares"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
+@tmt.register_section(
+    "entorn_familiar_sp",
+    consumes=[
+        "Quin és el nivell d’estudis més alt dels teus pares o tutors legals?",
+        "Durant la teva infància i adolescència, amb quina freqüència has vist als teus pares o tutors legals llegint llibres o còmics per oci?",
+        "Durant la teva infància i adolescència, amb quina freqüència has parlat amb els teus pares o tutors legals sobre literatura, llibres o còmics?",
+        "Durant la teva infància i adolescència, amb quina freqüència heu realitzat sessions de lectura conjunta a casa?",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: a casa meva hi ha normes clares sobre el temps que puc dedicar a les pantalles i dispositius digitals.",
+        "Quants llibres aproximadament heu tingut a casa durant la teva infància i adolescència?"
+    ],
+    produces=["estudis_familiars_sp", "vist_pares_lectura_sp", "parlat_pares_lectura_sp", "sessions_lectura_familiars_sp", "normes_clares_tric_sp", "num_llibres_sp"]
+)
+def create_entorn_familiar_sp(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(**tmt.encode_answers(df, {
+        "estudis_familiars_sp": ("Quin és el nivell d’estudis més alt dels teus pares o tutors legals?", map_estudis_familiars_sp),
+        "vist_pares_lectura_sp": ("Durant la teva infància i adolescència, amb quina freqüència has vist als teus pares o tutors legals llegint llibres o còmics per oci?", map_freq_sp),
+        "parlat_pares_lectura_sp": ("Durant la teva infància i adolescència, amb quina freqüència has parlat amb els teus pares o tutors legals sobre literatura, llibres o còmics?", map_freq_sp),
+        "sessions_lectura_familiars_sp": ("Durant la teva infància i adolescència, amb quina freqüència heu realitzat sessions de lectura conjunta a casa?", map_freq_sp),
+        "normes_clares_tric_sp": ("Fins a quin punt estàs d'acord amb la següent afirmació: a casa meva hi ha normes clares sobre el temps que puc dedicar a les pantalles i dispositius digitals.", map_acord_sp),
+        "num_llibres_sp": ("Quants llibres aproximadament heu tingut a casa durant la teva infància i adolescència?", map_num_llibres_sp)
+    }, verbose=verbose))
+
+    return df
+
+
+@tmt.register_section(
+    "entorn_familiar",
+    tags=[12, 13],
+    consumes=[
         "estudis_familiars_sp",
-        "p5_llibres_sp",
-        "Spearman: nivell d'estudis familiars vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Veure pares llegint"] = {}
-    correlations_dict["Veure pares llegint"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
         "vist_pares_lectura_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: freqüència de veure els pares llegint vs temps de lectura setmanal"
-    )[0]
-
-    correlations_dict["Veure pares llegint"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "vist_pares_lectura_sp",
-        "p5_llibres_sp",
-        "Spearman: freqüència de veure els pares llegint vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Parlar amb família sobre lectures"] = {}
-    correlations_dict["Parlar amb família sobre lectures"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "parlat_pares_lectura_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: freqüència de parlar amb els pares sobre lectura vs temps de lectura setmanal"
-    )[0]
-
-    correlations_dict["Parlar amb família sobre lectures"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
         "parlat_pares_lectura_sp",
-        "p5_llibres_sp",
-        "Spearman: freqüència de parlar amb els pares sobre lectura vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Sessions de lectura conjunta"] = {}
-    correlations_dict["Sessions de lectura conjunta"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
         "sessions_lectura_familiars_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: freqüència de sessions de lectura conjunta vs temps de lectura setmanal"
-    )[0]
-
-    correlations_dict["Sessions de lectura conjunta"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "sessions_lectura_familiars_sp",
-        "p5_llibres_sp",
-        "Spearman: freqüència de sessions de lectura conjunta vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Normes clares pantalles"] = {}
-    correlations_dict["Normes clares pantalles"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
-        "normes_clares_tric_sp",
-        "p4_temps_lectura_sp",
-        "Spearman: percepció de normes clares sobre lectura vs temps de lectura setmanal"
-    )[0]
-
-    correlations_dict["Normes clares pantalles"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
         "normes_clares_tric_sp",
-        "p5_llibres_sp",
-        "Spearman: percepció de normes clares sobre lectura vs nombre de llibres anuals llegits"
-    )[0]
-
-    correlations_dict["Núm. llibres a casa"] = {}
-    correlations_dict["Núm. llibres a casa"]["Temps lectura"] = tmt.spearman_analysis(
-        df.copy(),
         "num_llibres_sp",
         "p4_temps_lectura_sp",
-        "Spearman: nombre de llibres a la llar vs temps de lectura setmanal"
-    )[0]
-
-    correlations_dict["Núm. llibres a casa"]["Llibres anuals"] = tmt.spearman_analysis(
-        df.copy(),
-        "num_llibres_sp",
         "p5_llibres_sp",
-        "Spearman: nombre de llibres a la llar vs nombre de llibres anuals llegits"
-    )[0]
+        "classificacio_lectora",
+        "p5_6_pagines_sp",
+        "classificacio_lectora_sp",
+        "Quants llibres aproximadament heu tingut a casa durant la teva infància i adolescència?",
+        "Fins a quin punt estàs d'acord amb la següent afirmació: a casa meva hi ha normes clares sobre el temps que puc dedicar a les pantalles i dispositius digitals.",
+        "Durant la teva infància i adolescència, amb quina freqüència has parlat amb els teus pares o tutors legals sobre literatura, llibres o còmics?"
+    ]
+)
+def section_entorn_familiar(df: pd.DataFrame) -> pd.DataFrame:
+    print("\n=======================================================================================\nEntorn Familiar Pro-Lector\n=======================================================================================")
+    # Correlacions
+    # Correlations (all the pairs of each dataframe in one batch)
+    spearman = tmt.spearman_matrix(
+        df,
+        ["estudis_familiars_sp", "vist_pares_lectura_sp", "parlat_pares_lectura_sp", "sessions_lectura_familiars_sp", "normes_clares_tric_sp", "num_llibres_sp"],
+        spearman_outcomes,
+        bootstrap=spearman_bootstrap,
+        seed=bootstrap_seed
+    )
+
+    tmt.report_spearman(spearman, [
+        ("estudis_familiars_sp", "p4_temps_lectura_sp", "Spearman: nivell d'estudis familiars vs temps de lectura setmanal"),
+        ("estudis_familiars_sp", "p5_llibres_sp", "Spearman: nivell d'estudis familiars vs nombre de llibres anuals llegits"),
+        ("vist_pares_lectura_sp", "p4_temps_lectura_sp", "Spearman: freqüència de veure els pares llegint vs temps de lectura setmanal"),
+        ("vist_pares_lectura_sp", "p5_llibres_sp", "Spearman: freqüència de veure els pares llegint vs nombre de llibres anuals llegits"),
+        ("parlat_pares_lectura_sp", "p4_temps_lectura_sp", "Spearman: freqüència de parlar amb els pares sobre lectura vs temps de lectura setmanal"),
+        ("parlat_pares_lectura_sp", "p5_llibres_sp", "Spearman: freqüència de parlar amb els pares sobre lectura vs nombre de llibres anuals llegits"),
+        ("sessions_lectura_familiars_sp", "p4_temps_lectura_sp", "Spearman: freqüència de sessions de lectura conjunta vs temps de lectura setmanal"),
+        ("sessions_lectura_familiars_sp", "p5_llibres_sp", "Spearman: freqüència de sessions de lectura conjunta vs nombre de llibres anuals llegits"),
+        ("normes_clares_tric_sp", "p4_temps_lectura_sp", "Spearman: percepció de normes clares sobre lectura vs temps de lectura setmanal"),
+        ("normes_clares_tric_sp", "p5_llibres_sp", "Spearman: percepció de normes clares sobre lectura vs nombre de llibres anuals llegits"),
+        ("num_llibres_sp", "p4_temps_lectura_sp", "Spearman: nombre de llibres a la llar vs temps de lectura setmanal"),
+        ("num_llibres_sp", "p5_llibres_sp", "Spearman: nombre de llibres a la llar vs nombre de llibres anuals llegits")
+    ])
+
+    fill_correlations(spearman, [
+        "Nivell d'estudis pares",
+        "Veure pares llegint",
+        "Parlar amb família sobre lectures",
+        "Sessions de lectura conjunta",
+        "Normes clares pantalles",
+        "Núm. llibres a casa"
+    ])
 
     # Plot Num llibres biblioteca ------------------
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Quants llibres aproximadament heu tingut a casa durant la teva infància i adolescència?",
         title="Distribució de l'alumnat segons nombre aprox. de llibres que han tingut a casa per classificació lectora",
@@ -2060,9 +2405,9 @@ if len(tags) > 0 and (12 in tags or 13 in tags):
 
     # Plot normes clares ------------------
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Fins a quin punt estàs d'acord amb la següent afirmació: a casa meva hi ha normes clares sobre el temps que puc dedicar a les pantalles i dispositius digitals.",
         title="Distribució de l'alumnat segons normes clares sobre el temps de pantalles i dispositius digitals per class. lectora",
@@ -2076,9 +2421,9 @@ if len(tags) > 0 and (12 in tags or 13 in tags):
 
     # Plot parlar pares literatura ------------------
     tmt.plot_descriptive_combined_hists(
-        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector ocasional"].copy(),
-        df[df["classificacio_lectora"] == "Lector habitual"].copy(),
+        df[df["classificacio_lectora"] == "No lector / Lector molt ocasional"],
+        df[df["classificacio_lectora"] == "Lector ocasional"],
+        df[df["classificacio_lectora"] == "Lector habitual"],
         groups=["No lector / Lector molt ocasional", "Lector ocasional", "Lector habitual"],
         var="Durant la teva infància i adolescència, amb quina freqüència has parlat amb els teus pares o tutors legals sobre literatura, llibres o còmics?",
         title="Distribució de l'alumnat segons freqüència de compartir a casa opinions sobre literatura per class. lectora",
@@ -2090,18 +2435,356 @@ if len(tags) > 0 and (12 in tags or 13 in tags):
         figure_path="../latex/pictures/12_familia_compartir"
     )
 
-if len(tags) > 0 and 13 not in tags and tmt.ask_to_plot() == "y":
-    plt.show()
+    return df
+
 
 # =======================================================================================
 # 13. Heatmap de correlacions
 # =======================================================================================
-if len(tags) > 0 and 13 in tags:
+@tmt.register_section("heatmap", tags=[13])
+def section_heatmap(df: pd.DataFrame) -> pd.DataFrame:
+    import matplotlib.pyplot as plt
+
     print("\n=======================================================================================\nHeatmap de Correlacions\n=======================================================================================")
+    if verbose:
+        print(tmt.correlations_table(correlations_dict, heatmap_measure).to_string())
+
     plt.close("all")
-    tmt.plot_spearman_heatmap(correlations_dict, save_figures=save_figures, figure_path="../latex/pictures/13_heatmap")
+    tmt.plot_spearman_heatmap(
+        correlations_dict,
+        measure=heatmap_measure,
+        significance=heatmap_significance,
+        correction=heatmap_correction,
+        save_figures=save_figures,
+        figure_path="../latex/pictures/13_heatmap"
+    )
     plt.show()
 
+    return df
+
+
+# =======================================================================================
+# 14. Correlacions del heatmap estratificades per Curs i Gènere
+# =======================================================================================
+@tmt.register_section(
+    "estratificat",
+    tags=[14],
+    consumes=stratify_by + list(heatmap_outcomes.values()) + list(heatmap_predictors.values())
+)
+def section_estratificat(df: pd.DataFrame) -> pd.DataFrame:
+    import matplotlib.pyplot as plt
+
+    print("\n=======================================================================================\nCorrelacions estratificades\n=======================================================================================")
+    plt.close("all")
+
+    row_labels = {predictor: row for row, predictor in heatmap_predictors.items()}
+    column_labels = {outcome: column for column, outcome in heatmap_outcomes.items()}
+
+    for by in stratify_by:
+        # ρ de totes les files del heatmap per grup en un sol pas (group x predictor x outcome)
+        strata = tmt.spearman_matrix(
+            df,
+            list(heatmap_predictors.values()),
+            list(heatmap_outcomes.values()),
+            by=by,
+            bootstrap=spearman_bootstrap,
+            seed=bootstrap_seed
+        )
+
+        # ρ combinat dels grups (Fisher z ponderat per n - 3)
+        pooled = tmt.pool_strata(strata).rename(index=row_labels, level="var1").rename(index=column_labels, level="var2")
+        print(f"Spearman estratificat per {by} (ρ combinat, Fisher z ponderat)")
+        print(pooled.to_string(float_format="{:.3f}".format))
+        print("--------------------------------------------------------")
+
+        grid = {
+            group: {
+                row: heatmap_cells(strata.xs(group, level=by), predictor)
+                for row, predictor in heatmap_predictors.items()
+            }
+            for group in strata.index.get_level_values(by).unique()
+        }
+        tmt.plot_spearman_heatmap_grid(
+            grid,
+            title=f"Correlacions de Spearman per {by}",
+            measure=heatmap_measure,
+            significance=heatmap_significance,
+            correction=heatmap_correction,
+            save_figures=save_figures,
+            figure_path=f"../latex/pictures/14_heatmap_{by}"
+        )
+
+    return df
+
+
+# =======================================================================================
+# 15. Correlacions policòriques dels blocs Likert
+# =======================================================================================
+# Ítems ordinals dels blocs (etiqueta: columna)
+polychoric_items = {
+    # Narrativa (sort_afirmacio) i percepció de la lectura
+    "Percepció individual lectura": "percepcio_individual_lectura_sp",
+    "Percepció social lectura": "percepcio_social_lectura_sp",
+    # Freqüència i acord (map_freq_sp, map_acord_sp)
+    "Compartir opinions lectura": "compartir_sp",
+    "Consum contingut literari": "consumir_contingut_sp",
+    "Lectura amb música o vídeos": "doble_tasca_sp",
+    "Biblioteca amb família": "biblioteca_infancia_sp",
+    "Pares llegint": "vist_pares_lectura_sp",
+    "Parlar amb família sobre lectures": "parlat_pares_lectura_sp",
+    "Sessions de lectura conjunta": "sessions_lectura_familiars_sp",
+    "Normes clares pantalles": "normes_clares_tric_sp",
+    "Més lectura obligatòria adaptada": "llegiria_mes_lectura_obligatoria_sp",
+    # TRIC (sort_tric)
+    "Temps dispositius digitals": "tecnos",
+    "Temps xarxes socials": "xarxes",
+    "Temps plataformes streaming": "plataformes_streaming",
+    "Temps videojocs": "videojocs",
+    "Temps estudi": "estudi_sp",
+    "Temps cultura": "cultura_sp",
+    "Temps esport": "sport_sp",
+    "Temps amics": "hangout_sp"
+}
+
+@tmt.register_section("policoriques", tags=[15], consumes=list(polychoric_items.values()))
+def section_policoriques(df: pd.DataFrame) -> pd.DataFrame:
+    import matplotlib.pyplot as plt
+
+    print("\n=======================================================================================\nCorrelacions policòriques\n=======================================================================================")
+    plt.close("all")
+
+    # Llindars un cop per ítem, una optimització per parella en paral·lel
+    labels = {column: label for label, column in polychoric_items.items()}
+    matrix = tmt.polychoric_matrix(df, list(polychoric_items.values())).rename(index=labels, columns=labels)
+
+    print(matrix.to_string(float_format="{:.2f}".format))
+
+    tmt.plot_correlation_matrix(
+        matrix,
+        title="Correlacions policòriques dels blocs Likert",
+        save_figures=save_figures,
+        figure_path="../latex/pictures/15_policoriques"
+    )
+
+    return df
+
+#########################################################################################
+#
+# / Sections
+#
+#########################################################################################
+
+#########################################################################################
+#
+# Streaming mode (stream_chunksize)
+#
+#########################################################################################
+# Counts accumulated chunk by chunk for the sections that only need counts
+stream_crosstabs = [
+    ("Gènere", "p4_temps_lectura"),
+    ("Gènere", "p5_llibres")
+]
+
+stream_frequencies = [
+    "Gènere",
+    "Curs",
+    "Itinerari (només si estàs cursant Batxillerat)",
+    "p4_temps_lectura",
+    "p5_llibres"
+]
+
+# Spearman pairs accumulated as joint counts (exact ρ with ties)
+stream_spearman = [
+    ("p4_temps_lectura_sp", "p5_llibres_sp")
+]
+
+def prepare_stream_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derived columns needed per chunk: the gender of the readers (NaN for no readers),
+    used to group the genre ranks, and the Spearman ready variables of stream_spearman
+    """
+
+    df = create_spearman_base(df)
+
+    lector_oci = (
+        (df["sessions"] != "No llegeixo per oci.") &
+        (df["format"] != "No llegeixo per oci.")
+    )
+    df["genere_lector"] = df["Gènere"].astype(object).where(lector_oci)
+
+    return df
+
+# Tags that stream_report can compute from the streamed counts
+stream_tags = [1, 2, 5]
+
+def stream_report(stats: dict, tags: list):
+    """
+    Tags 1, 2 and 5 computed from the streamed counts
+    """
+
+    frequencies = stats["frequencies"]
+
+    if 1 in tags:
+        print("\n=======================================================================================\nCaracterístiques Generals de la Mostra\n=======================================================================================")
+        tmt.plot_frequency_hist(frequencies["Gènere"], title="Distribució de l'alumnat segons el gènere", xlabel="", ylabel="Percentatge d'alumnes")
+        tmt.plot_frequency_hist(frequencies["Curs"].reindex(sort_cursos, fill_value=0), title="Distribució de l'alumnat segons el curs", xlabel="", ylabel="Percentatge d'alumnes")
+        tmt.plot_frequency_hist(frequencies["Itinerari (només si estàs cursant Batxillerat)"], title="Distribució de l'alumnat segons l'itinerari (només Batxillerat)", xlabel="", ylabel="Percentatge d'alumnes")
+
+    if 2 in tags:
+        print("\n=======================================================================================\nTemps de lectura setmanal i llibres llegits en els últims 12 mesos per oci per grups\n=======================================================================================")
+        tmt.report_spearman(stats["spearman"], [
+            ("p4_temps_lectura_sp", "p5_llibres_sp", "Spearman: temps de lectura vs llibres llegits")
+        ])
+
+        for var, label in [
+            ("p4_temps_lectura", "Chi-cuadrat: gènere normatiu vs temps de lectura"),
+            ("p5_llibres", "Chi-cuadrat: gènere normatiu vs llibres llegits")
+        ]:
+            contingency = stats["crosstabs"][("Gènere", var)]
+            tmt.chi_square_from_counts(
+                contingency.drop(index="Prefereixo no respondre.", errors="ignore"),
+                label,
+                monte_carlo=chi_square_monte_carlo,
+                seed=bootstrap_seed
+            )
+
+        tmt.plot_frequency_hist(frequencies["p4_temps_lectura"].reindex(sort_temps, fill_value=0), title="Distribució de l'alumnat segons el temps mitjà de lectura setmanal per oci", xlabel="", ylabel="Percentatge d'alumnes")
+        tmt.plot_frequency_hist(frequencies["p5_llibres"].reindex(sort_llibres, fill_value=0), title="Distribució de l'alumnat segons els llibres llegits per oci en els últims 12 mesos", xlabel="", ylabel="Percentatge d'alumnes")
+
+    if 5 in tags:
+        print("\n=======================================================================================\nThematic & Format\n=======================================================================================")
+        ranks = stats["ranks"]
+        results = {
+            "Rànking de les temàtiques preferides per a la lectura per oci": tmt.thematic_scores_from_counts(
+                {col: counts.sum(axis=0) for col, counts in ranks.items()}, map_thematic
+            ),
+            "Rànking de les temàtiques preferides per a la lectura per oci entre les noies": tmt.thematic_scores_from_counts(
+                {col: counts.reindex(["Femení."], fill_value=0).iloc[0] for col, counts in ranks.items()}, map_thematic
+            ),
+            "Rànking de les temàtiques preferides per a la lectura per oci entre els nois": tmt.thematic_scores_from_counts(
+                {col: counts.reindex(["Masculí."], fill_value=0).iloc[0] for col, counts in ranks.items()}, map_thematic
+            )
+        }
+
+        if verbose:
+            for title, resultats in results.items():
+                print(f"\n{title} ------------------------------------------------------")
+                print(resultats)
+
+        tmt.plot_thematic_individual(results)
+
+#########################################################################################
+#
+# / Streaming mode
+#
+#########################################################################################
+
+#########################################################################################
+#
+# Main Operations
+#
+#########################################################################################
+if __name__ == "__main__":
+    # =======================================================================================
+    # Streaming mode: only counts, the dataset is never fully loaded
+    # =======================================================================================
+    if stream_chunksize is not None:
+        # Check the tags before reading the CSV
+        unsupported = sorted(set(tags) - set(stream_tags))
+        if len(unsupported) > 0:
+            raise SystemExit(
+                f"Tags {unsupported} are not available in streaming mode (stream_chunksize): "
+                f"only {stream_tags}, or set stream_chunksize = None to load the dataset"
+            )
+
+        stats = tmt.stream_statistics(
+            csv_name,
+            rename_mapping,
+            stream_chunksize,
+            schema=categorical_schema,
+            crosstabs=stream_crosstabs,
+            frequencies=stream_frequencies,
+            rank_columns=columnes_generes,
+            rank_by="genere_lector",
+            spearman_pairs=stream_spearman,
+            poltergeists=poltergeists,
+            filterr=filterr,
+            prepare=prepare_stream_chunk,
+            state_path=os.path.join(cache_dir, f"{os.path.basename(csv_name)}_stream_state.pkl") if incremental else None,
+            verbose=verbose
+        )
+        stream_report(stats, tags)
+
+        if len(tags) > 0 and tmt.ask_to_plot() == "y":
+            import matplotlib.pyplot as plt
+            plt.show()
+
+    else:
+        # =======================================================================================
+        # First Data Inspection
+        # =======================================================================================
+        # Import df from csv (or from the Parquet cache if the CSV, mapping and schema are unchanged)
+        if csv_pattern is None:
+            df = tmt.load_dataset(
+                csv_name,
+                rename_mapping,
+                schema=categorical_schema,
+                use_cache=use_cache,
+                cache_dir=cache_dir,
+                verbose=verbose
+            )
+        else:
+            df = tmt.load_datasets(
+                csv_pattern,
+                rename_mapping,
+                schema=categorical_schema,
+                use_cache=use_cache,
+                cache_dir=cache_dir,
+                max_workers=ingest_workers,
+                verbose=verbose
+            )
+
+        # Print df data
+        if verbose:
+            print("========================================================================================\nCheck Dataset\n========================================================================================")
+            print(f"Dataframe dimensions (rows, cols): {df.shape}")
+            print(f"First 5 lines of the dataframe: \n{df.head()}")
+            # print(f"\nCheck no null values:")
+            # print(df.info())
+            # print(f"\nCheck no nulls values per column:")
+            # print(df.isnull().sum())
+
+        # =======================================================================================
+        # Save poltergeists
+        # =======================================================================================
+        if poltergeists:
+            # Each correction targets its file (font column of poltergeists.csv)
+            df = tmt.save_poltergeists(df, verbose=verbose, font=f"{csv_name}.csv")
+
+        # =======================================================================================
+        # Clean dataset and ensure consistency
+        # =======================================================================================
+        if filterr:
+            df = tmt.clean_reading_dataset_and_consistency(df, verbose=verbose, audit_path=audit_path)
+
+        # =======================================================================================
+        # Export cleaned dataset
+        # =======================================================================================
+        if export_cleaned:
+            tmt.export_dataset(df, csv_name=f"{csv_name}_cleaned.csv")
+
+        # =======================================================================================
+        # Sections requested with -t (and the derived columns they need)
+        # =======================================================================================
+        if use_cache:
+            tmt.configure_result_cache(os.path.join(cache_dir, "results"), max_mb=result_cache_max_mb)
+
+        df = tmt.run_sections(df, tags)
+
+        if len(tags) > 0 and not {13, 14, 15} & set(tags) and tmt.ask_to_plot() == "y":
+            import matplotlib.pyplot as plt
+            plt.show()
+
 #########################################################################################
 #
 # / Main Operations
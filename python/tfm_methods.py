@@ -1,15 +1,27 @@
 # Standard library
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
 import csv
+import glob
+import hashlib
+from functools import partial, wraps
+import inspect
+import io
+import json
+import os
+import pickle
 from pprint import pprint
+import re
 import textwrap
+import warnings
 
 # Third-party
-import matplotlib.pyplot as plt
-from matplotlib.colors import TwoSlopeNorm
 import numpy as np
 import pandas as pd
-from scipy.stats import chi2_contingency, spearmanr
+
+# matplotlib and scipy are imported inside the functions that use them, so that
+# parse_arguments() and runs without plots or tests don't pay their import cost
 
 #########################################################################################
 #
@@ -52,392 +64,2425 @@ def parse_arguments():
 def ask_to_plot():
     return input("¿Quieres ver los gráficos? (Y/n): ").lower()
 
-def save_poltergeists(df: pd.DataFrame, verbose: bool = False) -> pd.DataFrame:
+# Units of main.py registered with register_section (in registration order)
+SECTIONS = []
+
+def register_section(name: str, tags: list = (), consumes: list = (), produces: list = ()):
+    """
+    Register a unit of main.py with the columns it consumes and produces.
+
+    Units with tags are the numbered sections requested with -t. Units without tags
+    only derive columns and run when a requested section needs what they produce.
+    """
+
+    def decorator(func):
+        SECTIONS.append({
+            "name": name,
+            "tags": set(tags),
+            "consumes": list(consumes),
+            "produces": list(produces),
+            "func": func
+        })
+        return func
+
+    return decorator
+
+def resolve_sections(tags: list) -> list:
+    """
+    Units to run for the requested tags: the tagged sections plus the dependency
+    closure of the units producing the columns they consume, in registration order.
+    """
+
+    producers = {}
+    for position, unit in enumerate(SECTIONS):
+        for col in unit["produces"]:
+            producers[col] = position
+
+    selected = {
+        position
+        for position, unit in enumerate(SECTIONS)
+        if unit["tags"] & set(tags)
+    }
+
+    pending = [(position, col) for position in selected for col in SECTIONS[position]["consumes"]]
+
+    while len(pending) > 0:
+        consumer, col = pending.pop()
+
+        # Columns without producer come from the CSV
+        producer = producers.get(col)
+        if producer is None:
+            continue
+
+        if producer > consumer:
+            raise ValueError(
+                f"Section '{SECTIONS[consumer]['name']}' consumes '{col}' before "
+                f"'{SECTIONS[producer]['name']}' produces it"
+            )
+
+        if producer not in selected:
+            selected.add(producer)
+            pending.extend((producer, dep) for dep in SECTIONS[producer]["consumes"])
+
+    return [SECTIONS[position] for position in sorted(selected)]
+
+def run_sections(df: pd.DataFrame, tags: list) -> pd.DataFrame:
+    """
+    Run the units needed for the requested tags, each one receiving and returning df
+    """
+
+    for unit in resolve_sections(tags):
+        df = unit["func"](df)
+
+    return df
+
+def dataset_cache_key(csv_path: str, rename_mapping: dict, schema: dict = None) -> str:
+    """
+    Hash of the CSV content plus the rename mapping and categorical schema, used to
+    key the dataset cache
+    """
+
+    hasher = hashlib.sha256()
+
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+
+    hasher.update(
+        json.dumps([rename_mapping, schema], sort_keys=True, ensure_ascii=False).encode("utf-8")
+    )
+
+    return hasher.hexdigest()[:16]
+
+def apply_categorical_schema(df: pd.DataFrame, schema: dict, verbose: bool = False) -> pd.DataFrame:
     """
-    Save poltergeists in the dataset for later analysis
+    Convert the answer columns into ordered categoricals.
+
+    schema maps each column to its ordered list of answers (the sort_* lists). Answers
+    not present in the list are kept, appended after the ordered ones, so no data is
+    lost when a free-text or unexpected answer appears.
     """
 
     df = df.copy()
 
-    if verbose:
-        print("\n========================================================================================\nPoltergeists Saved\n========================================================================================")
-        show_list = [
-            "id",
-            "p4_temps_lectura", 
-            "p5_llibres", 
-            "p6_pag", 
-            "sessions", 
-            "format"
-        ]
-        print("------------ Saved Poltergeist 1 (id=160)----------------\n > Incongruencia entre tiempo de lectura y número de libros leídos")
-        print(df[df["id"] == 160][show_list].to_string(index=False)) # 2026/04/28 12:52:16 p. m. EEST
+    for col, categories in schema.items():
+        if col not in df.columns:
+            continue
 
-    # Poltergeist 1: Incongruencia entre tiempo de lectura y número de libros leídos
-    polt_id = 160
-    df.loc[df["id"] == polt_id, "p4_temps_lectura"] = "Entre 30 minuts i 1 hora a la setmana."
-    df.loc[df["id"] == polt_id, "p5_llibres"] = "3-5 llibres o còmics."
-    df.loc[df["id"] == polt_id, "p6_pag"] = "100-299 pàgines."
+        observed = pd.unique(df[col].dropna())
+        extra = sorted(str(value) for value in observed if value not in categories)
 
-    if verbose:
-        print(df[df["id"] == polt_id][show_list].to_string(index=False))
+        if verbose and len(extra) > 0:
+            print(f"Answers outside the schema for '{col}': {extra}")
 
-    # Poltergeist 2: Incongruencia entre tiempo de lectura y número de libros leídos
-    polt_id = 104
-    if verbose:
-        print(f"\n------------ Saved Poltergeist 2 (id={polt_id})----------------\n > Incongruencia entre tiempo de lectura y número de libros leídos")
-        print(df[df["id"] == polt_id][show_list].to_string(index=False)) # 2026/04/27 11:38:51 a. m. EEST
-    df.loc[df["id"] == polt_id, "p4_temps_lectura"] = "0 minuts."
-    df.loc[df["id"] == polt_id, "p5_llibres"] = "0 llibres o còmics."
+        df[col] = pd.Categorical(
+            df[col],
+            categories=list(categories) + extra,
+            ordered=True
+        )
 
-    if verbose:
-        print(df[df["id"] == polt_id][show_list].to_string(index=False))
+    return df
+
+def column_codes(series: pd.Series) -> tuple:
+    """
+    Integer codes (-1 for NaN) and labels of a column, in the order pd.crosstab uses:
+    the categories for categoricals, the sorted values otherwise
+    """
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int64), series.cat.categories
+
+    codes, labels = pd.factorize(series, sort=True)
+
+    return codes.astype(np.int64), labels
+
+def categorical_map(series: pd.Series, mapping: dict, codes: tuple = None) -> pd.Series:
+    """
+    Map a column through a dict using its integer category codes.
+
+    The dict is evaluated once per category into a lookup array indexed by the codes,
+    instead of one hash lookup per row. Unmapped answers and missing values give NaN.
+    codes are the (codes, categories) of the column when already computed (column_codes).
+    """
+
+    codes, categories = column_codes(series) if codes is None else codes
+
+    # Last position of the lookup table for code -1 (NaN)
+    lut = np.array(
+        [mapping.get(category, np.nan) for category in categories] + [np.nan],
+        dtype=float
+    )
+
+    return pd.Series(lut[codes], index=series.index, name=series.name)
+
+def encode_answers(df: pd.DataFrame, encodings: dict, verbose: bool = False) -> pd.DataFrame:
+    """
+    Score columns {new_col: (answer column, score map)} of the answer columns.
+
+    Each answer column is factorized once, even when several maps read it, and each map
+    is applied as a lookup array over the codes (categorical_map). With verbose, observed
+    answers that are not keys of their map are reported instead of silently becoming NaN;
+    answers scored as missing on purpose are mapped to None.
+    """
+
+    codes = {}
+    scores = {}
+    for new_col, (col, mapping) in encodings.items():
+        if col not in codes:
+            codes[col] = column_codes(df[col])
+        col_codes, categories = codes[col]
+
+        if verbose:
+            observed = np.bincount(col_codes[col_codes >= 0], minlength=len(categories)) > 0
+            unmapped = [str(category) for category in categories[observed] if category not in mapping]
+            if len(unmapped) > 0:
+                print(f"Answers without score for '{new_col}' (NaN): {unmapped}")
+
+        scores[new_col] = categorical_map(df[col], mapping, codes[col]).rename(new_col)
+
+    return pd.DataFrame(scores, index=df.index)
+
+def load_dataset(
+    csv_name: str,
+    rename_mapping: dict,
+    schema: dict = None,
+    use_cache: bool = True,
+    cache_dir: str = ".cache",
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """
+    Load the survey CSV with the id column, the renamed columns and the ordered
+    categorical schema applied.
+
+    The resulting frame is stored as Parquet in cache_dir, keyed on the CSV content,
+    the rename mapping and the schema, so later runs skip CSV parsing. Any change in
+    the source file or in the mappings produces a new key and the cache is rebuilt.
+    """
+
+    csv_path = f"{csv_name}.csv"
+    # Path in the cache name, so CSVs with the same name in different folders don't clash
+    base_name = os.path.normpath(csv_name).replace(os.sep, "_").lstrip("._")
+
+    if use_cache:
+        key = dataset_cache_key(csv_path, rename_mapping, schema)
+        cache_path = os.path.join(cache_dir, f"{base_name}_{key}.parquet")
+
+        if os.path.exists(cache_path):
+            try:
+                df = pd.read_parquet(cache_path)
+                if verbose:
+                    print(f"Dataset loaded from cache: {cache_path}")
+                return df
+            except ImportError:
+                # Sense motor Parquet (pyarrow) -> lectura directa del CSV
+                use_cache = False
+            except (OSError, ValueError):
+                # Cache truncada o esborrada mentrestant -> es torna a llegir el CSV
+                if verbose:
+                    print(f"Dataset cache unreadable, rebuilt: {cache_path}")
+
+    # Import df from csv
+    df = pd.read_csv(csv_path)
+
+    # Ad id column
+    df["id"] = range(1, len(df) + 1)
+
+    df = df.rename(columns=rename_mapping)
+
+    if schema is not None:
+        df = apply_categorical_schema(df, schema, verbose=verbose)
+
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Written aside and renamed, so a half-written file is never read as the cache
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, cache_path)
+            if verbose:
+                print(f"Dataset cache written: {cache_path}")
+        except ImportError:
+            if verbose:
+                print("Dataset cache disabled: pyarrow is not installed")
+            return df
+
+        # Esborrar caches antigues del mateix CSV (només <base_name>_<key>.parquet, no
+        # les d'altres CSVs que comencen igual, p. ex. school.csv i school_wave2.csv)
+        own_cache = re.compile(rf"^{re.escape(base_name)}_[0-9a-f]{{16}}\.parquet$")
+        for old_cache in os.listdir(cache_dir):
+            if own_cache.match(old_cache) and os.path.join(cache_dir, old_cache) != cache_path:
+                try:
+                    os.remove(os.path.join(cache_dir, old_cache))
+                except FileNotFoundError:
+                    pass
+
+    return df
+
+def load_datasets(
+    pattern: str,
+    rename_mapping: dict,
+    schema: dict = None,
+    use_cache: bool = True,
+    cache_dir: str = ".cache",
+    max_workers: int = None,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """
+    Load and concatenate several survey CSVs (one per school and wave) in a process pool.
+
+    pattern is a directory (all its *.csv files) or a glob. Each file is loaded with
+    load_dataset (own id column and cache) and its rows get the file in the "font"
+    column, so (font, id) is the stable key of a row. The categorical schema is applied
+    once to the concatenated frame, so all the files share the same categories.
+    """
+
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.csv")
+
+    csv_paths = sorted(glob.glob(pattern))
+    if len(csv_paths) == 0:
+        raise FileNotFoundError(f"No CSV files match '{pattern}'")
+
+    csv_names = [os.path.splitext(csv_path)[0] for csv_path in csv_paths]
+
+    load = partial(
+        load_dataset,
+        rename_mapping=rename_mapping,
+        use_cache=use_cache,
+        cache_dir=cache_dir,
+        verbose=verbose
+    )
+
+    if len(csv_names) == 1 or max_workers == 1:
+        dfs = [load(csv_name) for csv_name in csv_names]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            dfs = list(executor.map(load, csv_names))
+
+    for csv_path, df in zip(csv_paths, dfs):
+        df.insert(0, "font", csv_path)
+
+    df = pd.concat(dfs, ignore_index=True)
 
-    # Poltergeist 3: Se ha olvidado poner las páginas leidas
-    polt_id = 138
     if verbose:
-        print(f"\n------------ Saved Poltergeist 3 (id={polt_id})----------------\n > Se ha olvidado poner las páginas leidas")
-        print(df[df["id"] == polt_id][show_list].to_string(index=False)) # 2026/04/27 11:38:51 a. m. EEST
-    df.loc[df["id"] == polt_id, "p6_pag"] = "100-299 pàgines."
+        print(f"Loaded {len(csv_paths)} files: {df.groupby('font').size().to_dict()}")
+
+    if schema is not None:
+        df = apply_categorical_schema(df, schema, verbose=verbose)
+
+    return df
+
+def order_counts(counts, categories: list = None):
+    """
+    Order the labels of accumulated counts (Series or DataFrame rows) as the schema:
+    the categories first, then the extra answers sorted, so streamed results look
+    like the ones computed on the full categorical dataset
+    """
+
+    if categories is None:
+        return counts.sort_index()
+
+    extra = sorted(label for label in counts.index if label not in categories)
+    ordered = [label for label in categories if label in counts.index] + extra
+
+    return counts.reindex(ordered)
+
+def stream_state_key(config: list, prepare=None, poltergeists: bool = False) -> str:
+    """
+    Hash of everything that decides what is accumulated from each row (mapping, schema,
+    statistics, flags, the code of prepare and the corrections file), used to check
+    that a saved incremental state can be resumed
+    """
+
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps(config, sort_keys=True, ensure_ascii=False, default=repr).encode("utf-8"))
+
+    if prepare is not None:
+        try:
+            hasher.update(inspect.getsource(prepare).encode("utf-8"))
+        except (OSError, TypeError):
+            hasher.update(prepare.__qualname__.encode("utf-8"))
+
+    if poltergeists and os.path.exists(POLTERGEISTS_CSV):
+        with open(POLTERGEISTS_CSV, "rb") as f:
+            hasher.update(f.read())
+
+    return hasher.hexdigest()[:16]
+
+def csv_fingerprint(csv_path: str, offset: int, block: int = 1 << 16) -> str:
+    """
+    Hash of the start of the CSV and of the bytes just before offset, to check that
+    the rows already read haven't changed (the file only grew)
+    """
+
+    hasher = hashlib.sha256()
+
+    with open(csv_path, "rb") as f:
+        hasher.update(f.read(min(block, offset)))
+        f.seek(max(0, offset - block))
+        hasher.update(f.read(offset - max(0, offset - block)))
+
+    return hasher.hexdigest()[:16]
+
+# Keys of the incremental state saved by stream_statistics
+STREAM_STATE_KEYS = ("key", "offset", "fingerprint", "columns", "n", "crosstabs", "frequencies", "ranks", "joint")
+
+def load_stream_state(state_path: str, csv_path: str, key: str, verbose: bool = False):
+    """
+    Saved incremental state of stream_statistics, or None when there is none or it can't
+    be resumed (unreadable or not a state, other configuration, or the CSV was rewritten
+    instead of appended)
+    """
+
+    if state_path is None or not os.path.exists(state_path):
+        return None
+
+    try:
+        with open(state_path, "rb") as f:
+            state = pickle.load(f)
+    except Exception:
+        # Truncated or corrupt pickles can fail with almost any exception
+        state = None
+
+    reason = None
+    if not isinstance(state, dict) or any(name not in state for name in STREAM_STATE_KEYS):
+        reason = "the saved state can't be read"
+    elif state["key"] != key:
+        reason = "the configuration changed"
+    elif os.path.getsize(csv_path) < state["offset"]:
+        reason = "the CSV is shorter than the rows already read"
+    elif csv_fingerprint(csv_path, state["offset"]) != state["fingerprint"]:
+        reason = "the rows already read changed"
+
+    if reason is not None:
+        if verbose:
+            print(f"Incremental state discarded ({reason}): reading the whole CSV")
+        return None
+
+    return state
+
+def spearman_from_counts(joint_counts: dict) -> pd.DataFrame:
+    """
+    Spearman ρ, p-value and n (and Kendall τ-b and γ) of each (var1, var2) from its joint
+    counts (rows: values of var1, columns: values of var2), exact with ties as spearman_pairs
+    """
+
+    index = pd.MultiIndex.from_tuples(list(joint_counts), names=["var1", "var2"])
+    if len(joint_counts) == 0:
+        return pd.DataFrame({"rho": [], "p": [], "n": [], "tau_b": [], "gamma": [], "p_kendall": []}, index=index)
+
+    k = max([max(counts.shape) for counts in joint_counts.values()] + [1])
+    tables = np.zeros((len(joint_counts), k, k))
+    for t, counts in enumerate(joint_counts.values()):
+        counts = counts.sort_index(axis=0).sort_index(axis=1)
+        tables[t, :counts.shape[0], :counts.shape[1]] = counts.to_numpy(dtype=float)
+
+    rho, p, n = spearman_from_tables(tables)
+    tau_b, gamma, p_kendall = kendall_from_tables(tables)
+
+    return pd.DataFrame({
+        "rho": rho,
+        "p": p,
+        "n": n.astype(int),
+        "tau_b": tau_b,
+        "gamma": gamma,
+        "p_kendall": p_kendall
+    }, index=index)
+
+def stream_statistics(
+    csv_name: str,
+    rename_mapping: dict,
+    chunksize: int,
+    schema: dict = None,
+    crosstabs: list = (),
+    frequencies: list = (),
+    rank_columns: list = (),
+    rank_by: str = None,
+    spearman_pairs: list = (),
+    poltergeists: bool = False,
+    filterr: bool = False,
+    prepare=None,
+    state_path: str = None,
+    verbose: bool = False,
+) -> dict:
+    """
+    Read the survey CSV in chunks and accumulate only the sufficient statistics, so
+    memory is bounded by the chunk size instead of the dataset size.
+
+    Each chunk gets the global id, the rename mapping, the schema, save_poltergeists and
+    clean_reading_dataset_and_consistency (if enabled) and prepare(chunk) for derived
+    columns. The result has:
+    - "n": number of rows read
+    - "new": rows read in this call (all of them unless resumed from state_path)
+    - "crosstabs": {(var1, var2): contingency counts} for chi_square_from_counts
+    - "frequencies": {var: counts per answer} for plot_frequency_hist
+    - "ranks": {col: counts per rank} (rows per rank_by group if given) for
+      thematic_scores_from_counts
+    - "spearman": ρ, p and n of the spearman_pairs (numeric columns) from their
+      accumulated joint counts, see spearman_from_counts
+
+    With state_path the accumulated counts and the byte offset read so far are saved,
+    and the next call only reads the rows appended to the CSV since then, so updating
+    the results takes time proportional to the new rows. The state is discarded (whole
+    CSV read again) if the configuration, prepare, the corrections or the rows already
+    read changed.
+    """
+
+    schema = schema or {}
+    csv_path = f"{csv_name}.csv"
+
+    key = stream_state_key(
+        [rename_mapping, schema, crosstabs, frequencies, rank_columns, rank_by, spearman_pairs, poltergeists, filterr],
+        prepare=prepare,
+        poltergeists=poltergeists
+    )
+
+    state = load_stream_state(state_path, csv_path, key, verbose=verbose)
+    if state is None:
+        state = {
+            "key": key,
+            "offset": 0,
+            "fingerprint": None,
+            "columns": None,
+            "n": 0,
+            "crosstabs": {pair: None for pair in crosstabs},
+            "frequencies": {var: None for var in frequencies},
+            "ranks": {col: None for col in rank_columns},
+            "joint": {pair: None for pair in spearman_pairs},
+        }
+
+    n_before = state["n"]
+
+    # Corrections read once, applied to each chunk
+    corrections = load_corrections() if poltergeists else None
+
+    def accumulate(total, counts):
+        return counts if total is None else total.add(counts, fill_value=0)
+
+    with open(csv_path, "rb") as f:
+        try:
+            if state["columns"] is None:
+                reader = pd.read_csv(f, chunksize=chunksize)
+            else:
+                # Only the rows appended after the last call
+                f.seek(state["offset"])
+                reader = pd.read_csv(f, header=None, names=state["columns"], chunksize=chunksize)
+
+            for it, chunk in enumerate(reader):
+                if len(chunk) == 0:
+                    continue
+
+                if state["columns"] is None:
+                    state["columns"] = list(chunk.columns)
+
+                # Global id, as if the whole CSV had been loaded
+                n = state["n"]
+                chunk["id"] = range(n + 1, n + len(chunk) + 1)
+                state["n"] += len(chunk)
+
+                chunk = chunk.rename(columns=rename_mapping)
+                chunk = apply_categorical_schema(chunk, schema)
+
+                if poltergeists:
+                    chunk = apply_corrections(chunk, corrections, font=os.path.basename(csv_path))
+
+                if filterr:
+                    chunk = clean_reading_dataset_and_consistency(chunk)
+
+                if prepare is not None:
+                    chunk = prepare(chunk)
+
+                for var1, var2 in crosstabs:
+                    contingency = pd.crosstab(chunk[var1].astype(object), chunk[var2].astype(object))
+                    state["crosstabs"][(var1, var2)] = accumulate(state["crosstabs"][(var1, var2)], contingency)
+
+                for var in frequencies:
+                    state["frequencies"][var] = accumulate(state["frequencies"][var], chunk[var].astype(object).value_counts())
+
+                for col in rank_columns:
+                    ranks = pd.to_numeric(chunk[col], errors="coerce")
+                    if rank_by is None:
+                        counts = ranks.value_counts()
+                    else:
+                        counts = pd.crosstab(chunk[rank_by].astype(object), ranks)
+                    state["ranks"][col] = accumulate(state["ranks"][col], counts)
+
+                # Joint counts of the values (pairwise complete rows) for Spearman with ties
+                for var1, var2 in spearman_pairs:
+                    joint = pd.crosstab(
+                        pd.to_numeric(chunk[var1], errors="coerce"),
+                        pd.to_numeric(chunk[var2], errors="coerce")
+                    )
+                    state["joint"][(var1, var2)] = accumulate(state["joint"][(var1, var2)], joint)
+
+                if verbose:
+                    print(f"Chunk {it + 1}: {state['n']} rows read")
+        except pd.errors.EmptyDataError:
+            # No rows appended since the last call
+            pass
+
+        state["offset"] = f.tell()
+
+    if state_path is not None:
+        state["fingerprint"] = csv_fingerprint(csv_path, state["offset"])
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        tmp_path = f"{state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    if verbose and n_before > 0:
+        print(f"Incremental update: {state['n'] - n_before} new rows ({state['n']} in total)")
+
+    crosstab_counts = {}
+    for (var1, var2), contingency in state["crosstabs"].items():
+        if contingency is not None:
+            contingency = order_counts(contingency.fillna(0), schema.get(var1))
+            contingency = order_counts(contingency.T, schema.get(var2)).T.astype(int)
+        crosstab_counts[(var1, var2)] = contingency
+
+    frequency_counts = {}
+    for var, counts in state["frequencies"].items():
+        if counts is not None:
+            counts = order_counts(counts, schema.get(var)).astype(int)
+        frequency_counts[var] = counts
+
+    joint_counts = {pair: counts.fillna(0) for pair, counts in state["joint"].items() if counts is not None}
+
+    return {
+        "n": state["n"],
+        "new": state["n"] - n_before,
+        "crosstabs": crosstab_counts,
+        "frequencies": frequency_counts,
+        "ranks": state["ranks"],
+        "spearman": spearman_from_counts(joint_counts),
+    }
+
+# Manual corrections of the survey answers (id, column, value, reason[, font])
+POLTERGEISTS_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "poltergeists.csv")
+
+def load_corrections(csv_path: str = POLTERGEISTS_CSV) -> pd.DataFrame:
+    """
+    Read a corrections table: one row per (id, column) with the new value and the
+    reason. An optional "font" column restricts the correction to one source file.
+    If the same (id, column) appears twice, the last row wins.
+    """
+
+    corrections = pd.read_csv(csv_path, dtype={"column": str, "value": str, "reason": str})
+    key = ["font", "id", "column"] if "font" in corrections.columns else ["id", "column"]
+
+    return corrections.drop_duplicates(subset=key, keep="last").reset_index(drop=True)
+
+def apply_corrections(
+    df: pd.DataFrame,
+    corrections: pd.DataFrame,
+    verbose: bool = False,
+    font: str = None,
+) -> pd.DataFrame:
+    """
+    Apply a corrections table in one indexed bulk update per column.
+
+    Rows are located by id (or (font, id) if the table has a font column) with a single
+    hash lookup of all the corrections, so the cost is O(rows + corrections) instead of
+    one full column scan per correction. Fonts are compared by file name, so the table
+    can name the file without its folder; font is the file of df when it has no font
+    column (a single CSV), and the corrections of other files are then ignored. Ids not
+    present in df are ignored. The key must be unique in df: a pooled df (several files,
+    repeated ids) needs the font column in the table, otherwise a ValueError is raised.
+    With verbose, prints a diff report (id, column, before, after, reason).
+    """
+
+    df = df.copy()
+
+    if "font" in corrections.columns:
+        if "font" in df.columns:
+            font_codes, fonts = column_codes(df["font"])
+        elif font is not None:
+            font_codes, fonts = np.zeros(len(df), dtype=np.int64), pd.Index([font])
+        else:
+            raise ValueError("The corrections have a font column: pass the font (file) of df")
+
+        # File name of each row (-1 = sense font)
+        names = np.append([os.path.basename(str(name)) for name in fonts], None).astype(object)
+        row_index = pd.MultiIndex.from_arrays([names[font_codes], df["id"]])
+        keys = pd.MultiIndex.from_arrays([
+            corrections["font"].map(lambda name: os.path.basename(name) if isinstance(name, str) else None),
+            corrections["id"]
+        ])
+    else:
+        row_index = pd.Index(df["id"])
+        keys = pd.Index(corrections["id"])
+
+    if not row_index.is_unique:
+        key = "(font, id)" if "font" in corrections.columns else "id"
+        raise ValueError(
+            f"The rows of df are not unique by {key}: add a font column to the corrections "
+            "of a pooled dataset (one per source file) or apply them per file"
+        )
+
+    positions = row_index.get_indexer(keys)
+    found = (positions >= 0) & corrections["column"].isin(df.columns).to_numpy()
+
+    corrections = corrections[found].assign(position=positions[found])
+
+    report = []
+    report_key = ["font", "id"] if "font" in corrections.columns else ["id"]
+
+    for col, col_corrections in corrections.groupby("column", sort=False):
+        rows = col_corrections["position"].to_numpy()
+        values = col_corrections["value"].to_numpy(dtype=object)
+        col_idx = df.columns.get_loc(col)
+
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            new_categories = pd.Index(pd.unique(values)).difference(df[col].cat.categories).dropna()
+            if len(new_categories) > 0:
+                df[col] = df[col].cat.add_categories(new_categories)
+
+        if verbose:
+            report.append(pd.DataFrame({
+                **{name: col_corrections[name].to_numpy() for name in report_key},
+                "column": col,
+                "before": df.iloc[rows, col_idx].to_numpy(dtype=object),
+                "after": values,
+                "reason": col_corrections["reason"].to_numpy(),
+            }))
+
+        df.iloc[rows, col_idx] = values
 
     if verbose:
-        print(df[df["id"] == polt_id][show_list].to_string(index=False)) # 2026/04/28 9:23:35 a. m. EEST
+        print("\n========================================================================================\nPoltergeists Saved\n========================================================================================")
+        print(f"Corrections applied: {len(corrections)} (ignored, id or column not found: {int((~found).sum())})")
+        if len(report) > 0:
+            diff = pd.concat(report).sort_values(report_key + ["column"], kind="stable")
+            changed = diff["before"].astype(str) != diff["after"].astype(str)
+            print(diff[changed].to_string(index=False))
+
+    return df
+
+def save_poltergeists(
+    df: pd.DataFrame,
+    verbose: bool = False,
+    corrections_csv: str = POLTERGEISTS_CSV,
+    font: str = None,
+) -> pd.DataFrame:
+    """
+    Save poltergeists in the dataset for later analysis, using the corrections table
+    in corrections_csv (poltergeists.csv by default). font is the file of df when it
+    has no font column (see apply_corrections)
+    """
+
+    # Poltergeists perdidos:
+    # - 191 - "2026/04/29 12:51:31 p. m. EEST"
+    # - 263 - "2026/04/30 2:55:27 p. m. EEST"
+    # - 252 - "2026/04/30 2:51:15 p. m. EEST"
+    # - 52
+    # - 58
+    # - 74
+    # - 6
+    # - 29
+    # - 103
+    # - 143
+    # - 298
+    # NO APLICADA, NO ES FILTRA: 105 (p4_temps_lectura -> "Entre 30 minuts i 1 hora a la setmana.")
+
+    return apply_corrections(df, load_corrections(corrections_csv), verbose=verbose, font=font)
+
+# =======================================================================================
+# Consistency rules
+# =======================================================================================
+# Each rule: "when" is a list of clauses (OR), each clause maps columns to the answers
+# allowed (AND); {"not_in": [...]} negates and None in a list matches NaN. "set" gives the
+# answers assigned to the matching rows. Masks are evaluated on the data before any
+# assignment and, when rules overlap, the later rule wins.
+
+# Grups de respostes de les regles (privats, no formen part de l'API de tmt)
+_TEMPS_ALTS = [
+    "Entre 30 minuts i 1 hora a la setmana.",
+    "Entre 1 i 2 hores a la setmana.",
+    "Entre 2 i 3 hores a la setmana.",
+    "3 hores o més a la setmana."
+]
+
+_TEMPS_BAIXOS = [
+    "0 minuts.",
+    "Menys de 30 minuts a la setmana."
+]
+
+_LLIBRES_ALTS = [
+    "11-15 llibres o còmics.",
+    "Més de 15 llibres o còmics"
+]
+
+_LLIBRES_BAIXOS = [
+    "0 llibres o còmics.",
+    "1-2 llibres o còmics."
+]
+
+CONSISTENCY_RULES = [
+    {
+        "name": "No lectura per oci",
+        "enabled": True,
+        "when": [
+            {"sessions": ["No llegeixo per oci."]},
+            {"format": ["No llegeixo per oci."]}
+        ],
+        "set": {
+            "p4_temps_lectura": "0 minuts.",
+            "p5_llibres": "0 llibres o còmics.",
+            "sessions": "No llegeixo per oci.",
+            "format": "No llegeixo per oci."
+        }
+    },
+    {
+        "name": "Incongruencia temps alts i llibres baixos",
+        "enabled": True,
+        "when": [
+            {"p4_temps_lectura": _TEMPS_ALTS, "p5_llibres": _LLIBRES_BAIXOS}
+        ],
+        "set": {
+            "p4_temps_lectura": "0 minuts.",
+            "sessions": "No llegeixo per oci.",
+            "format": "No llegeixo per oci."
+        }
+    },
+    {
+        # NO APLICADA -> Pot ser que llegeixi poc una setmana habitual perque llegeix a l'estiu
+        "name": "Incongruencia temps baixos i llibres alts",
+        "enabled": False,
+        "when": [
+            {"p4_temps_lectura": _TEMPS_BAIXOS, "p5_llibres": _LLIBRES_ALTS}
+        ],
+        "set": {
+            "p4_temps_lectura": "0 minuts."
+        }
+    }
+]
+
+# Answers still suspicious after cleaning, reported but not changed (same "when" format)
+DIAGNOSTIC_RULES = [
+    {
+        "name": "Numero de pag NaN pero no 0 minuts",
+        "when": [{"p6_pag": [None], "p4_temps_lectura": {"not_in": ["0 minuts."]}}]
+    },
+    {
+        "name": "Numero de pag NaN pero no 0 llibres",
+        "when": [{"p6_pag": [None], "p5_llibres": {"not_in": ["0 llibres o còmics."]}}]
+    },
+    {
+        "name": "Menys de 30 minuts i 0 llibres",
+        "when": [{"p4_temps_lectura": ["Menys de 30 minuts a la setmana."], "p5_llibres": ["0 llibres o còmics."]}]
+    },
+    {
+        "name": "Entre 30 minuts i 1 hora a la setmana i 0 llibres",
+        "when": [{"p4_temps_lectura": ["Entre 30 minuts i 1 hora a la setmana."], "p5_llibres": ["0 llibres o còmics."]}]
+    },
+    {
+        "name": "Entre 1 i 2 hores a la setmana i 0 llibres",
+        "when": [{"p4_temps_lectura": ["Entre 1 i 2 hores a la setmana."], "p5_llibres": ["0 llibres o còmics."]}]
+    }
+]
+
+def compile_rule_masks(df: pd.DataFrame, rules: list) -> list:
+    """
+    Boolean mask of each rule. Every column is reduced once to integer codes and each
+    condition is a lookup table over its categories, so a condition costs one integer
+    gather whatever the number of answers listed.
+    """
+
+    coded = {}
+
+    masks = []
+
+    for rule in rules:
+        mask = np.zeros(len(df), dtype=bool)
+
+        for clause in rule["when"]:
+            clause_mask = np.ones(len(df), dtype=bool)
+
+            for col, allowed in clause.items():
+                negate = isinstance(allowed, dict)
+                values = allowed["not_in"] if negate else allowed
+
+                if col not in coded:
+                    coded[col] = column_codes(df[col])
+                codes, categories = coded[col]
+                # Last position of the lookup table for code -1 (NaN)
+                lut = np.append(categories.isin(values), any(value is None for value in values))
+                if negate:
+                    lut = ~lut
+
+                clause_mask &= lut[codes]
+
+            mask |= clause_mask
+
+        masks.append(mask)
+
+    return masks
+
+def audit_inconsistencies(
+    df: pd.DataFrame,
+    rules: list = DIAGNOSTIC_RULES,
+    output_path: str = None,
+) -> tuple:
+    """
+    Evaluate all the diagnostic rules in one pass and return (audit, summary):
+    - audit: one row per (id, rule) matched, with the values of the columns the rules
+      look at
+    - summary: rows matched per rule
+
+    With output_path (.csv or .parquet) the audit is written there and the summary
+    next to it (<name>_summary.<ext>).
+    """
+
+    masks = compile_rule_masks(df, rules)
+    names = np.array([rule["name"] for rule in rules], dtype=object)
+
+    value_columns = list(dict.fromkeys(
+        col for rule in rules for clause in rule["when"] for col in clause
+    ))
+    key_columns = [col for col in ["font", "id"] if col in df.columns]
+
+    # Row and rule of every match, rule by rule
+    hits = np.column_stack(masks) if len(masks) > 0 else np.zeros((len(df), 0), dtype=bool)
+    rule_idx, rows = np.nonzero(hits.T)
+
+    audit = df[key_columns + value_columns].iloc[rows].reset_index(drop=True)
+    audit.insert(len(key_columns), "regla", names[rule_idx])
+
+    summary = pd.DataFrame({"regla": names, "files": hits.sum(axis=0)})
+
+    if output_path is not None:
+        root, ext = os.path.splitext(output_path)
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        if ext == ".parquet":
+            audit.astype({col: object for col in value_columns}).to_parquet(output_path, index=False)
+            summary.to_parquet(f"{root}_summary{ext}", index=False)
+        else:
+            audit.to_csv(output_path, index=False)
+            summary.to_csv(f"{root}_summary{ext}", index=False)
+
+    return audit, summary
+
+def clean_reading_dataset_and_consistency(
+    df: pd.DataFrame,
+    verbose: bool = False,
+    rules: list = CONSISTENCY_RULES,
+    return_hits: bool = False,
+    audit_path: str = None,
+):
+    """
+    Clean reading dataset and fix inconsistent answers with the consistency rules.
+
+    All the rule masks are computed first on the integer codes, then each assigned
+    column is written once (np.select over the enabled rules, the last one wins).
+    With return_hits, also returns {rule name: rows matched}, disabled rules included.
+
+    The answers still suspicious after cleaning (DIAGNOSTIC_RULES and the disabled
+    rules) are audited with audit_inconsistencies, written to audit_path if given and
+    summarized with verbose.
+    """
+
+    df = df.copy()
+
+    show_list = [
+        "id",
+        "p4_temps_lectura",
+        "p5_llibres",
+        "p6_pag",
+        "sessions",
+        "format"
+    ]
+
+    masks = compile_rule_masks(df, rules)
+    hits = {rule["name"]: int(mask.sum()) for rule, mask in zip(rules, masks)}
+
+    # =========================================================
+    # VERBOSE OUTPUT
+    # =========================================================
 
-    # Poltergeist 4: Incongruencia entre tiempo de lectura y número de libros leídos
-    polt_id = 10
     if verbose:
-        print(f"\n------------ Saved Poltergeist 4 (id={polt_id})----------------\n > Incongruencia entre tiempo de lectura y número de libros leídos")
-        print(df[df["id"] == polt_id][show_list].to_string(index=False)) # 2026/04/27 11:38:51 a. m. EEST
-    df.loc[df["id"] == polt_id, "p6_pag"] = "1-99 pàgines."
-    df.loc[df["id"] == polt_id, "p4_temps_lectura"] = "Menys de 30 minuts a la setmana."
 
-    # Poltergeist 5: Incongruencia entre paginas y libros leidos + incongruencia tematica + tiempo y libros leidos
-    polt_id = 213
-    if verbose:
-        print(f"\n------------ Saved Poltergeist 5 (id={polt_id})----------------\n > Incongruencia entre paginas y libros leidos + incongruencia tematica + tiempo y libros leidos")
-        print(df[df["id"] == polt_id][show_list].to_string(index=False))
-    df.loc[df["id"] == polt_id, "p4_temps_lectura"] = "0 minuts."
+        print("\n========================================================================================")
+        print("Filters to clean Dataset")
+        print("========================================================================================")
+
+        already_shown = np.zeros(len(df), dtype=bool)
+
+        for rule, mask in zip(rules, masks):
+
+            # Only the rows that the rule changes, without duplicates between rules
+            changes = np.zeros(len(df), dtype=bool)
+            for col, value in rule["set"].items():
+                changes |= (df[col] != value).to_numpy()
+            current_mask = mask & changes & ~already_shown
+
+            title = rule["name"] if rule["enabled"] else f"NO APLICAT!! --> {rule['name']}"
+            print(f"\n{title} [{int(current_mask.sum())}] -----------------------------")
+
+            if current_mask.any():
+                print(df[current_mask][show_list].to_string(index=False))
+
+            already_shown |= current_mask
+
+    # =========================================================
+    # CLEANING
+    # =========================================================
+
+    enabled = [(rule, mask) for rule, mask in zip(rules, masks) if rule["enabled"]]
+    targets = list(dict.fromkeys(col for rule, _ in enabled for col in rule["set"]))
+
+    for col in targets:
+        setters = [(mask, rule["set"][col]) for rule, mask in enabled if col in rule["set"]]
+
+        # Index of the winning rule of each row (-1: unchanged); reversed so the last wins
+        winner = np.select(
+            [mask for mask, _ in reversed(setters)],
+            list(range(len(setters) - 1, -1, -1)),
+            default=-1
+        )
+        rows = np.flatnonzero(winner >= 0)
+        values = np.array([value for _, value in setters], dtype=object)[winner[rows]]
+
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            new_categories = pd.Index(pd.unique(values)).difference(df[col].cat.categories)
+            if len(new_categories) > 0:
+                df[col] = df[col].cat.add_categories(new_categories)
+
+        df.iloc[rows, df.columns.get_loc(col)] = values
+
+    if verbose or audit_path is not None:
+        diagnostics = DIAGNOSTIC_RULES + [rule for rule in rules if not rule["enabled"]]
+        audit, summary = audit_inconsistencies(df, diagnostics, output_path=audit_path)
+
+        if verbose:
+            print("\n========================================================================================")
+            print("Unfiltered Inconsistencies")
+            print("========================================================================================")
+            print(summary.to_string(index=False))
+            if audit_path is not None:
+                print(f"Inconsistencies written to: {audit_path}")
+
+    if return_hits:
+        return df, hits
+
+    return df
+
+# On-disk cache of the statistical results, see configure_result_cache (dir None = disabled)
+# "bytes": size of the cache on disk, scanned on the first write and then kept up to date
+RESULT_CACHE = {"dir": None, "max_bytes": 256 * 2 ** 20, "bytes": None}
+
+def configure_result_cache(cache_dir: str = None, max_mb: float = 256):
+    """
+    Enable the on-disk cache of the functions decorated with cached_result in
+    cache_dir (None disables it), keeping at most max_mb MB of results
+    """
+
+    RESULT_CACHE["dir"] = cache_dir
+    RESULT_CACHE["max_bytes"] = int(max_mb * 2 ** 20)
+    RESULT_CACHE["bytes"] = None
+
+def result_cache_key(func_name: str, version: int, df: pd.DataFrame, columns: list, params: dict) -> str:
+    """
+    Hash of the function (name and version), its parameters and the content of the
+    input columns (values, dtype and categories), used to key the result cache
+    """
+
+    hasher = hashlib.sha256()
+
+    hasher.update(
+        json.dumps([func_name, version, params], sort_keys=True, ensure_ascii=False, default=repr).encode("utf-8")
+    )
+
+    for col in dict.fromkeys(columns):
+        series = df[col]
+        categories = list(map(str, series.cat.categories)) if isinstance(series.dtype, pd.CategoricalDtype) else None
+
+        hasher.update(json.dumps([col, str(series.dtype), categories], ensure_ascii=False).encode("utf-8"))
+        hasher.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+
+    return hasher.hexdigest()[:16]
+
+def evict_result_cache(cache_dir: str, max_bytes: int, target: float = 0.75) -> int:
+    """
+    When the cache is over max_bytes, delete the least recently used results until it
+    is under target * max_bytes (so the next writes don't evict again right away).
+    Returns the size of the cache left
+    """
+
+    entries = []
+    for path in glob.glob(os.path.join(cache_dir, "*.pkl")):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return total
+
+    for _, size, path in sorted(entries):
+        if total <= target * max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+    return total
+
+def cached_result(version: int, columns, ignore: tuple = ("max_workers",)):
+    """
+    Memoize a statistical function of df on disk (when configure_result_cache is on).
+
+    The key is the function name and version, its parameters (except ignore) and the
+    content of the input columns, columns(params) being the columns it reads. The printed
+    output is stored with the result and replayed on a hit. The files touched last are
+    kept when the cache grows over its size. Bump version when the computation changes.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_dir = RESULT_CACHE["dir"]
+            if cache_dir is None:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {name: value for name, value in bound.arguments.items() if name not in ignore}
+            df = params.pop("df")
+
+            key = result_cache_key(func.__name__, version, df, columns(params), params)
+            cache_path = os.path.join(cache_dir, f"{func.__name__}_{key}.pkl")
+
+            if os.path.exists(cache_path):
+                try:
+                    with open(cache_path, "rb") as f:
+                        output, result = pickle.load(f)
+                    # Last use, for the LRU eviction
+                    os.utime(cache_path)
+                    print(output, end="")
+                    return result
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    pass
+
+            buffer = io.StringIO()
+            with contextlib.redirect_stdout(buffer):
+                result = func(*args, **kwargs)
+            output = buffer.getvalue()
+            print(output, end="")
+
+            os.makedirs(cache_dir, exist_ok=True)
+            try:
+                # Unreadable result being replaced
+                replaced = os.path.getsize(cache_path)
+            except OSError:
+                replaced = 0
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump((output, result), f)
+            os.replace(tmp_path, cache_path)
+
+            # The directory is only scanned on the first write and when the size
+            # kept goes over max_bytes, not on every write
+            if RESULT_CACHE["bytes"] is None:
+                RESULT_CACHE["bytes"] = evict_result_cache(cache_dir, RESULT_CACHE["max_bytes"])
+            else:
+                RESULT_CACHE["bytes"] += os.path.getsize(cache_path) - replaced
+                if RESULT_CACHE["bytes"] > RESULT_CACHE["max_bytes"]:
+                    RESULT_CACHE["bytes"] = evict_result_cache(cache_dir, RESULT_CACHE["max_bytes"])
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+def export_dataset(df: pd.DataFrame, csv_name: str):
+    """
+    Export cleaned dataset with original question texts as column names.
+    """
+
+    reverse_mapping = {
+        "p4_temps_lectura": "Quant temps a la setmana dediques, de mitjana, a la lectura de llibres o còmics per oci? (Ja sigui en format físic o digital).",
+        "p5_llibres": "Quants llibres o còmics t’has llegit aproximadament en els últims 12 mesos per oci? (Ja sigui en format físic o digital)",
+        "p6_pag": "En cas que la resposta hagi estat diferent de 0 llibres o còmics, quantes pàgines, de mitjana, tenien aproximadament aquests llibres o còmics?",
+        "p7_lectura_actual": "Actualment estàs llegint algun llibre o còmic per oci?",
+        "p10_visites_biblioteca": "Quants cops aproximadament has visitat una biblioteca per llegir o agafar llibres en préstec en els últims 12 mesos per oci?",
+        "p16_lectura_obligatoria": "En quin grau llegeixes les lectures obligatòries de l’escola?",
+        "format": "Quin format de lectura utilitzes més habitualment per a la lectura de llibres o còmics per oci? ",
+        "sessions": "Quan llegeixes, com acostumen a ser les teves sessions de lectura?",
+        "Novel·la fantàstica": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la fantàstica.]",
+        "Novel·la romàntica": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la romàntica.]",
+        "Novel·la de terror": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la de terror.]",
+        "Novel·la negra": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la negra.]",
+        "Novel·la històrica": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la històrica.]",
+        "Ciència ficció": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Ciència ficció.]",
+        "Còmic": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Còmic.]",
+        "Clàssics": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Clàssics.]",
+        "Poesia": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Poesia.]",
+        "Assaig": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Assaig (Filosofia, divulgació científica, etc.)]",
+        "Teatre": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Teatre.]"
+    }
+
+    df_to_export = df.copy()
+    df_to_export = df_to_export.rename(columns=reverse_mapping)
+    df_to_export = df_to_export.drop(columns=["id"])
+    df_to_export.to_csv(
+        csv_name,
+        index=False,
+        encoding="utf-8-sig",
+        quoting=csv.QUOTE_ALL
+    )
+
+def classify_reader(df: pd.DataFrame, low_pages: float = 300, high_pages: float = 1200) -> pd.DataFrame:
+    # Only a column is added: a shallow copy keeps the caller's df untouched
+    df = df.copy(deep=False)
+
+    temps_baix = [
+        "0 minuts.",
+        "Menys de 30 minuts a la setmana."
+    ]
+
+    temps_alt = [
+        "Entre 1 i 2 hores a la setmana.",
+        "Entre 2 i 3 hores a la setmana.",
+        "3 hores o més a la setmana."
+    ]
+
+    # 1. NO LECTOR (prioridad máxima)
+    cond_no = (
+        (df["p4_temps_lectura"].isin(temps_baix)) |
+        (df["p5_6_pagines_num"] <= low_pages)
+    )
+
+    # 2. HABITUAL (alta intensidad)
+    cond_habitual = (
+        (df["p4_temps_lectura"].isin(temps_alt)) &
+        (df["p5_6_pagines_num"] >= high_pages)
+    )
+
+    # 3. OCASIONAL (resto que no es nada de lo anterior)
+    cond_ocasional = ~(cond_no | cond_habitual)
+
+    df["classificacio_lectora"] = np.select(
+        [cond_no, cond_habitual, cond_ocasional],
+        [
+            "No lector / Lector molt ocasional",
+            "Lector habitual",
+            "Lector ocasional"
+        ],
+        default="Sense classificar"
+    )
+
+    return df
+
+def classify_reader_sweep(
+    df: pd.DataFrame,
+    low_pages: list,
+    high_pages: list,
+    low_time: list = (1,),
+    high_time: list = (3,),
+    outcomes: list = ("p4_temps_lectura_sp", "p5_llibres_sp"),
+    pages_col: str = "p5_6_pagines_num",
+    time_col: str = "p4_temps_lectura_sp"
+) -> pd.DataFrame:
+    """
+    Sensitivity of classify_reader to its cut-offs: class sizes and Spearman ρ of the
+    classification (0 no lector, 1 ocasional, 2 habitual) against each outcome, for
+    every combination of the grids.
+
+    A configuration (low_pages, high_pages, low_time, high_time) classifies as no lector
+    a time score <= low_time or pages <= low_pages, as habitual a time score >= high_time
+    with pages >= high_pages, and the rest as ocasional; classify_reader is (300, 1200,
+    1, 3). The rows are reduced once to the joint counts of (pages, time score, outcome)
+    with one bincount, and the whole grid is classified in one broadcast over those
+    counts. Returns a table indexed by the four cut-offs with n_no_lector, n_ocasional,
+    n_habitual and rho_<outcome>, p_<outcome>.
+    """
+
+    low_pages, high_pages, low_time, high_time = (
+        np.asarray(grid, dtype=float) for grid in (low_pages, high_pages, low_time, high_time)
+    )
+
+    # Distinct pages and time scores (NaN never passes a cut-off, as in classify_reader)
+    pages, pages_codes = np.unique(df[pages_col].to_numpy(dtype=float), return_inverse=True)
+    times, time_codes = np.unique(df[time_col].to_numpy(dtype=float), return_inverse=True)
+
+    # Joint counts (outcome, pages, time, outcome level), last level for NaN
+    codes = spearman_codes(df, outcomes)
+    k = max(n_levels for _, n_levels in codes.values()) + 1
+    flat = [
+        ((o * len(pages) + pages_codes) * len(times) + time_codes) * k + np.where(outcome_codes >= 0, outcome_codes, k - 1)
+        for o, (outcome_codes, _) in enumerate(codes[outcome] for outcome in outcomes)
+    ]
+    counts = np.bincount(
+        np.concatenate(flat),
+        minlength=len(outcomes) * len(pages) * len(times) * k
+    ).reshape(len(outcomes), len(pages), len(times), k).astype(float)
+
+    # Class of every (pages, time) cell for every configuration: (Lp, Hp, Lt, Ht, P, T)
+    with np.errstate(invalid="ignore"):
+        no_lector = (
+            (pages <= low_pages[:, None])[:, None, None, None, :, None]
+            | (times <= low_time[:, None])[None, None, :, None, None, :]
+        )
+        habitual = (
+            (pages >= high_pages[:, None])[None, :, None, None, :, None]
+            & (times >= high_time[:, None])[None, None, None, :, None, :]
+        )
+    classes = np.where(no_lector, 0, np.where(habitual, 2, 1))
+
+    # Joint tables class x outcome level of every configuration and outcome
+    onehot = (classes[..., None] == np.arange(3)).astype(float)
+    tables = np.einsum("...ptc,optj->o...cj", onehot, counts)
+
+    grid_shape = tables.shape[1:-2]
+    sizes = tables[0].sum(axis=-1).reshape(-1, 3)
+    rho, p, _ = spearman_from_tables(tables[..., :-1])
+
+    results = pd.DataFrame(
+        {
+            "n_no_lector": sizes[:, 0].astype(int),
+            "n_ocasional": sizes[:, 1].astype(int),
+            "n_habitual": sizes[:, 2].astype(int)
+        },
+        index=pd.MultiIndex.from_product(
+            [low_pages, high_pages, low_time, high_time],
+            names=["low_pages", "high_pages", "low_time", "high_time"]
+        )
+    )
+    for o, outcome in enumerate(outcomes):
+        results[f"rho_{outcome}"] = rho[o].reshape(-1)
+        results[f"p_{outcome}"] = p[o].reshape(-1)
+
+    return results
+
+def bin_edges(values: np.ndarray, scheme: dict) -> np.ndarray:
+    """
+    Upper edges of the bins of a scheme: {"kind": "fixed", "edges": [...]},
+    {"kind": "quantile", "n": 5} (n bins of about the same size) or {"kind": "log",
+    "start": 100, "stop": 10000, "n": 5} (n edges evenly spaced in log scale). With
+    "zero": True the values <= 0 get their own first bin. Quantile and log edges are
+    rounded to integers.
+    """
+
+    kind = scheme["kind"]
+
+    if kind == "fixed":
+        edges = np.asarray(scheme["edges"], dtype=float)
+    elif kind == "quantile":
+        positive = values[values > 0] if scheme.get("zero") else values[~np.isnan(values)]
+        edges = np.round(np.quantile(positive, np.linspace(0, 1, scheme["n"] + 1)[1:-1])) if len(positive) > 0 else np.array([])
+    elif kind == "log":
+        edges = np.round(np.geomspace(scheme["start"], scheme["stop"], scheme["n"]))
+    else:
+        raise ValueError(f"Unknown bin scheme kind '{kind}'")
+
+    if scheme.get("zero") and kind != "fixed":
+        edges = np.concatenate([[0], edges[edges > 0]])
+
+    return np.unique(edges)
+
+def bin_labels(edges: np.ndarray) -> list:
+    """
+    Labels of the bins of upper edges, as the pages categories: "0", "1-300", ">4000"
+    """
+
+    edges = [int(edge) if float(edge).is_integer() else edge for edge in edges]
+    if len(edges) == 0:
+        return ["Tots"]
+
+    labels = ["0" if edges[0] == 0 else f"<={edges[0]}"]
+    labels += [
+        f"{low + 1}-{high}" if isinstance(low, int) else f"{low}-{high}"
+        for low, high in zip(edges[:-1], edges[1:])
+    ]
+    labels.append(f">{edges[-1]}")
+
+    return labels
+
+@cached_result(version=1, columns=lambda params: [params["column"]])
+def bin_codes(df: pd.DataFrame, column: str, schemes: dict) -> tuple:
+    """
+    Ordinal codes of a numeric column in every bin scheme ({name: scheme}, see bin_edges).
+
+    The bins are right-closed (as pd.cut): the code of a value is the number of upper
+    edges below it, np.searchsorted(edges, value). The column is reduced once to its
+    distinct values, each scheme only searches those, and the codes of the rows come
+    from lookup arrays; the result is kept in the result cache, keyed by the content
+    of the column. Returns (codes table with a column per scheme, NaN for missing
+    values, {name: labels}).
+    """
+
+    values, inverse = np.unique(df[column].to_numpy(dtype=float), return_inverse=True)
+    missing = np.isnan(values)
+
+    codes = {}
+    labels = {}
+    for name, scheme in schemes.items():
+        edges = bin_edges(df[column].to_numpy(dtype=float), scheme)
+        lut = np.searchsorted(edges, values, side="left").astype(float)
+        lut[missing] = np.nan
+
+        codes[name] = lut[inverse]
+        labels[name] = bin_labels(edges)
+
+    return pd.DataFrame(codes, index=df.index), labels
+
+def interval_product_summary(
+    bounds_a: tuple,
+    bounds_b: tuple,
+    n_draws: int,
+    edges: np.ndarray,
+    at_most: list,
+    at_least: list,
+    quantiles: list,
+    missing: float,
+    rng
+) -> np.ndarray:
+    """
+    Summary of n_draws Monte Carlo draws of a * b for each row of bounds, with a and b
+    uniform integers within their (low, high) bounds: mean, quantiles, probability of
+    each bin (upper edges, see bin_codes) and of each at_most / at_least threshold
+    """
+
+    n_rows = len(bounds_a[0])
+
+    draws = np.ones((n_rows, n_draws))
+    for low, high in (bounds_a, bounds_b):
+        draws *= low[:, None] + np.floor(rng.random((n_rows, n_draws)) * (high - low + 1)[:, None])
+
+    # Any missing answer: fixed value, as the fillna of the point estimate
+    draws[np.isnan(draws)] = missing
+
+    # Bin of each draw, counted per row with one bincount
+    n_bins = len(edges) + 1
+    bins = np.searchsorted(edges, draws, side="left")
+    bins = np.bincount(
+        (np.arange(n_rows)[:, None] * n_bins + bins).ravel(),
+        minlength=n_rows * n_bins
+    ).reshape(n_rows, n_bins) / n_draws
+
+    return np.column_stack([
+        draws.mean(axis=1),
+        np.quantile(draws, quantiles, axis=1).T,
+        bins,
+        *[(draws <= value).mean(axis=1) for value in at_most],
+        *[(draws >= value).mean(axis=1) for value in at_least]
+    ])
+
+def interval_product_distribution(
+    df: pd.DataFrame,
+    col_a: str,
+    col_b: str,
+    intervals_a: dict,
+    intervals_b: dict,
+    edges: list,
+    labels: list,
+    n_draws: int = 10000,
+    at_most: list = (),
+    at_least: list = (),
+    quantiles: list = (0.05, 0.5, 0.95),
+    missing: float = 0,
+    seed=0
+) -> pd.DataFrame:
+    """
+    Distribution of the product of two interval answers per row (e.g. books per year
+    times pages per book), instead of the product of the midpoints.
+
+    Each answer is drawn uniformly among the integers of its interval ({answer: (low,
+    high)}, NaN for missing or unmapped answers, replaced by missing in the product).
+    Rows with the same pair of answers have the same distribution, so the n_draws are
+    made once per observed pair (a single (pairs, n_draws) matrix) and mapped back to
+    the rows through the pair codes. Returns a table with the index of df: mean,
+    q05/q50/q95 (quantiles), the probability p_<label> of each bin (upper edges of
+    a bin scheme, see bin_codes), and p_<=value / p_>=value of the at_most / at_least
+    thresholds.
+    """
+
+    codes_a, categories_a = column_codes(df[col_a])
+    codes_b, categories_b = column_codes(df[col_b])
+
+    # Code of the pair of answers, the last level of each column for NaN
+    n_b = len(categories_b) + 1
+    pair_codes = np.where(codes_a >= 0, codes_a, len(categories_a)) * n_b
+    pair_codes += np.where(codes_b >= 0, codes_b, n_b - 1)
+    observed, inverse = np.unique(pair_codes, return_inverse=True)
+
+    bounds = []
+    for categories, intervals, pair_level in (
+        (categories_a, intervals_a, observed // n_b),
+        (categories_b, intervals_b, observed % n_b)
+    ):
+        # Lookup arrays of the bounds, last position for NaN
+        lut = np.array(
+            [intervals.get(category, (np.nan, np.nan)) for category in categories] + [(np.nan, np.nan)],
+            dtype=float
+        ).reshape(-1, 2)
+        bounds.append((lut[pair_level, 0], lut[pair_level, 1]))
+
+    summary = interval_product_summary(
+        *bounds,
+        n_draws=n_draws,
+        edges=np.asarray(edges, dtype=float),
+        at_most=list(at_most),
+        at_least=list(at_least),
+        quantiles=list(quantiles),
+        missing=missing,
+        rng=np.random.default_rng(seed)
+    )
+
+    columns = (
+        ["mean"]
+        + [f"q{round(q * 100):02d}" for q in quantiles]
+        + [f"p_{label}" for label in labels]
+        + [f"p_<={value}" for value in at_most]
+        + [f"p_>={value}" for value in at_least]
+    )
+
+    return pd.DataFrame(summary[inverse], index=df.index, columns=columns)
+
+def thematic_scores_from_counts(rank_counts: dict, map_thematic: dict) -> pd.DataFrame:
+    """
+    Weighted genre scores from the number of students that gave each rank to each
+    genre ({genre: counts per rank})
+    """
+
+    resultats = {}
+
+    for col, counts in rank_counts.items():
+
+        weights = np.array([map_thematic.get(rank, 0) for rank in counts.index], dtype=float)
+
+        resultats[col] = float((weights * counts.to_numpy()).sum())
+
+    resultats_df = (
+        pd.DataFrame.from_dict(
+            resultats,
+            orient="index",
+            columns=["puntuacio_total"]
+        )
+        .sort_values("puntuacio_total", ascending=False)
+    )
+
+    return resultats_df
+
+def thematic_rank_matrix(df: pd.DataFrame, columnes_generes: list) -> np.ndarray:
+    """
+    Rank block of the genre columns as a dense int8 matrix (students x genres), with 0
+    for missing or non-integer ranks
+    """
+
+    # Column-major, each genre is filled as a contiguous column
+    ranks = np.zeros((len(df), len(columnes_generes)), dtype=np.int8, order="F")
+
+    for j, col in enumerate(columnes_generes):
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        valid = (values >= 1) & (values <= 127) & (values == np.floor(values))
+        ranks[:, j] = np.where(valid, values, 0)
+
+    return ranks
+
+def thematic_scores_groups(df: pd.DataFrame, columnes_generes: list, map_thematic: dict, groups: dict) -> dict:
+    """
+    Weighted genre scores of several groups of students at once ({name: boolean mask
+    over the rows of df}, e.g. readers, girls, a course or a reader class).
+
+    The rank block is converted once to an int8 matrix, map_thematic is applied as a
+    lookup array over the ranks and the scores of all the groups come from a single
+    product with the (groups x students) indicator matrix. Returns {name: table sorted
+    by puntuacio_total}, the same tables as compute_thematic_scores.
+    """
+
+    ranks = thematic_rank_matrix(df, columnes_generes)
+
+    # Weight of each rank, 0 for the missing ones (rank 0)
+    lut = np.array([0] + [map_thematic.get(rank, 0) for rank in range(1, 128)], dtype=float)
+
+    indicator = np.empty((len(groups), len(df)))
+    for i, mask in enumerate(groups.values()):
+        indicator[i] = np.asarray(mask, dtype=bool)
+
+    scores = indicator @ lut[ranks]
+
+    return {
+        name: pd.DataFrame(
+            {"puntuacio_total": scores[i]},
+            index=list(columnes_generes)
+        ).sort_values("puntuacio_total", ascending=False)
+        for i, name in enumerate(groups)
+    }
+
+@cached_result(version=1, columns=lambda params: params["columnes_generes"])
+def compute_thematic_scores(df, columnes_generes, map_thematic):
+
+    return thematic_scores_groups(
+        df, columnes_generes, map_thematic, {"all": np.ones(len(df), dtype=bool)}
+    )["all"]
+
+@cached_result(version=1, columns=lambda params: [params["var1"], params["var2"]])
+def spearman_analysis(df, var1, var2, label="", bootstrap: int = None, seed=0, max_workers: int = None):
+    """
+    Spearman ρ and p-value of two columns (NaN omitted). With bootstrap (number of
+    resamples) also the 95% percentile bootstrap CI of ρ, see spearman_bootstrap
+    """
+
+    from scipy.stats import spearmanr
+
+    rho, p = spearmanr(df[var1], df[var2], nan_policy="omit")
+
+    if bootstrap is not None:
+        ci = spearman_bootstrap(df, [(var1, var2)], bootstrap, seed=seed, max_workers=max_workers)
+        ci_low, ci_high = ci.iloc[0][["ci_low", "ci_high"]]
+
+    print(f"{label}")
+    print(f"ρ = {rho:.3f}")
+    print(f"p-value = {p:.5f}")
+    if bootstrap is not None:
+        print(f"95% CI = [{ci_low:.3f}, {ci_high:.3f}]")
+    print("--------------------------------------------------------")
+
+    if bootstrap is not None:
+        return rho, p, (ci_low, ci_high)
+
+    return rho, p
+
+def kendall_analysis(df, var1, var2, label=""):
+    """
+    Kendall τ-b, Goodman-Kruskal γ and the (asymptotic) p-value of two ordinal
+    columns (NaN omitted), from their joint table, see kendall_from_tables
+    """
+
+    row = spearman_pairs(df, [(var1, var2)]).iloc[0]
+
+    print(f"{label}")
+    print(f"τ-b = {row['tau_b']:.3f}")
+    print(f"γ = {row['gamma']:.3f}")
+    print(f"p-value = {row['p_kendall']:.5f}")
+    print("--------------------------------------------------------")
+
+    return row["tau_b"], row["gamma"], row["p_kendall"]
+
+def spearman_codes(df: pd.DataFrame, columns: list) -> dict:
+    """
+    Codes of the distinct values of each column, {col: (codes, n_levels)}, with -1 for NaN
+    """
+
+    codes = {}
+    for col in dict.fromkeys(columns):
+        col_codes, levels = column_codes(pd.to_numeric(df[col], errors="coerce"))
+        codes[col] = (col_codes, len(levels))
+
+    return codes
+
+def spearman_from_tables(tables: np.ndarray) -> tuple:
+    """
+    Spearman ρ, p-value and n of a stack of joint tables of counts (..., k, k):
+    ρ is the correlation of the midranks of the levels weighted by the joint counts
+    """
+
+    from scipy.special import stdtr
+
+    # Midranks of each level from the marginal counts, centered on the mean rank
+    rows = tables.sum(axis=-1)
+    cols = tables.sum(axis=-2)
+    n = rows.sum(axis=-1)
+    mean_rank = (n[..., None] + 1) / 2
+    rank_a = np.cumsum(rows, axis=-1) - (rows - 1) / 2 - mean_rank
+    rank_b = np.cumsum(cols, axis=-1) - (cols - 1) / 2 - mean_rank
+
+    cov = np.einsum("...i,...ij,...j->...", rank_a, tables, rank_b)
+    var_a = (rows * rank_a ** 2).sum(axis=-1)
+    var_b = (cols * rank_b ** 2).sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = cov / np.sqrt(var_a * var_b)
+        rho = np.clip(rho, -1, 1)
+        dof = n - 2
+        t = rho * np.sqrt((dof / ((rho + 1.0) * (1.0 - rho))).clip(0))
+        p = 2 * stdtr(dof, -np.abs(t))
+
+    # Constant column or less than 3 observations: not defined
+    undefined = (var_a == 0) | (var_b == 0) | (n < 3)
+    rho[undefined] = np.nan
+    p[undefined] = np.nan
+
+    return rho, p, n
+
+def kendall_from_tables(tables: np.ndarray) -> tuple:
+    """
+    Kendall τ-b, Goodman-Kruskal γ and their p-value of a stack of joint tables of
+    counts (..., k1, k2), with a cost that depends on the number of levels, not on n.
+
+    The concordant (discordant) pairs of each cell are its count times the counts below
+    and to the right (left), from cumulative sums of the table. The p-value is the one of
+    scipy.stats.kendalltau(method="asymptotic") (variance with ties); γ shares it, both
+    test concordant - discordant = 0.
+    """
+
+    from scipy.special import ndtr
+
+    # Counts of the rows after each one, then of the columns after/before each cell
+    below = np.flip(np.cumsum(np.flip(tables, axis=-2), axis=-2), axis=-2)
+    below = np.concatenate([below[..., 1:, :], np.zeros_like(below[..., :1, :])], axis=-2)
+    below_right = np.flip(np.cumsum(np.flip(below, axis=-1), axis=-1), axis=-1)
+    below_right = np.concatenate([below_right[..., 1:], np.zeros_like(below_right[..., :1])], axis=-1)
+    below_left = np.cumsum(below, axis=-1)
+    below_left = np.concatenate([np.zeros_like(below_left[..., :1]), below_left[..., :-1]], axis=-1)
+
+    concordant = (tables * below_right).sum(axis=(-2, -1))
+    discordant = (tables * below_left).sum(axis=(-2, -1))
+
+    rows = tables.sum(axis=-1)
+    cols = tables.sum(axis=-2)
+    n = rows.sum(axis=-1)
+
+    # Ties of each variable: pairs, and the two sums of the variance with ties
+    x_tie = (rows * (rows - 1) / 2).sum(axis=-1)
+    x0 = (rows * (rows - 1) * (rows - 2)).sum(axis=-1)
+    x1 = (rows * (rows - 1) * (2 * rows + 5)).sum(axis=-1)
+    y_tie = (cols * (cols - 1) / 2).sum(axis=-1)
+    y0 = (cols * (cols - 1) * (cols - 2)).sum(axis=-1)
+    y1 = (cols * (cols - 1) * (2 * cols + 5)).sum(axis=-1)
+
+    total = n * (n - 1) / 2
+    con_minus_dis = concordant - discordant
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau_b = np.clip(con_minus_dis / np.sqrt(total - x_tie) / np.sqrt(total - y_tie), -1, 1)
+        gamma = con_minus_dis / (concordant + discordant)
+
+        m = n * (n - 1.)
+        var = ((m * (2 * n + 5) - x1 - y1) / 18 +
+               (2 * x_tie * y_tie) / m + x0 * y0 / (9 * m * (n - 2)))
+        p = 2 * ndtr(-np.abs(con_minus_dis / np.sqrt(var)))
+
+    # Constant column (all the pairs tied) or less than 3 observations: not defined
+    undefined = (x_tie == total) | (y_tie == total) | (n < 3)
+    tau_b[undefined] = np.nan
+    gamma[undefined] = np.nan
+    p[undefined] = np.nan
+
+    return tau_b, gamma, p
+
+def pairs_columns(params: dict) -> list:
+    """
+    Columns read by the batch functions: both variables of the pairs plus the strata
+    """
+
+    by = params.get("by") or []
+    by = [by] if isinstance(by, str) else list(by)
+
+    return [col for pair in params["pairs"] for col in pair] + by
+
+def strata_codes(df: pd.DataFrame, by: list) -> tuple:
+    """
+    Group code of every row for the strata of the by columns (-1 when any of them is NaN)
+    and the label tuple of each group, only the observed combinations in category order
+    """
+
+    codes = np.zeros(len(df), dtype=np.int64)
+    labels = []
+    for col in by:
+        col_codes, col_labels = column_codes(df[col])
+        codes = np.where((codes >= 0) & (col_codes >= 0), codes * len(col_labels) + col_codes, -1)
+        labels.append(col_labels)
+
+    valid = codes >= 0
+    observed, codes[valid] = np.unique(codes[valid], return_inverse=True)
+
+    # Digits of each observed combination, last column first
+    digits = []
+    for col_labels in reversed(labels):
+        observed, digit = np.divmod(observed, len(col_labels))
+        digits.append(col_labels[digit])
+    groups = list(zip(*reversed(digits)))
+
+    return codes, groups
+
+@cached_result(version=2, columns=pairs_columns)
+def spearman_pairs(
+    df: pd.DataFrame,
+    pairs: list,
+    by=None,
+    bootstrap: int = None,
+    seed=0,
+    max_workers: int = None
+) -> pd.DataFrame:
+    """
+    Spearman ρ and p-value of many (var1, var2) pairs in one batch.
+
+    Each column is reduced once to the codes of its distinct values, all the pairwise
+    joint tables (pairwise complete rows, as nan_policy="omit") come from a single
+    bincount, and ρ is the correlation of the midranks weighted by the joint counts.
+    Same ρ and p-value (t distribution with n - 2 gl) as scipy.stats.spearmanr.
+    Returns a table indexed by (var1, var2) with rho, p and n, the Kendall τ-b and
+    Goodman-Kruskal γ of the same tables (tau_b, gamma, p_kendall, see
+    kendall_from_tables), plus ci_low and ci_high of ρ when bootstrap (number of
+    resamples) is given, see spearman_bootstrap.
+
+    With by (column or list of columns, e.g. "Curs") the correlations are stratified:
+    the same bincount gets one joint table per group, so the ranks are taken within
+    each group, and the table is indexed by (*by, var1, var2). The (group × predictor ×
+    outcome) cube is results["rho"].unstack("var2"); see pool_strata.
+    """
+
+    by = [by] if isinstance(by, str) else list(by or [])
+
+    if len(by) > 0:
+        group_codes, groups = strata_codes(df, by)
+        index = pd.MultiIndex.from_tuples(
+            [(*group, var1, var2) for group in groups for var1, var2 in pairs],
+            names=by + ["var1", "var2"]
+        )
+    else:
+        group_codes, groups = np.zeros(len(df), dtype=np.int64), [()]
+        index = pd.MultiIndex.from_tuples(pairs, names=["var1", "var2"])
+
+    if len(index) == 0:
+        results = pd.DataFrame(
+            {"rho": [], "p": [], "n": [], "tau_b": [], "gamma": [], "p_kendall": []},
+            index=index
+        )
+    else:
+        codes = spearman_codes(df, [col for pair in pairs for col in pair])
+
+        k = max(max(n_levels for _, n_levels in codes.values()), 1)
+        n_pairs = len(pairs)
+        n_groups = len(groups)
+
+        # Joint tables (n_groups * n_pairs, k, k) of all the groups and pairs with one bincount
+        a = np.stack([codes[var1][0] for var1, _ in pairs])
+        b = np.stack([codes[var2][0] for _, var2 in pairs])
+        valid = (a >= 0) & (b >= 0) & (group_codes >= 0)
+        flat = ((group_codes * n_pairs + np.arange(n_pairs)[:, None]) * k + a) * k + b
+        tables = np.bincount(
+            flat[valid],
+            minlength=n_groups * n_pairs * k * k
+        ).reshape(n_groups * n_pairs, k, k).astype(float)
+
+        rho, p, n = spearman_from_tables(tables)
+        tau_b, gamma, p_kendall = kendall_from_tables(tables)
+        results = pd.DataFrame({
+            "rho": rho,
+            "p": p,
+            "n": n.astype(int),
+            "tau_b": tau_b,
+            "gamma": gamma,
+            "p_kendall": p_kendall
+        }, index=index)
+
+    if bootstrap is not None:
+        ci = pd.concat([
+            spearman_bootstrap(df[group_codes == g], pairs, bootstrap, seed=seed, max_workers=max_workers)
+            for g in range(len(groups))
+        ])
+        ci.index = index
+        results = results.join(ci)
+
+    return results
+
+def pool_strata(results: pd.DataFrame, confidence: float = 0.95) -> pd.DataFrame:
+    """
+    Pooled stratified ρ of each (var1, var2) from a stratified spearman_pairs table:
+    Fisher z of each group weighted by n - 3, with the variance 1.06 / (n - 3) of the
+    Spearman z. Returns rho, ci_low, ci_high, p, n and strata (groups used), plus the
+    Cochran's Q and its p-value (p_het) of the heterogeneity between the groups.
+    Groups where ρ is not defined or n <= 3 are left out.
+    """
+
+    from scipy.special import chdtrc, ndtr, ndtri
+
+    used = results["rho"].notna() & (results["n"] > 3)
+    w = (results["n"] - 3).where(used, 0).astype(float)
+    z = np.arctanh(results["rho"].clip(-1 + 1e-12, 1 - 1e-12)).where(used, 0)
+
+    sums = pd.DataFrame({
+        "w": w,
+        "wz": w * z,
+        "wzz": w * z ** 2,
+        "n": results["n"].where(used, 0),
+        "strata": used.astype(int)
+    }).groupby(level=["var1", "var2"], sort=False).sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_pooled = sums["wz"] / sums["w"]
+        se = np.sqrt(1.06 / sums["w"])
+        z_crit = ndtri(1 - (1 - confidence) / 2)
+        q = (sums["wzz"] - sums["w"] * z_pooled ** 2) / 1.06
+
+        pooled = pd.DataFrame({
+            "rho": np.tanh(z_pooled),
+            "ci_low": np.tanh(z_pooled - z_crit * se),
+            "ci_high": np.tanh(z_pooled + z_crit * se),
+            "p": 2 * ndtr(-np.abs(z_pooled / se)),
+            "n": sums["n"].astype(int),
+            "strata": sums["strata"],
+            "q": q.clip(lower=0),
+            "p_het": chdtrc(sums["strata"] - 1, q.clip(lower=0)).where(sums["strata"] > 1)
+        })
+
+    return pooled
+
+def seeded_chunks(n: int, chunk_size: int, seed) -> list:
+    """
+    Split n simulations in chunks of chunk_size, each one with its own random stream
+    spawned from seed (int or SeedSequence): [(size, seed_sequence), ...]
+    """
+
+    sizes = [chunk_size] * (n // chunk_size)
+    if n % chunk_size > 0:
+        sizes.append(n % chunk_size)
+
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+
+    return list(zip(sizes, seed.spawn(len(sizes))))
+
+def run_chunks(func, tasks: list, max_workers: int = None) -> list:
+    """
+    Results of func(*task) for every task, in a process pool when there are several
+    """
+
+    if len(tasks) <= 1 or max_workers == 1:
+        return [func(*task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, *zip(*tasks)))
+
+def spearman_bootstrap_chunk(cells: np.ndarray, k: int, n_resamples: int, seed) -> np.ndarray:
+    """
+    ρ of n_resamples bootstrap resamples of the rows for each pair (n_pairs, n_resamples).
+
+    cells holds the joint table cell of every row for each pair (n_pairs, n_rows),
+    -1 when one of the two answers is NaN. All the resample indices are drawn as one
+    (n_resamples, n_rows) matrix shared by the pairs.
+    """
+
+    n_pairs, n_rows = cells.shape
+    rng = np.random.default_rng(seed)
+    resamples = rng.integers(0, n_rows, size=(n_resamples, n_rows))
+
+    offsets = np.arange(n_resamples)[:, None] * (k * k)
+    tables = np.empty((n_pairs, n_resamples, k, k))
+    for pair in range(n_pairs):
+        resampled = cells[pair][resamples]
+        valid = resampled >= 0
+        tables[pair] = np.bincount(
+            (resampled + offsets)[valid],
+            minlength=n_resamples * k * k
+        ).reshape(n_resamples, k, k)
+
+    rho, _, _ = spearman_from_tables(tables)
+
+    return rho
+
+def spearman_bootstrap(
+    df: pd.DataFrame,
+    pairs: list,
+    n_resamples: int = 10000,
+    confidence: float = 0.95,
+    seed=0,
+    max_workers: int = None,
+    chunk_size: int = None
+) -> pd.DataFrame:
+    """
+    Percentile bootstrap confidence intervals of the Spearman ρ of many (var1, var2) pairs.
+
+    The rows (students) are resampled with replacement, so every pair of a batch sees
+    the same resamples. The resamples are split in chunks of chunk_size (by default
+    about two million resampled rows per chunk), each one with its own stream spawned
+    from seed, and the chunks run in a process pool; the result only depends on the
+    data, seed and chunk_size, not on max_workers. Resamples where ρ is not defined
+    (constant answers) are ignored. Returns a table indexed by (var1, var2) with
+    ci_low and ci_high.
+    """
+
+    index = pd.MultiIndex.from_tuples(pairs, names=["var1", "var2"])
+    if len(pairs) == 0 or len(df) == 0:
+        return pd.DataFrame({"ci_low": np.nan, "ci_high": np.nan}, index=index)
+
+    codes = spearman_codes(df, [col for pair in pairs for col in pair])
+    k = max(max(n_levels for _, n_levels in codes.values()), 1)
+
+    # Joint table cell of every row for each pair, -1 for pairwise incomplete rows
+    a = np.stack([codes[var1][0] for var1, _ in pairs])
+    b = np.stack([codes[var2][0] for _, var2 in pairs])
+    cells = np.where((a >= 0) & (b >= 0), a * k + b, -1)
+
+    if chunk_size is None:
+        chunk_size = int(np.clip(2_000_000 // len(df), 1, 1000))
+
+    run = partial(spearman_bootstrap_chunk, cells, k)
+    rhos = run_chunks(run, seeded_chunks(n_resamples, chunk_size, seed), max_workers=max_workers)
+
+    rhos = np.concatenate(rhos, axis=1)
+
+    alpha = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        # All-NaN pairs (ρ never defined) get a NaN interval
+        warnings.simplefilter("ignore", RuntimeWarning)
+        ci_low, ci_high = np.nanquantile(rhos, [alpha, 1 - alpha], axis=1)
+
+    return pd.DataFrame({"ci_low": ci_low, "ci_high": ci_high}, index=index)
+
+def spearman_matrix(
+    df: pd.DataFrame,
+    predictors: list,
+    outcomes: list,
+    extra_pairs: list = (),
+    by=None,
+    bootstrap: int = None,
+    seed=0,
+    max_workers: int = None
+) -> pd.DataFrame:
+    """
+    Spearman of every predictor against every outcome (plus extra_pairs) in one batch,
+    see spearman_pairs
+    """
+
+    pairs = [(predictor, outcome) for predictor in predictors for outcome in outcomes]
+    pairs += [pair for pair in extra_pairs if pair not in pairs]
+
+    return spearman_pairs(df, pairs, by=by, bootstrap=bootstrap, seed=seed, max_workers=max_workers)
+
+def report_spearman(results: pd.DataFrame, items: list):
+    """
+    Print the results of spearman_pairs/spearman_matrix for the (var1, var2, label)
+    items, in the same format as spearman_analysis
+    """
+
+    for var1, var2, label in items:
+        row = results.loc[(var1, var2)]
+
+        print(f"{label}")
+        print(f"ρ = {row['rho']:.3f}")
+        print(f"p-value = {row['p']:.5f}")
+        if "ci_low" in results.columns:
+            print(f"95% CI = [{row['ci_low']:.3f}, {row['ci_high']:.3f}]")
+        print("--------------------------------------------------------")
+
+def bivariate_normal_cdf(h, k, rho: float) -> np.ndarray:
+    """
+    Standard bivariate normal CDF Φ2(h, k; ρ) of arrays of finite thresholds (broadcast),
+    exact to machine precision with Owen's T function
+    """
+
+    from scipy.special import ndtr, owens_t
+
+    h, k = np.broadcast_arrays(np.asarray(h, dtype=float), np.asarray(k, dtype=float))
+    s = np.sqrt((1 - rho) * (1 + rho))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a_h = (k - rho * h) / (h * s)
+        a_k = (h - rho * k) / (k * s)
+
+    # h = 0 or k = 0: limit of a with the sign of the numerator
+    a_h = np.where(h == 0, np.copysign(np.inf, k - rho * h), a_h)
+    a_k = np.where(k == 0, np.copysign(np.inf, h - rho * k), a_k)
+    beta = 0.5 * ((h * k < 0) | ((h * k == 0) & (h + k < 0)))
+
+    cdf = 0.5 * ndtr(h) + 0.5 * ndtr(k) - owens_t(h, a_h) - owens_t(k, a_k) - beta
+
+    return np.where((h == 0) & (k == 0), 0.25 + np.arcsin(rho) / (2 * np.pi), cdf)
+
+def polychoric_thresholds(codes: np.ndarray, n_levels: int) -> np.ndarray:
+    """
+    Thresholds of the latent normal variable of an ordinal item (n_levels + 1, from -inf
+    to inf) from the cumulative proportions of its answers (codes, -1 for NaN)
+    """
+
+    from scipy.special import ndtri
+
+    counts = np.bincount(codes[codes >= 0], minlength=n_levels)
+    cumulative = np.cumsum(counts)[:-1] / counts.sum()
+
+    return np.concatenate([[-np.inf], ndtri(cumulative), [np.inf]])
+
+def polychoric_from_table(table: np.ndarray, row_thresholds: np.ndarray, col_thresholds: np.ndarray) -> float:
+    """
+    Polychoric ρ of a joint table of counts with the thresholds of both items fixed
+    (two-step estimator): maximum of the bivariate normal likelihood of the cells.
+    NaN, without optimizing, when an item has fewer than 2 observed levels in the table
+    (the likelihood doesn't depend on ρ) or infinite inner thresholds
+    """
+
+    from scipy.optimize import minimize_scalar
+    from scipy.special import ndtr
+
+    row_levels = np.count_nonzero(table.sum(axis=1))
+    col_levels = np.count_nonzero(table.sum(axis=0))
+    if row_levels < 2 or col_levels < 2:
+        return np.nan
+
+    if not (np.isfinite(row_thresholds[1:-1]).all() and np.isfinite(col_thresholds[1:-1]).all()):
+        return np.nan
+
+    # CDF at the grid of thresholds, the borders (±inf) don't depend on ρ
+    cdf = np.zeros((len(row_thresholds), len(col_thresholds)))
+    cdf[-1, 1:] = ndtr(col_thresholds[1:])
+    cdf[1:, -1] = ndtr(row_thresholds[1:])
+    h = row_thresholds[1:-1, None]
+    k = col_thresholds[None, 1:-1]
+    observed = table > 0
+
+    def neg_log_likelihood(rho):
+        cdf[1:-1, 1:-1] = bivariate_normal_cdf(h, k, rho)
+        probs = np.diff(np.diff(cdf, axis=0), axis=1)
+        return -(table[observed] * np.log(np.clip(probs[observed], 1e-300, None))).sum()
+
+    result = minimize_scalar(neg_log_likelihood, bounds=(-0.9999, 0.9999), method="bounded", options={"xatol": 1e-8})
 
-    # Poltergeist 6: Incongruencia entre tiempo de lectura y libros leidos
-    polt_id = 300
-    if verbose:
-        print(f"\n------------ Saved Poltergeist 6 (id={polt_id})----------------\n > Incongruencia entre tiempo de lectura y número de libros leídos")
-        print(df[df["id"] == polt_id][show_list].to_string(index=False))
-    df.loc[df["id"] == polt_id, "p5_llibres"] = "3-5 llibres o còmics."
+    return result.x
 
-    # Poltergeist 7: Troll
-    polt_id = 320
-    if verbose:
-        show_list_7 = [
-            "id",
-            "p4_temps_lectura", 
-            "p5_llibres", 
-            "p6_pag", 
-            "Gènere"
-        ]
-        print(f"\n------------ Saved Poltergeist 7 (id={polt_id})----------------\n > Troll")
-        print(df[df["id"] == polt_id][show_list_7].to_string(index=False))
-    df.loc[df["id"] == polt_id, "p5_llibres"] = "0 llibres o còmics."
-    df.loc[df["id"] == polt_id, "p4_temps_lectura"] = "0 minuts."
-
-    # # Poltergeist X: Incongruencia entre tiempo de lectura y número de libros leídos (NO APLICADA, NO ES FILTRA)
-    # if verbose:
-    #     print("\n------------ Poltergeist 5 (id=105)----------------\n > Incongruencia entre tiempo de lectura y número de libros leídos")
-    #     print(df[df["id"] == 105][show_list].to_string(index=False)) # 2026/04/27 11:38:51 a. m. EEST
-    # df.loc[df["id"] == 105, "p4_temps_lectura"] = "Entre 30 minuts i 1 hora a la setmana."
-    
-    # Poltergeists perdidos:
-    # - 191 - "2026/04/29 12:51:31 p. m. EEST"
-    # - 263 - "2026/04/30 2:55:27 p. m. EEST"
-    # - 252 - "2026/04/30 2:51:15 p. m. EEST"
-    # - 52
-    # - 58
-    # - 74
-    # - 6
-    # - 29
-    # - 103
-    # - 143
-    # - 298
+def polychoric_chunk(tasks: list) -> list:
+    """
+    Polychoric ρ of a chunk of (table, row_thresholds, col_thresholds)
+    """
 
-    return df
+    return [polychoric_from_table(*task) for task in tasks]
 
-def clean_reading_dataset_and_consistency(
-    df: pd.DataFrame,
-    verbose: bool = False,
-) -> pd.DataFrame:
+@cached_result(version=2, columns=lambda params: params["items"])
+def polychoric_matrix(df: pd.DataFrame, items: list, max_workers: int = None, chunk_size: int = 50) -> pd.DataFrame:
     """
-    Clean reading dataset and fix inconsistent answers.
+    Polychoric correlation matrix of ordinal items (Likert answers coded as numbers).
+
+    The thresholds of each item are estimated once, from its marginal proportions, and
+    shared by all its pairs (two-step estimator). Each pair only fits ρ by maximum
+    likelihood on its joint table (pairwise complete rows); the pairs are split in
+    chunks of chunk_size that run in a process pool. NaN for the pairs where an item
+    has fewer than 2 observed levels (constant items).
     """
 
-    df = df.copy()
+    codes = spearman_codes(df, items)
+    thresholds = {item: polychoric_thresholds(*codes[item]) for item in items}
 
-    show_list = [
-        "id",
-        "p4_temps_lectura",
-        "p5_llibres",
-        "p6_pag",
-        "sessions",
-        "format"
-    ]
+    pairs = [(i, j) for i in range(len(items)) for j in range(i + 1, len(items))]
+    tasks = []
+    for i, j in pairs:
+        (a, n_a), (b, n_b) = codes[items[i]], codes[items[j]]
+        valid = (a >= 0) & (b >= 0)
+        table = np.bincount(a[valid] * n_b + b[valid], minlength=n_a * n_b).reshape(n_a, n_b)
+        tasks.append((table, thresholds[items[i]], thresholds[items[j]]))
 
-    # =========================================================
-    # BASE MASKS
-    # =========================================================
+    chunks = [(tasks[start:start + chunk_size],) for start in range(0, len(tasks), chunk_size)]
+    rhos = [rho for chunk in run_chunks(polychoric_chunk, chunks, max_workers=max_workers) for rho in chunk]
 
-    mask_no_lectura_oci = (
-        (df["sessions"] == "No llegeixo per oci.") |
-        (df["format"] == "No llegeixo per oci.")
-    )
+    matrix = np.eye(len(items))
+    for (i, j), rho in zip(pairs, rhos):
+        matrix[i, j] = matrix[j, i] = rho
 
-    temps_alts = [
-        "Entre 30 minuts i 1 hora a la setmana.",
-        "Entre 1 i 2 hores a la setmana.",
-        "Entre 2 i 3 hores a la setmana.",
-        "3 hores o més a la setmana."
-    ]
+    return pd.DataFrame(matrix, index=items, columns=items)
 
-    # NO APLICATS -> Pot ser que llegeixi poc una setaman habitual perque llegeix a l'estiu
-    temps_baixos = [
-        "0 minuts.",
-        "Menys de 30 minuts a la setmana."
-    ]
-    
-    llibres_alts = [
-        "11-15 llibres o còmics.",
-        "Més de 15 llibres o còmics"
-    ]
-    # -------------------------------------------------------------------------------------
+# Association measures of the correlations store: p-value column and label
+MEASURES = {
+    "rho": ("p", "Spearman ρ"),
+    "tau_b": ("p_kendall", "Kendall τ-b"),
+    "gamma": ("p_kendall", "Goodman-Kruskal γ"),
+}
 
-    llibres_baixos = [
-        "0 llibres o còmics.",
-        "1-2 llibres o còmics."
-    ]
+def correlation_cell(results: pd.DataFrame, var1: str, var2: str) -> dict:
+    """
+    Cell of the correlations store (rho, p, n, ci_low, ci_high, tau_b, gamma, p_kendall)
+    from a spearman_pairs table; the CI is NaN when the table has no bootstrap
+    """
 
-    mask_incongruencia_temps_alts_llibres_baixos = (
-        df["p4_temps_lectura"].isin(temps_alts) &
-        df["p5_llibres"].isin(llibres_baixos)
-    )
+    row = results.loc[(var1, var2)]
+
+    return {
+        "rho": row["rho"],
+        "p": row["p"],
+        "n": int(row["n"]),
+        "ci_low": row.get("ci_low", np.nan),
+        "ci_high": row.get("ci_high", np.nan),
+        "tau_b": row.get("tau_b", np.nan),
+        "gamma": row.get("gamma", np.nan),
+        "p_kendall": row.get("p_kendall", np.nan)
+    }
 
-    # NO APLICADA -> Pot ser que llegeixi poc una setaman habitual perque llegeix a l'estiu
-    mask_incongruencia_temps_baixos_llibres_alts = (
-        df["p4_temps_lectura"].isin(temps_baixos) &
-        df["p5_llibres"].isin(llibres_alts)
-    )
-    # -------------------------------------------------------------------------------------º
+def adjust_p_values(p, method: str = "holm") -> np.ndarray:
+    """
+    p-values adjusted for multiple testing: "holm" (family-wise error rate) or "bh"
+    (Benjamini-Hochberg, false discovery rate). NaN p-values are not counted as tests.
+    """
 
-    # =========================================================
-    # VERBOSE OUTPUT
-    # =========================================================
+    p = np.asarray(p, dtype=float)
+    adjusted = np.full(p.shape, np.nan)
 
-    if verbose:
+    tested = np.flatnonzero(~np.isnan(p))
+    m = len(tested)
+    if m == 0:
+        return adjusted
 
-        print("\n========================================================================================")
-        print("Filters to clean Dataset")
-        print("========================================================================================")
+    order = tested[np.argsort(p[tested], kind="stable")]
+    ranks = np.arange(1, m + 1)
 
-        debug_filters = {
-            "No lectura per oci però temps de lectura setmanal > 0": (
-                mask_no_lectura_oci &
-                (df["p4_temps_lectura"] != "0 minuts.")
-            ),
-
-            "No lectura per oci però llibres anuals > 0": (
-                mask_no_lectura_oci &
-                (df["p5_llibres"] != "0 llibres o còmics.")
-            ),
-
-            "Incongruencia temps alts i llibres baixos": (
-                mask_incongruencia_temps_alts_llibres_baixos
-            ), # NO APLICADA!!!
-            "NO APLICAT!! --> Incongruencia temps baixos i llibres alts": (
-                mask_incongruencia_temps_baixos_llibres_alts
-            )
-        }
+    if method == "holm":
+        sorted_adjusted = np.maximum.accumulate((m - ranks + 1) * p[order])
+    elif method == "bh":
+        sorted_adjusted = np.minimum.accumulate((m / ranks * p[order])[::-1])[::-1]
+    else:
+        raise ValueError(f"Unknown multiple-testing correction '{method}' (holm, bh)")
 
-        already_shown = pd.Series(False, index=df.index)
+    adjusted[order] = np.minimum(sorted_adjusted, 1)
 
-        for title, current_mask in debug_filters.items():
+    return adjusted
 
-            # evitar duplicados entre bloques
-            current_mask = current_mask & ~already_shown
+def correlations_table(correlations_dict: dict, measure: str = "rho") -> pd.DataFrame:
+    """
+    Long table of the correlations store ({row: {column: cell}}), one line per cell,
+    with the Holm and Benjamini-Hochberg p-values of the measure (see MEASURES)
+    corrected across all the cells
+    """
 
-            current_df = df[current_mask]
+    table = pd.DataFrame([
+        {"row": row, "column": column, **cell}
+        for row, cells in correlations_dict.items()
+        for column, cell in cells.items()
+    ], columns=["row", "column", "rho", "p", "n", "ci_low", "ci_high", "tau_b", "gamma", "p_kendall"])
 
-            print(f"\n{title} [{len(current_df)}] -----------------------------")
+    p_column = MEASURES[measure][0]
+    table["p_holm"] = adjust_p_values(table[p_column], "holm")
+    table["p_bh"] = adjust_p_values(table[p_column], "bh")
 
-            if len(current_df) > 0:
-                print(current_df[show_list].to_string(index=False))
+    return table.set_index(["row", "column"])
 
-            already_shown |= current_mask
+def random_tables(rows: np.ndarray, cols: np.ndarray, n_tables: int, rng) -> np.ndarray:
+    """
+    n_tables random contingency tables (n_tables, r, c) with the given row and column
+    totals, uniformly among all the tables with those margins (the null distribution of
+    independence, as Patefield's algorithm). Cell by cell, each count is a hypergeometric
+    draw of what is left of its row, vectorized over the tables.
+    """
 
-    # =========================================================
-    # CLEANING
-    # =========================================================
+    r, c = len(rows), len(cols)
+    tables = np.zeros((n_tables, r, c), dtype=np.int64)
+    cols_left = np.tile(np.asarray(cols, dtype=np.int64), (n_tables, 1))
 
-    df.loc[mask_no_lectura_oci, "p4_temps_lectura"] = "0 minuts."
-    df.loc[mask_no_lectura_oci, "p5_llibres"] = "0 llibres o còmics."
-    df.loc[mask_no_lectura_oci, "sessions"] = "No llegeixo per oci."
-    df.loc[mask_no_lectura_oci, "format"] = "No llegeixo per oci."
+    for i in range(r - 1):
+        row_left = np.full(n_tables, rows[i], dtype=np.int64)
+        others = cols_left.sum(axis=1)
 
-    df.loc[mask_incongruencia_temps_alts_llibres_baixos, "p4_temps_lectura"] = "0 minuts."
-    df.loc[mask_incongruencia_temps_alts_llibres_baixos, "sessions"] = "No llegeixo per oci."
-    df.loc[mask_incongruencia_temps_alts_llibres_baixos, "format"] = "No llegeixo per oci."
+        for j in range(c - 1):
+            others = others - cols_left[:, j]
+            tables[:, i, j] = rng.hypergeometric(cols_left[:, j], others, row_left)
+            row_left -= tables[:, i, j]
 
-    # NO APLICAT -> Pot ser que llegeixi poc una setaman habitual perque llegeix a l'estiu
-    # df.loc[mask_incongruencia_temps_baixos_llibres_alts, "p4_temps_lectura"] = "0 minuts.
-    # -------------------------------------------------------------------------------------
+        tables[:, i, c - 1] = row_left
+        cols_left -= tables[:, i]
 
-    if verbose:
-        print("\n========================================================================================")
-        print("Unfiltered Inconsistencies")
-        print("========================================================================================")
-        print("\n------------ Numero de pag NaN pero no 0 minuts ----------------")
-        print(df[(df["p6_pag"].isna()) & (df["p4_temps_lectura"] != "0 minuts.")][show_list].to_string(index=False))
-        print("\n------------ Numero de pag NaN pero no 0 llibres ----------------")
-        print(df[(df["p6_pag"].isna()) & (df["p5_llibres"] != "0 llibres o còmics.")][show_list].to_string(index=False))
-        print("\n------------ Menys de 30 minuts i 0 llibres ----------------")
-        print(df[(df["p4_temps_lectura"] == "Menys de 30 minuts a la setmana.") & (df["p5_llibres"] == "0 llibres o còmics.")][show_list].to_string(index=False))
-        print("\n------------ Entre 30 minuts i 1 hora a la setmana i 0 llibres. ----------------")
-        print(df[(df["p4_temps_lectura"] == "Entre 30 minuts i 1 hora a la setmana.") & (df["p5_llibres"] == "0 llibres o còmics.")][show_list].to_string(index=False))
-        print("\n------------ Entre 1 i 2 hores a la setmana i 0 llibres. ----------------")
-        print(df[(df["p4_temps_lectura"] == "Entre 1 i 2 hores a la setmana.") & (df["p5_llibres"] == "0 llibres o còmics.")][show_list].to_string(index=False))
-        print("\n------------ Incongruencies llibres alts i temps baixos ----------------")
-        print("* Beneficio de la duda, pot ser que llegeixi poc durant setmanes habituals perque llegeix a l'estiu")
-        print(df[mask_incongruencia_temps_baixos_llibres_alts][show_list].to_string(index=False))
-        
-    return df
+    tables[:, r - 1] = cols_left
 
-def export_dataset(df: pd.DataFrame, csv_name: str):
+    return tables
+
+def chi_square_simulation_chunk(rows: np.ndarray, cols: np.ndarray, statistic: float, n_tables: int, seed) -> int:
     """
-    Export cleaned dataset with original question texts as column names.
+    Number of n_tables random tables with the margins rows and cols whose Pearson χ²
+    is at least statistic
     """
 
-    reverse_mapping = {
-        "p4_temps_lectura": "Quant temps a la setmana dediques, de mitjana, a la lectura de llibres o còmics per oci? (Ja sigui en format físic o digital).",
-        "p5_llibres": "Quants llibres o còmics t’has llegit aproximadament en els últims 12 mesos per oci? (Ja sigui en format físic o digital)",
-        "p6_pag": "En cas que la resposta hagi estat diferent de 0 llibres o còmics, quantes pàgines, de mitjana, tenien aproximadament aquests llibres o còmics?",
-        "p7_lectura_actual": "Actualment estàs llegint algun llibre o còmic per oci?",
-        "p10_visites_biblioteca": "Quants cops aproximadament has visitat una biblioteca per llegir o agafar llibres en préstec en els últims 12 mesos per oci?",
-        "p16_lectura_obligatoria": "En quin grau llegeixes les lectures obligatòries de l’escola?",
-        "format": "Quin format de lectura utilitzes més habitualment per a la lectura de llibres o còmics per oci? ",
-        "sessions": "Quan llegeixes, com acostumen a ser les teves sessions de lectura?",
-        "Novel·la fantàstica": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la fantàstica.]",
-        "Novel·la romàntica": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la romàntica.]",
-        "Novel·la de terror": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la de terror.]",
-        "Novel·la negra": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la negra.]",
-        "Novel·la històrica": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Novel·la històrica.]",
-        "Ciència ficció": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Ciència ficció.]",
-        "Còmic": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Còmic.]",
-        "Clàssics": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Clàssics.]",
-        "Poesia": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Poesia.]",
-        "Assaig": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Assaig (Filosofia, divulgació científica, etc.)]",
-        "Teatre": "Marca ordenadament els 3 gèneres literaris que més llegeixes per oci. [Teatre.]"
-    }
+    rng = np.random.default_rng(seed)
+    tables = random_tables(rows, cols, n_tables, rng)
 
-    df_to_export = df.copy()
-    df_to_export = df_to_export.rename(columns=reverse_mapping)
-    df_to_export = df_to_export.drop(columns=["id"])
-    df_to_export.to_csv(
-        csv_name,
-        index=False,
-        encoding="utf-8-sig",
-        quoting=csv.QUOTE_ALL
-    )
+    expected = np.outer(rows, cols) / rows.sum()
+    simulated = ((tables - expected) ** 2 / expected).sum(axis=(1, 2))
 
-def classify_reader(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    # Same tolerance as R's chisq.test, so ties with the observed table count as extreme
+    return int((simulated >= statistic * (1 - 64 * np.finfo(float).eps)).sum())
 
-    temps_baix = [
-        "0 minuts.",
-        "Menys de 30 minuts a la setmana."
-    ]
+def chi_square_from_tables(
+    tables: list,
+    monte_carlo: int = None,
+    seed=0,
+    max_workers: int = None,
+    chunk_size: int = 2000
+) -> pd.DataFrame:
+    """
+    Chi-square test of independence of many contingency tables at once (same results
+    as scipy.stats.chi2_contingency, with Yates' correction when gl = 1).
+
+    tables are DataFrames of counts; answers never observed are dropped. Returns one row
+    per table with chi2, p, dof, cramers_v, n, the expected counts and the standardized
+    (Pearson) residuals (observed - expected) / sqrt(expected).
+
+    With monte_carlo (number of simulated tables) also p_mc, the Monte Carlo p-value of
+    the Pearson χ² (without Yates' correction) under independence with the margins fixed,
+    (1 + simulated tables at least as extreme) / (monte_carlo + 1). It doesn't rely on
+    the expected counts being at least 5. The simulations of all the tables are split in
+    chunks with their own streams spawned from seed and run in a process pool.
+    """
 
-    temps_alt = [
-        "Entre 1 i 2 hores a la setmana.",
-        "Entre 2 i 3 hores a la setmana.",
-        "3 hores o més a la setmana."
-    ]
+    from scipy.special import chdtrc
 
-    # 1. NO LECTOR (prioridad máxima)
-    cond_no = (
-        (df["p4_temps_lectura"].isin(temps_baix)) |
-        (df["p5_6_pagines_num"] <= 300)
-    )
+    # Answers never observed (e.g. removed from a streamed table) don't count as a category
+    tables = [
+        table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        for table in tables
+    ]
 
-    # 2. HABITUAL (alta intensidad)
-    cond_habitual = (
-        (df["p4_temps_lectura"].isin(temps_alt)) &
-        (df["p5_6_pagines_num"] >= 1200)
-    )
+    # Padded (n_tables, k1, k2) arrays so the arithmetic is vectorized over the tables
+    k1 = max([table.shape[0] for table in tables] + [1])
+    k2 = max([table.shape[1] for table in tables] + [1])
+    observed = np.zeros((len(tables), k1, k2))
+    for t, table in enumerate(tables):
+        observed[t, :table.shape[0], :table.shape[1]] = table.to_numpy(dtype=float)
+
+    rows = observed.sum(axis=2, keepdims=True)
+    cols = observed.sum(axis=1, keepdims=True)
+    n = observed.sum(axis=(1, 2))
+    shapes = np.array([table.shape for table in tables]).reshape(-1, 2)
+    dof = (shapes[:, 0] - 1) * (shapes[:, 1] - 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = rows * cols / n[:, None, None]
+
+        # Yates' correction for continuity on the 2x2 tables
+        diff = expected - observed
+        yates = np.where((dof == 1)[:, None, None], np.minimum(0.5, np.abs(diff)) * np.sign(diff), 0)
+        terms = (observed + yates - expected) ** 2 / expected
+        pearson = (observed - expected) ** 2 / expected
+        residuals = (observed - expected) / np.sqrt(expected)
+
+    results = []
+    for t, table in enumerate(tables):
+        r, c = table.shape
+
+        if dof[t] == 0:
+            chi2 = 0.0
+        else:
+            chi2 = terms[t, :r, :c].sum()
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cramers_v = np.sqrt(chi2 / (n[t] * (min(r, c) - 1)))
+
+        results.append({
+            "chi2": chi2,
+            "p": 1.0 if dof[t] == 0 else chdtrc(dof[t], chi2),
+            "dof": int(dof[t]),
+            "cramers_v": cramers_v,
+            "n": int(n[t]),
+            "expected": pd.DataFrame(expected[t, :r, :c], index=table.index, columns=table.columns),
+            "residuals": pd.DataFrame(residuals[t, :r, :c], index=table.index, columns=table.columns),
+        })
+
+    results = pd.DataFrame(results)
+
+    if monte_carlo is not None:
+        # Tables with gl = 0 have a single table with their margins
+        tested = [t for t in range(len(tables)) if dof[t] > 0]
+        tasks, owners = [], []
+        for t, table_seed in zip(tested, np.random.SeedSequence(seed).spawn(len(tested))):
+            r, c = tables[t].shape
+            for size, chunk_seed in seeded_chunks(monte_carlo, chunk_size, table_seed):
+                owners.append(t)
+                tasks.append((
+                    rows[t, :r, 0].astype(np.int64),
+                    cols[t, 0, :c].astype(np.int64),
+                    pearson[t, :r, :c].sum(),
+                    size,
+                    chunk_seed
+                ))
+
+        extreme = np.zeros(len(tables), dtype=np.int64)
+        for t, count in zip(owners, run_chunks(chi_square_simulation_chunk, tasks, max_workers=max_workers)):
+            extreme[t] += count
+
+        results["p_mc"] = np.where(dof > 0, (1 + extreme) / (monte_carlo + 1), 1.0)
+
+    return results
+
+@cached_result(version=1, columns=pairs_columns)
+def chi_square_pairs(
+    df: pd.DataFrame,
+    pairs: list,
+    monte_carlo: int = None,
+    seed=0,
+    max_workers: int = None
+) -> pd.DataFrame:
+    """
+    Chi-square tests of many (var1, var2) pairs: all the contingency tables are counted
+    with one bincount over the integer codes of the columns, then tested with
+    chi_square_from_tables (monte_carlo adds the Monte Carlo p-values).
+    Returns the table indexed by (var1, var2).
+    """
 
-    # 3. OCASIONAL (resto que no es nada de lo anterior)
-    cond_ocasional = ~(cond_no | cond_habitual)
+    index = pd.MultiIndex.from_tuples(pairs, names=["var1", "var2"])
+    codes = {col: column_codes(df[col]) for col in dict.fromkeys(col for pair in pairs for col in pair)}
 
-    df["classificacio_lectora"] = np.select(
-        [cond_no, cond_habitual, cond_ocasional],
-        [
-            "No lector / Lector molt ocasional",
-            "Lector habitual",
-            "Lector ocasional"
-        ],
-        default="Sense classificar"
-    )
+    k = max([len(labels) for _, labels in codes.values()] + [1])
+    n_pairs = len(pairs)
 
-    return df
+    a = np.stack([codes[var1][0] for var1, _ in pairs]) if n_pairs > 0 else np.zeros((0, len(df)), dtype=np.int64)
+    b = np.stack([codes[var2][0] for _, var2 in pairs]) if n_pairs > 0 else np.zeros((0, len(df)), dtype=np.int64)
+    valid = (a >= 0) & (b >= 0)
+    flat = (np.arange(n_pairs)[:, None] * k + a) * k + b
+    counts = np.bincount(flat[valid], minlength=n_pairs * k * k).reshape(n_pairs, k, k)
 
-def compute_thematic_scores(df, columnes_generes, map_thematic):
+    tables = []
+    for t, (var1, var2) in enumerate(pairs):
+        labels1, labels2 = codes[var1][1], codes[var2][1]
+        tables.append(pd.DataFrame(
+            counts[t, :len(labels1), :len(labels2)],
+            index=pd.Index(labels1, name=var1),
+            columns=pd.Index(labels2, name=var2)
+        ))
 
-    resultats = {}
+    results = chi_square_from_tables(tables, monte_carlo=monte_carlo, seed=seed, max_workers=max_workers)
+    results.index = index
 
-    for col in columnes_generes:
+    return results
 
-        puntuacio = (
-            pd.to_numeric(df[col], errors="coerce")
-            .map(map_thematic)
-            .fillna(0)
-            .sum()
-        )
+def print_chi_square(row, label=""):
+    """
+    Print one row of the chi-square results
+    """
 
-        resultats[col] = puntuacio
+    print(f"{label}")
+    print(f"χ² = {row['chi2']:.3f}")
+    print(f"p-value = {row['p']:.5f}")
+    if "p_mc" in row.index:
+        print(f"p-value (Monte Carlo) = {row['p_mc']:.5f}")
+    print(f"gl = {row['dof']}")
+    print(f"Cramér's V = {row['cramers_v']:.3f}")
+    print("--------------------------------------------------------")
 
-    resultats_df = (
-        pd.DataFrame.from_dict(
-            resultats,
-            orient="index",
-            columns=["puntuacio_total"]
-        )
-        .sort_values("puntuacio_total", ascending=False)
-    )
+def report_chi_square(results: pd.DataFrame, items: list):
+    """
+    Print the results of chi_square_pairs for the (var1, var2, label) items
+    """
 
-    return resultats_df
+    for var1, var2, label in items:
+        print_chi_square(results.loc[(var1, var2)], label)
 
-def spearman_analysis(df, var1, var2, label=""):
-    rho, p = spearmanr(df[var1], df[var2], nan_policy="omit")
+def chi_square_from_counts(contingency: pd.DataFrame, label="", monte_carlo: int = None, seed=0, max_workers: int = None):
+    """
+    Chi-square test of independence and Cramér's V from a contingency table of counts
+    """
 
-    print(f"{label}")
-    print(f"ρ = {rho:.3f}")
-    print(f"p-value = {p:.5f}")
-    print("--------------------------------------------------------")
+    row = chi_square_from_tables([contingency], monte_carlo=monte_carlo, seed=seed, max_workers=max_workers).iloc[0]
 
-    return rho, p
+    print_chi_square(row, label)
 
-def chi_square_analysis(df, var1, var2, label=""):
-    contingency = pd.crosstab(df[var1], df[var2])
+    return row["chi2"], row["p"], row["dof"], row["cramers_v"]
 
-    chi2, p, dof, expected = chi2_contingency(contingency)
+def chi_square_analysis(df, var1, var2, label="", monte_carlo: int = None, seed=0, max_workers: int = None):
 
-    n = contingency.sum().sum()
-    cramers_v = np.sqrt(chi2 / (n * (min(contingency.shape) - 1)))
+    results = chi_square_pairs(df, [(var1, var2)], monte_carlo=monte_carlo, seed=seed, max_workers=max_workers)
 
-    print(f"{label}")
-    print(f"χ² = {chi2:.3f}")
-    print(f"p-value = {p:.5f}")
-    print(f"gl = {dof}")
-    print(f"Cramér's V = {cramers_v:.3f}")
-    print("--------------------------------------------------------")
+    report_chi_square(results, [(var1, var2, label)])
 
-    return chi2, p, dof, cramers_v
+    return tuple(results.loc[(var1, var2), ["chi2", "p", "dof", "cramers_v"]])
 
 def plot_thematic_individual(results_dict, save_figures=False, figure_paths=None):
+    import matplotlib.pyplot as plt
 
     it = 0
     
@@ -475,15 +2520,15 @@ def plot_thematic_individual(results_dict, save_figures=False, figure_paths=None
             plt.savefig(f"{figure_paths[it]}.png")
             it += 1
 
-def plot_descriptive_hists(df: pd.DataFrame, var: str, title: str, xlabel: str, ylabel: str, color: str = None, sort: list = None, ax=None, save_figures=False, figure_path=""):
+def plot_frequency_hist(counts: pd.Series, title: str, xlabel: str, ylabel: str, color: str = None, ax=None, save_figures=False, figure_path=""):
     """
-    Plot descriptive histograms for the TFM project (one figure per plot)
+    Plot a descriptive histogram (percentages) from the counts per answer, in the
+    order of the counts index
     """
 
-    if sort is not None:
-        df[var] = pd.Categorical(df[var], categories=sort, ordered=True)
+    import matplotlib.pyplot as plt
 
-    freq = df[var].value_counts(normalize=True).sort_index() * 100
+    freq = counts / counts.sum() * 100
 
     freq.index = [textwrap.fill(label, 15) for label in freq.index]
 
@@ -493,7 +2538,7 @@ def plot_descriptive_hists(df: pd.DataFrame, var: str, title: str, xlabel: str,
 
     freq.plot(kind="bar", ax=ax, color=color)
 
-    n_total = len(df[var].dropna())
+    n_total = counts.sum()
 
     for i, v in enumerate(freq):
 
@@ -517,6 +2562,29 @@ def plot_descriptive_hists(df: pd.DataFrame, var: str, title: str, xlabel: str,
     if save_figures:
         plt.savefig(f"{figure_path}.png")
 
+def plot_descriptive_hists(df: pd.DataFrame, var: str, title: str, xlabel: str, ylabel: str, color: str = None, sort: list = None, ax=None, save_figures=False, figure_path=""):
+    """
+    Plot descriptive histograms for the TFM project (one figure per plot)
+    """
+
+    # Only the column is read, df is not modified
+    values = df[var]
+    if sort is not None:
+        values = pd.Series(pd.Categorical(values, categories=sort, ordered=True))
+
+    counts = values.value_counts().sort_index()
+
+    plot_frequency_hist(
+        counts,
+        title=title,
+        xlabel=xlabel,
+        ylabel=ylabel,
+        color=color,
+        ax=ax,
+        save_figures=save_figures,
+        figure_path=figure_path
+    )
+
 
 def plot_descriptive_combined_hists(
     *dfs,
@@ -546,6 +2614,8 @@ def plot_descriptive_combined_hists(
         Names of each group.
     """
 
+    import matplotlib.pyplot as plt
+
     # -----------------------------
     # Validación
     # -----------------------------
@@ -553,20 +2623,20 @@ def plot_descriptive_combined_hists(
         raise ValueError("len(dfs) must match len(groups)")
 
     # -----------------------------
-    # Orden categorías
+    # Orden categorías (només la columna var, sense copiar els dfs)
     # -----------------------------
+    columns = [df[var] for df in dfs]
+
     if sort is not None:
-        dfs = [
-            df.assign(
-                **{
-                    var: pd.Categorical(
-                        df[var],
-                        categories=sort,
-                        ordered=True
-                    )
-                }
+        columns = [
+            pd.Series(
+                pd.Categorical(
+                    column,
+                    categories=sort,
+                    ordered=True
+                )
             )
-            for df in dfs
+            for column in columns
         ]
 
     # -----------------------------
@@ -574,18 +2644,18 @@ def plot_descriptive_combined_hists(
     # -----------------------------
     freq_dict = {}
 
-    for df, group in zip(dfs, groups):
+    for column, group in zip(columns, groups):
 
         if sort is not None:
             freq = (
-                df[var]
+                column
                 .value_counts(normalize=True)
                 .reindex(sort, fill_value=0)
                 * 100
             )
         else:
             freq = (
-                df[var]
+                column
                 .value_counts(normalize=True)
                 * 100
             )
@@ -667,18 +2737,42 @@ def plot_spearman_heatmap(
     sort_by_mean_abs=False,
     mask_small_values=False,
     threshold=0.1,
+    measure="rho",
+    significance=None,
+    correction="holm",
+    alpha=0.05,
     show_colorbar=True,
+    ax=None,
     save_figures=False,
     figure_path=""
 ):
     """
-    Genera un heatmap a partir d'un diccionari de correlacions Spearman.
+    Genera un heatmap a partir d'un diccionari de correlacions Spearman (en una figura
+    nova, o en ax si es passa). measure: "rho" (Spearman), "tau_b" (Kendall) o
+    "gamma" (Goodman-Kruskal), veure MEASURES.
+
+    significance="mask" pinta de gris les cel·les no significatives i "mark" afegeix
+    asteriscs a les significatives (* < alpha, ** < .01, *** < .001), amb la p corregida
+    entre totes les cel·les (correction: "holm", "bh" o None).
     """
 
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import TwoSlopeNorm
+
     # =========================
     # DATAFRAME
     # =========================
-    df = pd.DataFrame(correlations_dict).T
+    correlations = correlations_table(correlations_dict, measure)
+    p_column = {"holm": "p_holm", "bh": "p_bh", None: "p"}[correction]
+
+    df = pd.DataFrame({
+        row: {column: cell[measure] for column, cell in cells.items()}
+        for row, cells in correlations_dict.items()
+    }).T
+    p_values = pd.DataFrame({
+        row: {column: correlations.loc[(row, column), p_column] for column in cells}
+        for row, cells in correlations_dict.items()
+    }).T
 
     # opcional: netejar soroll
     if mask_small_values:
@@ -689,15 +2783,27 @@ def plot_spearman_heatmap(
     if sort_by_mean_abs:
         order = df.abs().mean(axis=1).sort_values(ascending=False).index
         df = df.loc[order]
+        p_values = p_values.loc[order]
+
+    # Cel·les significatives (p NaN: no significativa)
+    significant = (p_values < alpha).to_numpy()
 
     # =========================
     # PLOT
     # =========================
-    fig, ax = plt.subplots(figsize=figsize)
+    # Figura independent només si no es passa ax
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = plt.subplots(figsize=figsize)
 
     norm = TwoSlopeNorm(vmin=vmin, vcenter=center, vmax=vmax)
 
-    im = ax.imshow(df.values, cmap=cmap, norm=norm, aspect="auto")
+    values = df.values
+    if significance == "mask":
+        values = np.ma.masked_where(~significant, values)
+        cmap = plt.get_cmap(cmap).with_extremes(bad="lightgrey")
+
+    im = ax.imshow(values, cmap=cmap, norm=norm, aspect="auto")
 
     # labels
     ax.set_xticks(range(df.shape[1]))
@@ -711,27 +2817,147 @@ def plot_spearman_heatmap(
         for i in range(df.shape[0]):
             for j in range(df.shape[1]):
                 val = df.iloc[i, j]
+                text = format(val, fmt)
+                color = "white" if abs(val) > 0.45 else "black"
+
+                if significance == "mark" and significant[i, j]:
+                    p = p_values.iloc[i, j]
+                    text += "***" if p < 0.001 else "**" if p < 0.01 else "*"
+                elif significance == "mask" and not significant[i, j]:
+                    color = "dimgray"
+
                 ax.text(
-                    j, i, format(val, fmt),
+                    j, i, text,
                     ha="center", va="center",
                     fontsize=8,
-                    color="white" if abs(val) > 0.45 else "black"
+                    color=color
                 )
 
     # colorbar
     if show_colorbar:
         cbar = plt.colorbar(im, ax=ax, fraction=0.03, pad=0.02)
-        cbar.set_label("Spearman ρ")
+        cbar.set_label(MEASURES[measure][1])
+
+    if significance is not None:
+        title = f"{title}\n(p {correction or 'sense correcció'} < {alpha})"
 
     ax.set_title(title, fontsize=13)
-    plt.tight_layout()
+
+    if own_figure:
+        plt.tight_layout()
+
+        if save_figures:
+            plt.savefig(f"{figure_path}.png")
+
+        plt.show()
+
+    return df
+
+def plot_spearman_heatmap_grid(
+    grid: dict,
+    title="Correlacions de Spearman per grups",
+    ncols=4,
+    figsize_per_group=(4, 10),
+    measure="rho",
+    significance=None,
+    correction="holm",
+    alpha=0.05,
+    save_figures=False,
+    figure_path=""
+):
+    """
+    Heatmaps d'un diccionari {grup: correlations_dict} en una graella, un per grup, amb
+    la mateixa escala de colors. Les correccions de significança es fan dins de cada grup.
+    """
+
+    import matplotlib.pyplot as plt
+
+    ncols = min(ncols, len(grid))
+    nrows = -(-len(grid) // ncols)
+
+    fig, axs = plt.subplots(
+        nrows, ncols,
+        figsize=(figsize_per_group[0] * ncols, figsize_per_group[1] * nrows),
+        sharey=True,
+        squeeze=False,
+        layout="constrained"
+    )
+
+    for ax, (group, correlations) in zip(axs.flat, grid.items()):
+        plot_spearman_heatmap(
+            correlations,
+            title=" / ".join(map(str, group)) if isinstance(group, tuple) else str(group),
+            measure=measure,
+            significance=significance,
+            correction=correction,
+            alpha=alpha,
+            show_colorbar=False,
+            ax=ax
+        )
+        ax.title.set_fontsize(10)
+
+    for ax in list(axs.flat)[len(grid):]:
+        ax.set_visible(False)
+
+    fig.colorbar(axs.flat[0].images[0], ax=axs, fraction=0.02, pad=0.01, label=MEASURES[measure][1])
+    fig.suptitle(title, fontsize=13)
 
     if save_figures:
         plt.savefig(f"{figure_path}.png")
 
     plt.show()
 
-    return df
+def plot_correlation_matrix(
+    matrix: pd.DataFrame,
+    title="Correlacions policòriques",
+    cmap="RdYlBu_r",
+    figsize=(12, 10),
+    annotate=True,
+    fmt=".2f",
+    label="ρ policòrica",
+    save_figures=False,
+    figure_path=""
+):
+    """
+    Heatmap d'una matriu de correlacions quadrada (p. ex. polychoric_matrix), amb la
+    diagonal en blanc
+    """
+
+    import matplotlib.pyplot as plt
+
+    values = np.ma.masked_where(np.eye(len(matrix), dtype=bool) | np.isnan(matrix.values), matrix.values)
+
+    fig, ax = plt.subplots(figsize=figsize)
+    im = ax.imshow(values, cmap=plt.get_cmap(cmap).with_extremes(bad="white"), vmin=-1, vmax=1)
+
+    ax.set_xticks(range(matrix.shape[1]))
+    ax.set_xticklabels(matrix.columns, rotation=90, fontsize=8)
+    ax.set_yticks(range(matrix.shape[0]))
+    ax.set_yticklabels(matrix.index, fontsize=8)
+
+    if annotate:
+        for i in range(matrix.shape[0]):
+            for j in range(matrix.shape[1]):
+                if values.mask[i, j]:
+                    continue
+                val = matrix.iloc[i, j]
+                ax.text(
+                    j, i, format(val, fmt),
+                    ha="center", va="center",
+                    fontsize=6,
+                    color="white" if abs(val) > 0.45 else "black"
+                )
+
+    cbar = plt.colorbar(im, ax=ax, fraction=0.03, pad=0.02)
+    cbar.set_label(label)
+    ax.set_title(title, fontsize=13)
+
+    plt.tight_layout()
+
+    if save_figures:
+        plt.savefig(f"{figure_path}.png")
+
+    plt.show()
 
 #########################################################################################
 #